@@ -1,6 +1,47 @@
-import uvicorn
+import argparse
+import os
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app", host="0.0.0.0", port=8547, reload=True, reload_dirs=["app"]
+    parser = argparse.ArgumentParser(prog="python -m app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8547)
+    parser.add_argument(
+        "--in-memory", action="store_true",
+        help="use an ephemeral in-memory database (same as DATABASE_MODE=memory)"
     )
+    parser.add_argument(
+        "--production", action="store_true",
+        help="run multiple workers without auto-reload"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="worker processes in production mode (default: CPU count)"
+    )
+    parser.add_argument(
+        "--keep-alive", type=int, default=30,
+        help="keep-alive timeout in seconds in production mode"
+    )
+    parser.add_argument(
+        "--access-log-sample", type=float, default=0.0,
+        help="fraction of requests to access-log in production mode (0 = off)"
+    )
+    args = parser.parse_args()
+
+    if args.in_memory:
+        # Set before the app is imported so reloader/worker children inherit it
+        os.environ["DATABASE_MODE"] = "memory"
+
+    # Imported after DATABASE_MODE is settled
+    from app import server
+
+    if args.production:
+        try:
+            server.run_production(
+                args.host, args.port, args.workers,
+                keep_alive=args.keep_alive,
+                access_log_sample=args.access_log_sample,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        server.run_development(args.host, args.port)
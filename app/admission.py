@@ -0,0 +1,343 @@
+"""
+Admission Control and Load Shedding.
+
+Rejects excess work before it reaches the routers, so latency for admitted
+requests stays bounded under overload and clients get a clear signal to back
+off. Applies to the booking API (paths under /api/) only; admin, debug, docs
+and /metrics stay reachable during overload.
+
+Three independent checks, each off when its limit is 0:
+
+- Token-bucket rate limit per bearer token (RATE_LIMIT_TOKEN_RPS,
+  RATE_LIMIT_TOKEN_BURST) and per route (RATE_LIMIT_ROUTE_RPS,
+  RATE_LIMIT_ROUTE_BURST, with per-endpoint overrides in RATE_LIMIT_ROUTES,
+  e.g. '{"availability_search": [200, 400]}' for 200/s with a burst of 400).
+  Exceeding either returns 429 with a Retry-After header.
+- A cap on concurrently handled requests (MAX_IN_FLIGHT). Requests over the
+  cap wait in a FIFO queue of at most ADMISSION_QUEUE_SIZE entries for up to
+  ADMISSION_QUEUE_TIMEOUT_MS; a full queue or an expired wait returns 503.
+
+All state is per worker process and small: a two-field bucket per token
+(at most MAX_TRACKED_TOKENS, least recently seen dropped first) and per
+route, and a deque of waiting futures.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+RATE_LIMIT_TOKEN_RPS = float(os.getenv("RATE_LIMIT_TOKEN_RPS", "0"))
+# An unset burst follows the rate, but never below the one token a request takes
+RATE_LIMIT_TOKEN_BURST = float(os.getenv("RATE_LIMIT_TOKEN_BURST", "0")) or max(1.0, RATE_LIMIT_TOKEN_RPS)
+RATE_LIMIT_ROUTE_RPS = float(os.getenv("RATE_LIMIT_ROUTE_RPS", "0"))
+RATE_LIMIT_ROUTE_BURST = float(os.getenv("RATE_LIMIT_ROUTE_BURST", "0")) or max(1.0, RATE_LIMIT_ROUTE_RPS)
+RATE_LIMIT_ROUTES: Dict[str, List[float]] = json.loads(os.getenv("RATE_LIMIT_ROUTES", "{}"))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "0"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "100"))
+
+ADMISSION_ENABLED = bool(
+    RATE_LIMIT_TOKEN_RPS or RATE_LIMIT_ROUTE_RPS or RATE_LIMIT_ROUTES or MAX_IN_FLIGHT
+)
+
+# Buckets kept for distinct bearer tokens; least recently seen are dropped
+MAX_TRACKED_TOKENS = 10000
+
+API_PREFIX = "/api/"
+
+SHED_REASONS = ("token_rate_limit", "route_rate_limit", "queue_full", "queue_timeout")
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` up to `burst` tokens.
+
+    Only the token count and last refill time are stored per bucket.
+    """
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float) -> None:
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate: float, burst: float, now: float) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class RateLimiter:
+    """
+    Per-token and per-route token buckets.
+
+    Args:
+        token_rate: Requests per second per bearer token (0 disables)
+        token_burst: Bucket size per token
+        route_rate: Default requests per second per route (0 disables)
+        route_burst: Default bucket size per route
+        route_overrides: Endpoint name -> [rate, burst]; a lone rate gets
+            the burst max(1, rate)
+
+    Raises:
+        ValueError: If an enabled limit has a burst below 1, which could
+            never admit a request
+    """
+
+    def __init__(self, token_rate: float, token_burst: float, route_rate: float,
+                 route_burst: float, route_overrides: Dict[str, List[float]]) -> None:
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.route_limits: Dict[str, Tuple[float, float]] = {
+            name: (float(limits[0]), float(limits[1]) if len(limits) > 1 else max(1.0, float(limits[0])))
+            for name, limits in route_overrides.items()
+        }
+        self.route_default = (route_rate, route_burst)
+        limits = {"token": (token_rate, token_burst), "route": self.route_default}
+        limits.update(self.route_limits)
+        for name, (rate, burst) in limits.items():
+            if rate and burst < 1:
+                raise ValueError(
+                    f"Rate limit burst for {name} is {burst:g}; it must be at least 1 "
+                    "since each request takes a whole token"
+                )
+        self.token_buckets: "OrderedDict[bytes, TokenBucket]" = OrderedDict()
+        self.route_buckets: Dict[str, TokenBucket] = {}
+
+    def check_token(self, token: bytes, now: float) -> float:
+        """Seconds to wait before `token` may send another request (0 = allowed)."""
+        if not self.token_rate:
+            return 0.0
+        bucket = self.token_buckets.get(token)
+        if bucket is None:
+            bucket = self.token_buckets[token] = TokenBucket(self.token_burst, now)
+            if len(self.token_buckets) > MAX_TRACKED_TOKENS:
+                self.token_buckets.popitem(last=False)
+        else:
+            self.token_buckets.move_to_end(token)
+        return bucket.take(self.token_rate, self.token_burst, now)
+
+    def check_route(self, name: str, now: float) -> float:
+        """Seconds to wait before endpoint `name` may take another request."""
+        rate, burst = self.route_limits.get(name, self.route_default)
+        if not rate:
+            return 0.0
+        bucket = self.route_buckets.get(name)
+        if bucket is None:
+            bucket = self.route_buckets[name] = TokenBucket(burst, now)
+        return bucket.take(rate, burst, now)
+
+
+class ConcurrencyLimiter:
+    """
+    Caps concurrent requests, with a bounded FIFO queue of waiters.
+
+    A released slot is handed directly to the oldest waiter, so queued
+    requests are admitted in arrival order.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Wait for a slot.
+
+        Returns:
+            None once admitted, or the shed reason ("queue_full" or "queue_timeout")
+        """
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return None
+        if len(self.waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            return None
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # The slot was handed over just as the wait expired; keep it
+                return None
+            waiter.cancel()
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class RouteMatcher:
+    """
+    Resolves a request path to its endpoint name before routing runs.
+
+    Args:
+        routes: APIRoute objects to recognise
+    """
+
+    def __init__(self, routes: Iterable[Any]) -> None:
+        self.routes = [(route.path_regex, route.methods, route.name) for route in routes]
+
+    def match(self, method: str, path: str) -> Optional[str]:
+        for regex, methods, name in self.routes:
+            if method in methods and regex.match(path):
+                return name
+        return None
+
+
+class AdmissionController:
+    """
+    Rate limiters, concurrency cap and shed counters of one worker.
+
+    Attributes:
+        rate_limiter (RateLimiter): Per-token and per-route buckets
+        concurrency (Optional[ConcurrencyLimiter]): None when MAX_IN_FLIGHT is 0
+        shed (Dict[str, int]): Rejected requests per reason in SHED_REASONS
+    """
+
+    def __init__(self) -> None:
+        self.rate_limiter = RateLimiter(
+            RATE_LIMIT_TOKEN_RPS, RATE_LIMIT_TOKEN_BURST,
+            RATE_LIMIT_ROUTE_RPS, RATE_LIMIT_ROUTE_BURST, RATE_LIMIT_ROUTES,
+        )
+        self.concurrency = ConcurrencyLimiter(
+            MAX_IN_FLIGHT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        ) if MAX_IN_FLIGHT else None
+        self.shed: Dict[str, int] = dict.fromkeys(SHED_REASONS, 0)
+
+    def collect(self) -> List[str]:
+        """Exposition lines for `MetricsRegistry.add_collector`."""
+        lines = [
+            "# HELP http_requests_shed_total Requests rejected by admission control.",
+            "# TYPE http_requests_shed_total counter",
+        ]
+        lines += [
+            f'http_requests_shed_total{{reason="{reason}"}} {n}'
+            for reason, n in self.shed.items()
+        ]
+        if self.concurrency is not None:
+            lines += [
+                "# HELP http_admission_active Requests holding an admission slot.",
+                "# TYPE http_admission_active gauge",
+                f"http_admission_active {self.concurrency.active}",
+                "# HELP http_admission_queued Requests waiting for an admission slot.",
+                "# TYPE http_admission_queued gauge",
+                f"http_admission_queued {len(self.concurrency.waiters)}",
+            ]
+        return lines
+
+
+ADMISSION = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying the rate limits and the concurrency cap.
+
+    Must be the outermost middleware so shed requests cost as little as
+    possible. They are answered here with a JSON `{"detail": ...}` body,
+    like HTTPException responses.
+
+    Args:
+        app: Wrapped application
+        routes: API routes, for per-route limits
+        controller: Limiters and counters to use
+    """
+
+    def __init__(self, app: ASGIApp, routes: Iterable[Any] = (),
+                 controller: AdmissionController = ADMISSION) -> None:
+        self.app = app
+        self.matcher = RouteMatcher(routes)
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        rate_limiter = self.controller.rate_limiter
+        now = time.monotonic()
+        token = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                token = value
+                break
+        wait = rate_limiter.check_token(token, now)
+        if wait:
+            await self.reject(send, 429, "token_rate_limit", wait)
+            return
+        endpoint = self.matcher.match(scope["method"], scope["path"])
+        if endpoint is not None:
+            wait = rate_limiter.check_route(endpoint, now)
+            if wait:
+                await self.reject(send, 429, "route_rate_limit", wait)
+                return
+
+        concurrency = self.controller.concurrency
+        if concurrency is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await concurrency.acquire()
+        if reason is not None:
+            await self.reject(send, 503, reason, 1.0)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            concurrency.release()
+
+    async def reject(self, send: Send, status: int, reason: str, retry_after: float) -> None:
+        self.controller.shed[reason] += 1
+        detail = "Rate limit exceeded" if status == 429 else "Server overloaded, retry later"
+        body = json.dumps({"detail": detail, "reason": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
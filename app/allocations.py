@@ -0,0 +1,299 @@
+"""
+Allocation Profiling.
+
+Two views of memory use, both built on `tracemalloc`:
+
+- Snapshots: start tracing, take numbered snapshots and diff them, grouped
+  by source line or by the route whose handler was on the stack when the
+  memory was allocated (via the `/admin/memory/...` endpoints).
+- An opt-in per-route metric (ALLOC_METRICS=1): the peak number of bytes
+  allocated while handling each request, exported on /metrics as
+  `http_request_alloc_peak_bytes`.
+
+tracemalloc tracks one process-wide total, so a request's peak can only be
+attributed to it when no other request ran in the same worker at the same
+time. Overlapping requests are counted in `http_request_alloc_skipped_total`
+instead of being measured; drive the server with low concurrency (e.g.
+`bench/load.py --concurrency 1`) to measure every request.
+
+Tracing makes every allocation slower, so it is off unless started through
+the admin endpoint or ALLOC_METRICS. State is per worker process.
+
+Author: AI Assistant
+"""
+
+import linecache
+import os
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.metrics import UNMATCHED_ROUTE, Histogram
+
+ALLOC_METRICS = os.getenv("ALLOC_METRICS", "").lower() in ("1", "true", "yes")
+# Frames kept per allocation; route grouping needs enough to reach the handler
+ALLOC_TRACE_FRAMES = int(os.getenv("ALLOC_TRACE_FRAMES", "25"))
+
+# Histogram upper bounds in bytes (1 KiB to 16 MiB); +Inf is implicit
+BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(8))
+
+MAX_SNAPSHOTS = 10
+UNATTRIBUTED = "<unattributed>"
+
+# Allocations made by tracemalloc itself, the source-line cache used to show
+# code in results and the import system are noise
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+_next_snapshot_id = 1
+
+
+class RouteIndex:
+    """
+    Maps source lines inside route handlers to "METHOD /path/template".
+
+    Args:
+        routes: APIRoute objects whose endpoint functions should be recognised
+    """
+
+    def __init__(self, routes: Iterable[Any]) -> None:
+        self.ranges: Dict[str, List[Tuple[int, int, str]]] = {}
+        for route in routes:
+            code = getattr(getattr(route, "endpoint", None), "__code__", None)
+            if code is None:
+                continue
+            lines = [line for _, _, line in code.co_lines() if line is not None]
+            label = f"{','.join(sorted(route.methods))} {route.path}"
+            self.ranges.setdefault(code.co_filename, []).append(
+                (min(lines + [code.co_firstlineno]), max(lines), label)
+            )
+
+    def route_for(self, traceback: tracemalloc.Traceback) -> str:
+        """Return the route whose handler appears in `traceback`."""
+        for frame in traceback:
+            for first, last, label in self.ranges.get(frame.filename, ()):
+                if first <= frame.lineno <= last:
+                    return label
+        return UNATTRIBUTED
+
+
+def start_tracing(frames: int = ALLOC_TRACE_FRAMES) -> None:
+    """
+    Start tracemalloc with `frames` frames per allocation.
+
+    Restarts tracing (discarding existing traces) if it is already running
+    with a different frame count.
+    """
+    if tracemalloc.is_tracing():
+        if tracemalloc.get_traceback_limit() == frames:
+            return
+        tracemalloc.stop()
+    tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    """Stop tracemalloc and drop stored snapshots."""
+    tracemalloc.stop()
+    snapshots.clear()
+
+
+def status() -> Dict[str, Any]:
+    """Tracing state, traced memory and stored snapshot ids."""
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "snapshots": list(snapshots),
+        "pid": os.getpid(),
+    }
+
+
+def take_snapshot() -> int:
+    """
+    Take and store a filtered snapshot, evicting the oldest beyond MAX_SNAPSHOTS.
+
+    Returns:
+        int: Id of the new snapshot
+
+    Raises:
+        RuntimeError: If tracing has not been started
+    """
+    global _next_snapshot_id
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing; start it first")
+    snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    snapshot_id = _next_snapshot_id
+    _next_snapshot_id += 1
+    snapshots[snapshot_id] = snapshot
+    while len(snapshots) > MAX_SNAPSHOTS:
+        snapshots.popitem(last=False)
+    return snapshot_id
+
+
+def _line_entry(frame: tracemalloc.Frame) -> Dict[str, Any]:
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "code": linecache.getline(frame.filename, frame.lineno).strip(),
+    }
+
+
+def top(snapshot_id: int, group_by: str, index: RouteIndex, limit: int = 20) -> List[dict]:
+    """
+    Largest live allocations in a snapshot.
+
+    Args:
+        snapshot_id: Stored snapshot
+        group_by: "lineno" or "route"
+        index: Route lookup used for "route" grouping
+        limit: Maximum entries
+
+    Raises:
+        KeyError: If the snapshot id is unknown
+    """
+    snapshot = snapshots[snapshot_id]
+    if group_by == "route":
+        totals: Dict[str, List[int]] = {}
+        for stat in snapshot.statistics("traceback"):
+            entry = totals.setdefault(index.route_for(stat.traceback), [0, 0])
+            entry[0] += stat.size
+            entry[1] += stat.count
+        rows = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+        return [{"route": r, "size_bytes": s, "count": c} for r, (s, c) in rows[:limit]]
+
+    return [
+        dict(_line_entry(stat.traceback[0]), size_bytes=stat.size, count=stat.count)
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def diff(base_id: int, target_id: int, group_by: str, index: RouteIndex,
+         limit: int = 20) -> List[dict]:
+    """
+    Allocation growth between two snapshots, largest change first.
+
+    Args:
+        base_id: Earlier snapshot
+        target_id: Later snapshot
+        group_by: "lineno" or "route"
+        index: Route lookup used for "route" grouping
+        limit: Maximum entries
+
+    Raises:
+        KeyError: If either snapshot id is unknown
+    """
+    base, target = snapshots[base_id], snapshots[target_id]
+    if group_by == "route":
+        totals: Dict[str, List[int]] = {}
+        for stat in target.compare_to(base, "traceback"):
+            entry = totals.setdefault(index.route_for(stat.traceback), [0, 0, 0])
+            entry[0] += stat.size_diff
+            entry[1] += stat.count_diff
+            entry[2] += stat.size
+        rows = sorted(totals.items(), key=lambda item: abs(item[1][0]), reverse=True)
+        return [
+            {"route": r, "size_diff_bytes": d, "count_diff": c, "size_bytes": s}
+            for r, (d, c, s) in rows[:limit]
+        ]
+
+    return [
+        dict(_line_entry(stat.traceback[0]), size_diff_bytes=stat.size_diff,
+             count_diff=stat.count_diff, size_bytes=stat.size)
+        for stat in target.compare_to(base, "lineno")[:limit]
+    ]
+
+
+class AllocationMetrics:
+    """
+    Per-route histograms of peak bytes allocated per request.
+
+    Attributes:
+        peaks (Dict[Tuple[str, str], Histogram]): Histogram per (method, route)
+        skipped (int): Requests not measured because another request overlapped
+    """
+
+    def __init__(self) -> None:
+        self.peaks: Dict[Tuple[str, str], Histogram] = {}
+        self.skipped = 0
+
+    def observe(self, method: str, route: str, peak_bytes: int) -> None:
+        key = (method, route)
+        histogram = self.peaks.get(key)
+        if histogram is None:
+            histogram = self.peaks[key] = Histogram(BYTES_BUCKETS)
+        histogram.observe(peak_bytes)
+
+    def collect(self) -> List[str]:
+        """Exposition lines for `MetricsRegistry.add_collector`."""
+        lines = [
+            "# HELP http_request_alloc_peak_bytes Peak bytes allocated while handling a request.",
+            "# TYPE http_request_alloc_peak_bytes histogram",
+        ]
+        for (method, route), histogram in sorted(self.peaks.items()):
+            lines += histogram.render(
+                "http_request_alloc_peak_bytes", f'method="{method}",route="{route}"'
+            )
+        lines += [
+            "# HELP http_request_alloc_skipped_total Requests not measured because they overlapped.",
+            "# TYPE http_request_alloc_skipped_total counter",
+            f"http_request_alloc_skipped_total {self.skipped}",
+        ]
+        return lines
+
+
+ALLOCATION_METRICS = AllocationMetrics()
+
+
+class AllocationMiddleware:
+    """
+    ASGI middleware measuring the tracemalloc peak of each request that runs
+    alone in this worker. Does nothing while tracemalloc is not tracing.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: AllocationMetrics = ALLOCATION_METRICS) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.active = 0
+        self.started = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        alone = self.active == 0
+        self.active += 1
+        self.started += 1
+        seq = self.started
+        baseline: Optional[int] = None
+        if alone:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+            # Valid only if no other request started while this one ran
+            if baseline is not None and self.started == seq and tracemalloc.is_tracing():
+                route = scope.get("route")
+                self.metrics.observe(
+                    scope["method"],
+                    getattr(route, "path", None) or UNMATCHED_ROUTE,
+                    max(0, tracemalloc.get_traced_memory()[1] - baseline),
+                )
+            else:
+                self.metrics.skipped += 1
@@ -0,0 +1,88 @@
+"""
+Single-Flight Request Coalescing.
+
+When many clients ask the same question at the same moment (e.g. the same
+restaurant, date and party size during a traffic spike), only the first
+request - the leader - computes the answer; requests with the same key that
+arrive while it is running - followers - await the leader's result instead
+of repeating the work. Nothing is cached: once the computation finishes the
+key is forgotten, so the next request computes a fresh answer.
+
+Coalescing only helps when the computation lets the event loop run other
+requests meanwhile, so callers run blocking database work in the thread
+pool. Followers share the leader's outcome, including its exception.
+
+Set AVAILABILITY_COALESCE=0 to turn coalescing of availability searches off.
+State is per worker process.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+AVAILABILITY_COALESCE = os.getenv("AVAILABILITY_COALESCE", "1").lower() not in ("0", "false", "no")
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    Args:
+        name: Label for the exported metrics
+
+    Attributes:
+        in_flight (Dict[Hashable, asyncio.Task]): Running computation per key
+        leaders (int): Requests that ran the computation
+        followers (int): Requests that awaited another request's computation
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of `compute()`, shared with concurrent callers using `key`.
+
+        The computation runs as its own task, so a leader whose client
+        disconnects does not cancel it for the followers.
+
+        Args:
+            key: Identity of the computation
+            compute: Coroutine function producing the result
+
+        Returns:
+            The computation's result
+
+        Raises:
+            Exception: Whatever `compute` raised, for the leader and every follower
+        """
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.followers += 1
+            return await asyncio.shield(task)
+
+        self.leaders += 1
+        task = asyncio.ensure_future(compute())
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def collect(self) -> List[str]:
+        """Exposition lines for `MetricsRegistry.add_collector`."""
+        return [
+            "# HELP coalesced_requests_total Requests by single-flight role (leader computed, follower shared).",
+            "# TYPE coalesced_requests_total counter",
+            f'coalesced_requests_total{{group="{self.name}",role="leader"}} {self.leaders}',
+            f'coalesced_requests_total{{group="{self.name}",role="follower"}} {self.followers}',
+            "# HELP coalesced_in_flight Keys with a computation currently running.",
+            "# TYPE coalesced_in_flight gauge",
+            f'coalesced_in_flight{{group="{self.name}"}} {len(self.in_flight)}',
+        ]
+
+
+AVAILABILITY_FLIGHTS = SingleFlight("availability_search")
@@ -4,24 +4,109 @@ Database Configuration and Session Management.
 This module sets up the SQLite database connection, session management,
 and declarative base for the restaurant booking mock API.
 
+Set DATABASE_MODE=memory (or run `python -m app --in-memory`) to use an
+in-memory database instead of ./restaurant_booking.db.
+
 Author: AI Assistant
 """
 
-from typing import Generator
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+# DATABASE_MODE=memory runs on an ephemeral in-memory database (no disk I/O),
+# intended for test runs. Anything else uses the on-disk SQLite file.
+DATABASE_MODE = os.getenv("DATABASE_MODE", "file").lower()
+IN_MEMORY = DATABASE_MODE == "memory"
+
+if IN_MEMORY:
+    # Shared-cache in-memory database held open by a single pooled connection
+    SQLALCHEMY_DATABASE_URL = (
+        "sqlite:///file:restaurant_booking?mode=memory&cache=shared&uri=true"
+    )
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+else:
+    # SQLite database URL - creates file in project root
+    SQLALCHEMY_DATABASE_URL = "sqlite:///./restaurant_booking.db"
+
+    # Create SQLAlchemy engine with SQLite-specific configuration
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False}  # Required for SQLite threading
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """
+        Configure each new connection so several worker processes can share
+        the database file: WAL lets readers run alongside a writer, and the
+        busy timeout makes writers wait for the lock instead of failing.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
 
-# SQLite database URL - creates file in project root
-SQLALCHEMY_DATABASE_URL = "sqlite:///./restaurant_booking.db"
+# A forked child must never reuse the parent's pooled connections; drop them
+# (without closing the parent's sockets) so each process opens its own.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 
-# Create SQLAlchemy engine with SQLite-specific configuration
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite threading
+
+@dataclass
+class QueryStats:
+    """
+    Statement count and total database time accumulated for one request.
+
+    Attributes:
+        count (int): Number of statements executed
+        seconds (float): Total time spent executing them
+        shapes (Counter): Executions per SQL statement text, or None when not
+            tracked (statements are parameterised, so the text is the shape)
+        scope (dict): ASGI scope of the request, for attributing statements
+            to a route
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    shapes: Optional[Counter] = None
+    scope: Optional[dict] = None
+
+
+# Set by request middleware; None outside a request, so nothing is recorded
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
 )
 
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - context._query_start
+        if stats.shapes is not None:
+            stats.shapes[statement] += 1
+
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
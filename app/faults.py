@@ -0,0 +1,207 @@
+"""
+Latency and Fault Injection.
+
+Makes the mock behave more like a real remote API so client timeouts and
+retry paths get exercised. Each rule sets a latency distribution and the
+probability of each kind of failure for one endpoint:
+
+- latency: none, fixed, normal (clipped at 0) or lognormal (long tail),
+  optionally capped with max_ms
+- errors: 429 (with Retry-After), 500, 503, and "timeout" (the request
+  hangs for timeout_ms, then gets 504)
+
+Delays use `asyncio.sleep`, so an injected delay never blocks the worker.
+
+Rules are keyed by, in lookup order: "METHOD /route/template", the route
+template, the endpoint function name (e.g. "get_booking"), or "*" for
+every API endpoint. A seed makes the sequence of draws reproducible for a
+given request order (per worker process).
+
+The initial configuration is read from the JSON file named by FAULTS_CONFIG,
+and can be replaced at runtime through `/admin/faults`.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+from typing import Dict, List, Literal, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, Field, model_validator
+
+FAULTS_CONFIG = os.getenv("FAULTS_CONFIG", "")
+
+ERROR_KINDS = ("error_429", "error_500", "error_503", "timeout")
+
+
+class LatencyConfig(BaseModel):
+    """Latency distribution for one rule; all values in milliseconds."""
+
+    distribution: Literal["none", "fixed", "normal", "lognormal"] = "none"
+    ms: float = Field(0.0, ge=0, description="fixed: the delay")
+    mean_ms: float = Field(0.0, ge=0, description="normal: mean")
+    stddev_ms: float = Field(0.0, ge=0, description="normal: standard deviation")
+    median_ms: float = Field(0.0, ge=0, description="lognormal: median")
+    sigma: float = Field(0.5, ge=0, description="lognormal: shape (tail weight)")
+    max_ms: Optional[float] = Field(None, ge=0, description="Upper bound on any delay")
+
+
+class FaultRule(BaseModel):
+    """Latency and error probabilities for one endpoint."""
+
+    latency: LatencyConfig = LatencyConfig()
+    error_429: float = Field(0.0, ge=0, le=1, description="Probability of 429")
+    error_500: float = Field(0.0, ge=0, le=1, description="Probability of 500")
+    error_503: float = Field(0.0, ge=0, le=1, description="Probability of 503")
+    timeout: float = Field(0.0, ge=0, le=1, description="Probability of a hang then 504")
+    timeout_ms: float = Field(30000.0, ge=0, description="How long a timeout hangs")
+    retry_after_s: int = Field(1, ge=0, description="Retry-After sent with 429/503")
+
+    @model_validator(mode="after")
+    def check_total_probability(self) -> "FaultRule":
+        if sum(getattr(self, kind) for kind in ERROR_KINDS) > 1:
+            raise ValueError("error probabilities must add up to at most 1")
+        return self
+
+
+class FaultConfig(BaseModel):
+    """Complete fault injection configuration."""
+
+    seed: Optional[int] = None
+    rules: Dict[str, FaultRule] = {}
+
+
+class FaultInjector:
+    """
+    Applies the configured rules to API requests.
+
+    Attributes:
+        config (FaultConfig): Active configuration
+        injected (Dict[Tuple[str, str], int]): Count per (rule key, kind),
+            where kind is "latency" or one of ERROR_KINDS
+    """
+
+    def __init__(self, config: Optional[FaultConfig] = None) -> None:
+        self.configure(config or FaultConfig())
+
+    def configure(self, config: FaultConfig) -> None:
+        """Replace the configuration, reseed the generator and reset counters."""
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.injected: Dict[Tuple[str, str], int] = {}
+
+    def rule_for(self, method: str, path: str, name: str) -> Tuple[Optional[str], Optional[FaultRule]]:
+        """
+        Find the rule for an endpoint.
+
+        Returns:
+            Tuple of (matching key, rule), or (None, None) if no rule applies
+        """
+        rules = self.config.rules
+        for key in (f"{method} {path}", path, name, "*"):
+            rule = rules.get(key)
+            if rule is not None:
+                return key, rule
+        return None, None
+
+    def draw_delay(self, latency: LatencyConfig) -> float:
+        """Draw one delay in seconds from the latency distribution."""
+        if latency.distribution == "fixed":
+            ms = latency.ms
+        elif latency.distribution == "normal":
+            ms = max(0.0, self.rng.gauss(latency.mean_ms, latency.stddev_ms))
+        elif latency.distribution == "lognormal":
+            if latency.median_ms <= 0:
+                return 0.0
+            ms = self.rng.lognormvariate(math.log(latency.median_ms), latency.sigma)
+        else:
+            return 0.0
+        if latency.max_ms is not None:
+            ms = min(ms, latency.max_ms)
+        return ms / 1000
+
+    def draw_error(self, rule: FaultRule) -> Optional[str]:
+        """Pick at most one error kind with a single uniform draw."""
+        if not any(getattr(rule, kind) for kind in ERROR_KINDS):
+            return None
+        u = self.rng.random()
+        for kind in ERROR_KINDS:
+            u -= getattr(rule, kind)
+            if u < 0:
+                return kind
+        return None
+
+    def _count(self, key: str, kind: str) -> None:
+        self.injected[(key, kind)] = self.injected.get((key, kind), 0) + 1
+
+    async def apply(self, method: str, path: str, name: str) -> None:
+        """
+        Delay and/or fail the current request according to its rule.
+
+        Raises:
+            HTTPException: 429, 500, 503 or 504 when an error is injected
+        """
+        key, rule = self.rule_for(method, path, name)
+        if rule is None:
+            return
+
+        delay = self.draw_delay(rule.latency)
+        error = self.draw_error(rule)
+        if delay > 0:
+            self._count(key, "latency")
+            await asyncio.sleep(delay)
+        if error is None:
+            return
+
+        self._count(key, error)
+        if error == "timeout":
+            await asyncio.sleep(rule.timeout_ms / 1000)
+            raise HTTPException(status_code=504, detail="Injected fault: upstream timeout")
+        status = int(error.split("_")[1])
+        headers = {"Retry-After": str(rule.retry_after_s)} if status in (429, 503) else None
+        raise HTTPException(
+            status_code=status, detail=f"Injected fault: HTTP {status}", headers=headers
+        )
+
+    def collect(self) -> List[str]:
+        """Exposition lines for `MetricsRegistry.add_collector`."""
+        lines = [
+            "# HELP mock_faults_injected_total Injected delays and errors by rule and kind.",
+            "# TYPE mock_faults_injected_total counter",
+        ]
+        for (key, kind), n in sorted(self.injected.items()):
+            lines.append(f'mock_faults_injected_total{{rule="{key}",kind="{kind}"}} {n}')
+        return lines
+
+
+def load_config(path: str = FAULTS_CONFIG) -> FaultConfig:
+    """Read the initial configuration file, or return an empty config."""
+    if not path:
+        return FaultConfig()
+    with open(path) as f:
+        return FaultConfig.model_validate(json.load(f))
+
+
+INJECTOR = FaultInjector(load_config())
+
+
+async def inject_faults(request: Request) -> None:
+    """
+    Router dependency applying the fault rules to the matched endpoint.
+
+    Args:
+        request: Incoming request, already routed
+
+    Raises:
+        HTTPException: When an error is injected
+    """
+    if not INJECTOR.config.rules:
+        return
+    route = request.scope.get("route")
+    await INJECTOR.apply(
+        request.method, getattr(route, "path", ""), getattr(route, "name", "")
+    )
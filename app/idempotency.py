@@ -0,0 +1,326 @@
+"""
+Idempotency Keys for Booking Creation.
+
+A client that times out and retries BookingWithStripeToken would otherwise
+create a second booking with a new reference. When the request carries an
+`Idempotency-Key` header, the first request for a key runs normally and its
+response is stored; any repeat within IDEMPOTENCY_TTL_S gets the stored
+response replayed byte for byte (with `Idempotent-Replayed: true`). A
+repeat that arrives while the first is still running waits for it instead
+of racing it. Reusing a key for a different request is rejected with 422.
+
+Storage is two-level:
+
+- An in-memory index (at most IDEMPOTENCY_MAX_ENTRIES, least recently used
+  dropped first) plus one future per in-flight key, so repeats handled by
+  the same worker never touch the database.
+- The `idempotency_keys` table, so repeats that land on another worker or
+  arrive after a restart are still recognised. A worker claims a key by
+  inserting a row without a response; others that find such a row poll it
+  for up to IDEMPOTENCY_WAIT_S and then get 409. An unfinished claim is
+  taken over after CLAIM_LEASE_S, so a crashed worker does not block a key.
+
+Expired entries are swept from both levels at most every
+IDEMPOTENCY_SWEEP_S, on the request path. With STORAGE_ENGINE=memory the
+bookings themselves are not persisted, so neither are the keys.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+
+from app.database import engine
+from app.storage import STORAGE_ENGINE
+
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_SWEEP_S = float(os.getenv("IDEMPOTENCY_SWEEP_S", "60"))
+IDEMPOTENCY_WAIT_S = float(os.getenv("IDEMPOTENCY_WAIT_S", "10"))
+
+MAX_KEY_LENGTH = 255
+# How long a claim blocks other workers if its worker dies before completing
+CLAIM_LEASE_S = 60.0
+# How often a request waiting on another worker's claim re-reads the row
+POLL_INTERVAL_S = 0.05
+REPLAY_HEADER = "Idempotent-Replayed"
+
+OUTCOMES = ("stored", "replayed", "waited", "mismatch", "conflict")
+
+CLAIM_SQL = text(
+    "INSERT INTO idempotency_keys (key, fingerprint, status_code, body, expires_at) "
+    "VALUES (:key, :fingerprint, NULL, NULL, :expires_at) "
+    "ON CONFLICT(key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+    "status_code = NULL, body = NULL, expires_at = excluded.expires_at "
+    "WHERE idempotency_keys.expires_at < :now"
+)
+COMPLETE_SQL = text(
+    "UPDATE idempotency_keys SET status_code = :status_code, body = :body, "
+    "expires_at = :expires_at WHERE key = :key"
+)
+RELEASE_SQL = text("DELETE FROM idempotency_keys WHERE key = :key AND status_code IS NULL")
+SELECT_SQL = text(
+    "SELECT fingerprint, status_code, body, expires_at FROM idempotency_keys WHERE key = :key"
+)
+SWEEP_SQL = text("DELETE FROM idempotency_keys WHERE expires_at < :now")
+
+
+class StoredResponse:
+    """A completed response kept for replay."""
+
+    __slots__ = ("fingerprint", "status_code", "body", "expires_at")
+
+    def __init__(self, fingerprint: bytes, status_code: int, body: bytes,
+                 expires_at: float) -> None:
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+        self.expires_at = expires_at
+
+
+async def request_fingerprint(request: Request) -> bytes:
+    """
+    Digest of what makes two requests "the same": method, path and form fields.
+
+    The form has already been parsed for the endpoint, so this reads
+    Starlette's cached copy.
+
+    Returns:
+        bytes: 32-byte SHA-256 digest
+    """
+    form = await request.form()
+    payload = json.dumps(
+        [request.method, request.url.path, sorted(form.multi_items())],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).digest()
+
+
+def render_body(result: Any) -> bytes:
+    """Encode an endpoint result exactly as FastAPI's JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(result), ensure_ascii=False, allow_nan=False,
+        indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class IdempotencyStore:
+    """
+    Runs handlers at most once per idempotency key and replays their responses.
+
+    Args:
+        ttl: Seconds a completed response is replayed
+        max_entries: Size of the in-memory index
+        persist: Also record keys in the `idempotency_keys` table
+
+    Attributes:
+        entries (OrderedDict[str, StoredResponse]): In-memory index, LRU order
+        in_flight (Dict[str, Tuple[bytes, asyncio.Future]]): Fingerprint and
+            completion future of keys being handled by this worker
+        outcomes (Dict[str, int]): Requests per outcome in OUTCOMES
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_S,
+                 max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+                 persist: bool = STORAGE_ENGINE != "memory") -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist = persist
+        self.entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self.in_flight: Dict[str, Tuple[bytes, asyncio.Future]] = {}
+        self.outcomes: Dict[str, int] = dict.fromkeys(OUTCOMES, 0)
+        self.next_sweep = 0.0
+
+    async def run(self, key: str, fingerprint: bytes, handler: Callable[[], Any]) -> Any:
+        """
+        Return the stored response for `key`, or run `handler` and store its result.
+
+        Only successful results are stored; if `handler` raises, the key is
+        released and concurrent waiters get the same exception.
+
+        Args:
+            key: Idempotency-Key header value
+            fingerprint: `request_fingerprint` of the current request
+            handler: Zero-argument function (or coroutine function) producing
+                the response content
+
+        Returns:
+            The handler's result, or a replayed `Response`
+
+        Raises:
+            HTTPException: 400 for an over-long key, 422 if the key was used
+                for a different request, 409 if another worker is still
+                handling it after IDEMPOTENCY_WAIT_S
+        """
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+            )
+        now = time.time()
+        if now >= self.next_sweep:
+            self.sweep(now)
+
+        stored = self.lookup(key, now)
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.check_fingerprint(pending[0], fingerprint)
+            self.outcomes["waited"] += 1
+            return self.replay(await asyncio.shield(pending[1]), fingerprint)
+
+        if self.persist and not self.claim(key, fingerprint, now):
+            return self.replay(await self.wait_for_row(key), fingerprint)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = (fingerprint, future)
+        try:
+            result = handler()
+            if inspect.isawaitable(result):
+                result = await result
+            stored = StoredResponse(fingerprint, 200, render_body(result), time.time() + self.ttl)
+            if self.persist:
+                with engine.begin() as conn:
+                    conn.execute(COMPLETE_SQL, {
+                        "key": key, "status_code": stored.status_code,
+                        "body": stored.body, "expires_at": stored.expires_at,
+                    })
+            self.remember(key, stored)
+            self.outcomes["stored"] += 1
+            future.set_result(stored)
+            return result
+        except BaseException as e:
+            if self.persist:
+                with engine.begin() as conn:
+                    conn.execute(RELEASE_SQL, {"key": key})
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody waited for is not logged
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+
+    def lookup(self, key: str, now: float) -> Optional[StoredResponse]:
+        """Find an unexpired completed response in memory, then in the table."""
+        stored = self.entries.get(key)
+        if stored is not None:
+            if stored.expires_at >= now:
+                self.entries.move_to_end(key)
+                return stored
+            del self.entries[key]
+            return None
+        if not self.persist or key in self.in_flight:
+            return None
+        with engine.connect() as conn:
+            row = conn.execute(SELECT_SQL, {"key": key}).first()
+        if row is None or row.status_code is None or row.expires_at < now:
+            return None
+        stored = StoredResponse(row.fingerprint, row.status_code, row.body, row.expires_at)
+        self.remember(key, stored)
+        return stored
+
+    def remember(self, key: str, stored: StoredResponse) -> None:
+        self.entries[key] = stored
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def claim(self, key: str, fingerprint: bytes, now: float) -> bool:
+        """
+        Insert an in-flight row for `key`, taking over an expired one.
+
+        Returns:
+            bool: False if another unexpired row holds the key
+        """
+        with engine.begin() as conn:
+            result = conn.execute(CLAIM_SQL, {
+                "key": key, "fingerprint": fingerprint,
+                "expires_at": now + CLAIM_LEASE_S, "now": now,
+            })
+        return result.rowcount == 1
+
+    async def wait_for_row(self, key: str) -> StoredResponse:
+        """
+        Poll a key claimed by another worker until it has a response.
+
+        Raises:
+            HTTPException: 409 if it is still in flight after IDEMPOTENCY_WAIT_S
+        """
+        self.outcomes["waited"] += 1
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_S
+        while True:
+            with engine.connect() as conn:
+                row = conn.execute(SELECT_SQL, {"key": key}).first()
+            if row is not None and row.status_code is not None:
+                stored = StoredResponse(row.fingerprint, row.status_code, row.body, row.expires_at)
+                self.remember(key, stored)
+                return stored
+            if row is None or time.monotonic() >= deadline:
+                # Released after a failure, or stuck: let the client retry
+                self.outcomes["conflict"] += 1
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"}
+                )
+            await asyncio.sleep(POLL_INTERVAL_S)
+
+    def check_fingerprint(self, expected: bytes, fingerprint: bytes) -> None:
+        if expected != fingerprint:
+            self.outcomes["mismatch"] += 1
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request"
+            )
+
+    def replay(self, stored: StoredResponse, fingerprint: bytes) -> Response:
+        self.check_fingerprint(stored.fingerprint, fingerprint)
+        self.outcomes["replayed"] += 1
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAY_HEADER: "true"}
+        )
+
+    def sweep(self, now: float) -> None:
+        """Drop expired entries from memory and from the table."""
+        self.next_sweep = now + IDEMPOTENCY_SWEEP_S
+        expired = [key for key, stored in self.entries.items() if stored.expires_at < now]
+        for key in expired:
+            del self.entries[key]
+        if self.persist:
+            with engine.begin() as conn:
+                conn.execute(SWEEP_SQL, {"now": now})
+
+    def collect(self) -> List[str]:
+        """Exposition lines for `MetricsRegistry.add_collector`."""
+        lines = [
+            "# HELP idempotency_requests_total Requests sent with an Idempotency-Key, by outcome.",
+            "# TYPE idempotency_requests_total counter",
+        ]
+        lines += [
+            f'idempotency_requests_total{{outcome="{outcome}"}} {n}'
+            for outcome, n in self.outcomes.items()
+        ]
+        lines += [
+            "# HELP idempotency_keys_cached Completed responses in the in-memory index.",
+            "# TYPE idempotency_keys_cached gauge",
+            f"idempotency_keys_cached {len(self.entries)}",
+        ]
+        return lines
+
+
+IDEMPOTENCY = IdempotencyStore()
@@ -5,14 +5,103 @@ This module handles database table creation and population with sample data
 for the restaurant booking mock API. It sets up realistic test data including
 restaurants, availability slots, and cancellation reasons.
 
+On application startup `ensure_database()` compares the schema version and
+seed fingerprint stored in the `schema_meta` table with the values below and
+returns immediately when they match, so restarts against an existing database
+do no schema or seed work.
+
+In in-memory mode the seeded database is saved once as an image file in the
+temp directory and later startups load it with SQLite's backup API. Saving
+a new image removes the older ones.
+
 Author: AI Assistant
 """
 
+import glob
+import hashlib
+import json
+import os
 import random
+import sqlite3
+import tempfile
 from datetime import time, datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine, SessionLocal, IN_MEMORY
+from app.models import (
+    Base, Restaurant, AvailabilitySlot, Booking, CancellationReason, SchemaMeta
+)
+
+# Bump whenever models.py changes in a way that needs create_all to run again
+SCHEMA_VERSION = "2"
+
+# File name prefix of in-memory seed images in the temp directory
+SEED_IMAGE_PREFIX = "restaurant_booking_seed_v"
+
+# Sample data definition - changing any of these changes the seed fingerprint
+SAMPLE_RESTAURANT = "TheHungryUnicorn"
+SAMPLE_DAYS = 30
+SAMPLE_TIMES = [
+    time(12, 0),   # 12:00 PM
+    time(12, 30),  # 12:30 PM
+    time(13, 0),   # 1:00 PM
+    time(13, 30),  # 1:30 PM
+    time(19, 0),   # 7:00 PM
+    time(19, 30),  # 7:30 PM
+    time(20, 0),   # 8:00 PM
+    time(20, 30),  # 8:30 PM
+]
+CANCELLATION_REASONS = [
+    {
+        "id": 1,
+        "reason": "Customer Request",
+        "description": "Customer requested cancellation"
+    },
+    {
+        "id": 2,
+        "reason": "Restaurant Closure",
+        "description": "Restaurant temporarily closed"
+    },
+    {
+        "id": 3,
+        "reason": "Weather",
+        "description": "Cancelled due to weather conditions"
+    },
+    {"id": 4, "reason": "Emergency", "description": "Emergency cancellation"},
+    {"id": 5, "reason": "No Show", "description": "Customer did not show up"}
+]
+
+
+def seed_fingerprint() -> str:
+    """
+    Compute a stable fingerprint of the sample data definition.
 
-from app.database import engine, SessionLocal
-from app.models import Base, Restaurant, AvailabilitySlot, CancellationReason
+    Returns:
+        str: Hex SHA-256 digest of the restaurant, slot and reason definitions
+    """
+    payload = json.dumps(
+        {
+            "restaurant": SAMPLE_RESTAURANT,
+            "days": SAMPLE_DAYS,
+            "times": [t.isoformat() for t in SAMPLE_TIMES],
+            "reasons": CANCELLATION_REASONS,
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def expected_meta() -> Dict[str, str]:
+    """
+    Get the schema_meta values a fully initialised database should contain.
+
+    Returns:
+        Dict mapping meta keys to their expected values
+    """
+    return {"schema_version": SCHEMA_VERSION, "seed_fingerprint": seed_fingerprint()}
 
 
 def create_tables() -> None:
@@ -25,7 +114,38 @@ def create_tables() -> None:
     Base.metadata.create_all(bind=engine)
 
 
-def init_sample_data() -> None:
+def is_database_current() -> bool:
+    """
+    Check whether the stored schema version and seed fingerprint are current.
+
+    Uses a single raw query so the check costs one round trip. A missing
+    `schema_meta` table (fresh database) counts as not current.
+
+    Returns:
+        bool: True if both stored values match `expected_meta()`
+    """
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT key, value FROM schema_meta")).all()
+    except SQLAlchemyError:
+        return False
+    return dict(rows) == expected_meta()
+
+
+def record_database_meta() -> None:
+    """
+    Store the current schema version and seed fingerprint in `schema_meta`.
+    """
+    db = SessionLocal()
+    try:
+        for key, value in expected_meta().items():
+            db.merge(SchemaMeta(key=key, value=value))
+        db.commit()
+    finally:
+        db.close()
+
+
+def init_sample_data() -> bool:
     """
     Initialize database with sample data for testing.
 
@@ -37,6 +157,9 @@ def init_sample_data() -> None:
     - 30 days of availability slots with lunch and dinner times
     - 5 predefined cancellation reasons
 
+    Returns:
+        bool: True if sample data is present after the call, False on failure
+
     Raises:
         Exception: If database operations fail (logged and rolled back)
     """
@@ -46,34 +169,23 @@ def init_sample_data() -> None:
         # Check if data already exists
         if db.query(Restaurant).first():
             print("Sample data already exists, skipping initialization")
-            return
+            return True
 
         # Create sample restaurant
         restaurant = Restaurant(
-            name="TheHungryUnicorn",
-            microsite_name="TheHungryUnicorn"
+            name=SAMPLE_RESTAURANT,
+            microsite_name=SAMPLE_RESTAURANT
         )
         db.add(restaurant)
         db.commit()
         db.refresh(restaurant)
 
         # Create sample availability slots for the next 30 days
-        sample_times = [
-            time(12, 0),   # 12:00 PM
-            time(12, 30),  # 12:30 PM
-            time(13, 0),   # 1:00 PM
-            time(13, 30),  # 1:30 PM
-            time(19, 0),   # 7:00 PM
-            time(19, 30),  # 7:30 PM
-            time(20, 0),   # 8:00 PM
-            time(20, 30),  # 8:30 PM
-        ]
-
         start_date = datetime.now().date()
 
-        for i in range(30):  # Next 30 days
+        for i in range(SAMPLE_DAYS):
             current_date = start_date + timedelta(days=i)
-            for slot_time in sample_times:
+            for slot_time in SAMPLE_TIMES:
                 # Randomly make some slots unavailable
                 available = random.random() > 0.2  # 80% availability
 
@@ -87,36 +199,156 @@ def init_sample_data() -> None:
                 db.add(slot)
 
         # Create sample cancellation reasons
-        cancellation_reasons = [
-            {
-                "id": 1,
-                "reason": "Customer Request",
-                "description": "Customer requested cancellation"
-            },
-            {
-                "id": 2,
-                "reason": "Restaurant Closure",
-                "description": "Restaurant temporarily closed"
-            },
-            {
-                "id": 3,
-                "reason": "Weather",
-                "description": "Cancelled due to weather conditions"
-            },
-            {"id": 4, "reason": "Emergency", "description": "Emergency cancellation"},
-            {"id": 5, "reason": "No Show", "description": "Customer did not show up"}
-        ]
-
-        for reason_data in cancellation_reasons:
+        for reason_data in CANCELLATION_REASONS:
             reason = CancellationReason(**reason_data)
             db.add(reason)
 
         db.commit()
         print("Database initialized with sample data successfully!")
+        return True
 
     except Exception as e:
         print(f"Error initializing database: {e}")
         db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def seed_image_path() -> str:
+    """
+    Get the path of the pre-built seed image for in-memory mode.
+
+    The name includes the schema version, seed fingerprint and today's date
+    (slots are seeded relative to today), so a stale image is never loaded.
+
+    Returns:
+        str: Path in the system temp directory
+    """
+    meta = expected_meta()
+    name = (
+        f"{SEED_IMAGE_PREFIX}{meta['schema_version']}_"
+        f"{meta['seed_fingerprint'][:12]}_{datetime.now().date():%Y%m%d}.db"
+    )
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def load_seed_image() -> bool:
+    """
+    Copy the pre-built seed image into the in-memory database.
+
+    Returns:
+        bool: True if an image was found and loaded
+    """
+    path = seed_image_path()
+    if not os.path.exists(path):
+        return False
+
+    raw = engine.raw_connection()
+    try:
+        src = sqlite3.connect(path)
+        try:
+            src.backup(raw.driver_connection)
+        finally:
+            src.close()
+    finally:
+        raw.close()
+    return True
+
+
+def save_seed_image() -> None:
+    """
+    Save the current in-memory database as the seed image for later runs.
+
+    Writes to a temporary file first and renames it into place, so concurrent
+    test runs never see a partially written image. Images from earlier days,
+    schema versions or seed definitions are then deleted.
+    """
+    path = seed_image_path()
+    fd, tmp_path = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(path))
+    os.close(fd)
+
+    raw = engine.raw_connection()
+    try:
+        dst = sqlite3.connect(tmp_path)
+        try:
+            raw.driver_connection.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        raw.close()
+    os.replace(tmp_path, path)
+    remove_old_seed_images(keep=path)
+
+
+def remove_old_seed_images(keep: str) -> None:
+    """
+    Delete seed images other than `keep` from its directory.
+
+    Args:
+        keep: Path of the current seed image
+    """
+    pattern = os.path.join(os.path.dirname(keep), f"{SEED_IMAGE_PREFIX}*.db")
+    for old in glob.glob(pattern):
+        if old != keep:
+            try:
+                os.remove(old)
+            except OSError:
+                pass  # already removed by a concurrent run
+
+
+def ensure_database() -> bool:
+    """
+    Bring the database up to date, doing no work if it already is.
+
+    Fast path: one query against `schema_meta`. Slow path (fresh database,
+    schema bump or changed seed definition): create tables, seed sample data
+    and record the new meta values. In in-memory mode the seed image is
+    loaded first, and saved after a slow-path seed.
+
+    Returns:
+        bool: True if the fast path was taken
+    """
+    if IN_MEMORY:
+        load_seed_image()
+
+    if is_database_current():
+        return True
+
+    create_tables()
+    if init_sample_data():
+        record_database_meta()
+        if IN_MEMORY:
+            save_seed_image()
+    return False
+
+
+def warm_caches() -> None:
+    """
+    Warm the connection pool and SQLAlchemy's compiled statement cache.
+
+    Runs the restaurant lookup and per-slot booking count used by the routers
+    once, so the first real request does not pay connection setup and query
+    compilation costs.
+    """
+    db = SessionLocal()
+    try:
+        restaurant = db.query(Restaurant).filter(
+            Restaurant.name == SAMPLE_RESTAURANT
+        ).first()
+        if restaurant:
+            today = datetime.now().date()
+            db.query(AvailabilitySlot).filter(
+                AvailabilitySlot.restaurant_id == restaurant.id,
+                AvailabilitySlot.date == today,
+                AvailabilitySlot.max_party_size >= 1
+            ).all()
+            db.query(Booking).filter(
+                Booking.restaurant_id == restaurant.id,
+                Booking.visit_date == today,
+                Booking.visit_time == SAMPLE_TIMES[0],
+                Booking.status == "confirmed"
+            ).count()
     finally:
         db.close()
 
@@ -125,5 +357,6 @@ if __name__ == "__main__":
     print("Creating database tables...")
     create_tables()
     print("Initializing sample data...")
-    init_sample_data()
+    if init_sample_data():
+        record_database_meta()
     print("Database setup complete!")
@@ -9,14 +9,45 @@ Author: AI Assistant
 Version: 1.0.0
 """
 
+import os
+import tracemalloc
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
-from app.routers import availability, booking
 from app.database import engine
-from app.models import Base
-import app.init_db as init_db
+from app.coalescing import AVAILABILITY_FLIGHTS
+from app.faults import INJECTOR
+from app.idempotency import IDEMPOTENCY
+from app import slow_queries
+from app.admission import ADMISSION, ADMISSION_ENABLED, AdmissionMiddleware
+from app.allocations import ALLOC_METRICS, ALLOCATION_METRICS, AllocationMiddleware
+from app.routers import admin, availability, booking, debug, metrics
+from app.metrics import METRICS_ENABLED, REGISTRY, MetricsMiddleware
+from app.query_stats import QueryStatsMiddleware
+from app.storage import init_storage
+from app.tracing import Tracer, TracingMiddleware, instrument_engine
+
+# Set PRERENDER_OPENAPI=1 to build the OpenAPI schema during startup instead
+# of on the first /docs or /openapi.json request
+PRERENDER_OPENAPI = os.getenv("PRERENDER_OPENAPI", "").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Run the startup pipeline before the application starts serving requests.
+
+    Prepares the selected storage engine (for SQLAlchemy: skips schema
+    creation and seeding when the stored schema version and seed fingerprint
+    are current, then warms the in-process caches) and optionally pre-renders
+    the OpenAPI schema.
+    """
+    init_storage()
+    if PRERENDER_OPENAPI:
+        app.openapi()
+    yield
 
-# Create database tables on startup
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Restaurant Booking Mock API",
@@ -26,23 +57,50 @@ app = FastAPI(
     ),
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Include API routers
 app.include_router(availability.router)
 app.include_router(booking.router)
+app.include_router(admin.router)
+app.include_router(debug.router)
 
+# Log statements slower than SLOW_QUERY_MS with their query plan (off unless set)
+slow_queries.instrument_engine(engine)
 
-@app.on_event("startup")
-async def startup_event() -> None:
-    """
-    Initialize database with sample data on application startup.
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+    # Opt-in per-route allocation metric; inside the metrics middleware so
+    # its own bookkeeping is not counted
+    if ALLOC_METRICS:
+        tracemalloc.start(1)
+        app.add_middleware(AllocationMiddleware)
+        REGISTRY.add_collector(ALLOCATION_METRICS.collect)
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.add_collector(INJECTOR.collect)
+    REGISTRY.add_collector(IDEMPOTENCY.collect)
+    REGISTRY.add_collector(AVAILABILITY_FLIGHTS.collect)
 
-    This function is called once when the FastAPI application starts.
-    It ensures the database contains sample restaurant data and availability slots.
-    """
-    init_db.init_sample_data()
+# Added after the metrics middleware so it wraps it and its QueryStats is visible there
+app.add_middleware(QueryStatsMiddleware)
+
+# Tracing is enabled by TRACE_FILE; added last so the server span covers
+# everything else, including SQL statement spans from the instrumented engine
+tracer = Tracer("api")
+if tracer.enabled:
+    instrument_engine(engine, tracer)
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Admission control is outermost so shed requests are rejected before any
+# other middleware does work for them
+if ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware, routes=availability.router.routes + booking.router.routes
+    )
+    if METRICS_ENABLED:
+        REGISTRY.add_collector(ADMISSION.collect)
 
 
 @app.get("/", summary="API Information", tags=["Root"])
@@ -78,6 +136,10 @@ async def root() -> dict:
                 "/api/ConsumerApi/v1/Restaurant/{restaurant_name}/Booking/"
                 "{booking_reference}"
             ),
+            "metrics": "/metrics",
+            "slow_queries": "/admin/slow-queries",
+            "profile": "/debug/profile",
+            "faults": "/admin/faults",
             "docs": "/docs",
             "redoc": "/redoc"
         }
@@ -0,0 +1,202 @@
+"""
+Request Metrics for the Restaurant Booking API.
+
+Collects per-route request counts by status code, latency histograms and
+database time per request, plus in-flight gauges per HTTP method (the route
+is only known once routing has run), and renders them in the Prometheus text
+exposition format for the /metrics endpoint.
+
+Collection is done by a plain ASGI middleware. Each (method, route) series is
+created once with preallocated histogram buckets, so recording a request is
+a handful of integer updates. Metrics are per process; in production mode
+each worker reports its own.
+
+Set METRICS_ENABLED=0 to turn collection and the endpoint off.
+
+Author: AI Assistant
+"""
+
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database import current_query_stats
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Histogram upper bounds in seconds; +Inf is implicit
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with preallocated, non-cumulative bucket counts.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Bucket upper bounds, LATENCY_BUCKETS by default
+        counts (List[int]): One count per bucket plus a final +Inf bucket
+        total (float): Sum of observed values
+    """
+
+    __slots__ = ("buckets", "counts", "total")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class RouteSeries:
+    """
+    All metrics for one (method, route template) pair.
+
+    Attributes:
+        labels (str): Pre-rendered Prometheus label set
+        statuses (Dict[int, int]): Completed requests per status code
+        latency (Histogram): Request duration
+        db_time (Histogram): Database time per request
+    """
+
+    __slots__ = ("labels", "statuses", "latency", "db_time")
+
+    def __init__(self, method: str, route: str) -> None:
+        self.labels = f'method="{method}",route="{route}"'
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram()
+        self.db_time = Histogram()
+
+
+class MetricsRegistry:
+    """
+    Holds every route series plus extra collectors contributed by other modules.
+    """
+
+    def __init__(self) -> None:
+        self.series: Dict[Tuple[str, str], RouteSeries] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def get_series(self, method: str, route: str) -> RouteSeries:
+        key = (method, route)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RouteSeries(method, route)
+        return series
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """
+        Register a function returning extra exposition lines (with their
+        own # HELP/# TYPE headers) to append to the /metrics output.
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        series = list(self.series.values())
+        lines = [
+            "# HELP http_requests_total Completed HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for s in series:
+            for status, n in sorted(s.statuses.items()):
+                lines.append(f'http_requests_total{{{s.labels},status="{status}"}} {n}')
+
+        lines += [
+            "# HELP http_requests_in_flight HTTP requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [
+            f'http_requests_in_flight{{method="{method}"}} {n}'
+            for method, n in sorted(self.in_flight.items())
+        ]
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for s in series:
+            lines += s.latency.render("http_request_duration_seconds", s.labels)
+
+        lines += [
+            "# HELP http_request_db_duration_seconds Database time per HTTP request.",
+            "# TYPE http_request_db_duration_seconds histogram",
+        ]
+        for s in series:
+            lines += s.db_time.render("http_request_db_duration_seconds", s.labels)
+
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request metrics into a `MetricsRegistry`.
+
+    Series are labelled with the matched route's path template (read from
+    the scope after routing), so booking references never become labels.
+    Database time is read from the request's `QueryStats`, installed by
+    `QueryStatsMiddleware`, which must wrap this middleware.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = REGISTRY) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight[method] = registry.in_flight.get(method, 0) + 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight[method] -= 1
+            stats = current_query_stats.get()
+
+            route = scope.get("route")
+            series = registry.get_series(
+                method, getattr(route, "path", None) or UNMATCHED_ROUTE
+            )
+            series.latency.observe(elapsed)
+            series.db_time.observe(stats.seconds if stats else 0.0)
+            series.statuses[status] = series.statuses.get(status, 0) + 1
@@ -12,7 +12,8 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, Date, Time, Text, ForeignKey
+    Column, Integer, String, DateTime, Boolean, Date, Time, Text, ForeignKey,
+    Float, LargeBinary
 )
 from sqlalchemy.orm import relationship
 
@@ -187,3 +188,49 @@ class CancellationReason(Base):
     id = Column(Integer, primary_key=True, index=True)
     reason = Column(String, nullable=False)
     description = Column(Text)
+
+
+class SchemaMeta(Base):
+    """
+    Key/value store for database bookkeeping used by the startup pipeline.
+
+    Records the schema version and the fingerprint of the sample data that
+    were applied, so a restart can skip table creation and seeding when the
+    database is already current.
+
+    Attributes:
+        key (str): Primary key, e.g. "schema_version" or "seed_fingerprint"
+        value (str): Stored value
+    """
+
+    __tablename__ = "schema_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """
+    Stored outcome of a request sent with an Idempotency-Key header.
+
+    Rows are written when a request claims a key and completed with its
+    response, so retries (from any worker, or after a restart) replay it
+    instead of repeating the write. A row without a status is still in
+    flight. Kept compact: a binary digest instead of the request, and the
+    response as the exact JSON bytes sent.
+
+    Attributes:
+        key (str): Client-supplied idempotency key
+        fingerprint (bytes): SHA-256 of the method, path and form fields
+        status_code (int): Response status, or None while in flight
+        body (bytes): JSON response body, or None while in flight
+        expires_at (float): Unix time after which the row may be swept
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(LargeBinary, nullable=False)
+    status_code = Column(Integer)
+    body = Column(LargeBinary)
+    expires_at = Column(Float, nullable=False, index=True)
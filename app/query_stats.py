@@ -0,0 +1,82 @@
+"""
+Per-Request Query Statistics.
+
+Reports how many SQL statements a request ran and how long they took, using
+the cursor-execute hooks in `app.database`:
+
+- Every response carries `X-Query-Count` and `X-DB-Time-Ms` headers.
+- With API_DEBUG=1, a warning is logged when one statement shape runs more
+  than N_PLUS_ONE_THRESHOLD times (default 5) in a single request, which is
+  the signature of an N+1 query pattern.
+
+Author: AI Assistant
+"""
+
+import logging
+import os
+from collections import Counter
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database import QueryStats, current_query_stats
+
+API_DEBUG = os.getenv("API_DEBUG", "").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+def report_repeated_statements(
+    stats: QueryStats, method: str, path: str, threshold: int = N_PLUS_ONE_THRESHOLD
+) -> None:
+    """
+    Log a warning for each statement shape run more than `threshold` times.
+
+    Args:
+        stats: Query statistics for the finished request
+        method: HTTP method of the request
+        path: Request path
+        threshold: Maximum executions of one shape before warning
+    """
+    for statement, n in (stats.shapes or {}).items():
+        if n > threshold:
+            logger.warning(
+                "Possible N+1 query: %s %s ran the same statement %d times: %s",
+                method, path, n, " ".join(statement.split())
+            )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that collects `QueryStats` for each request and adds
+    `X-Query-Count` / `X-DB-Time-Ms` response headers.
+    """
+
+    def __init__(self, app: ASGIApp, debug: bool = API_DEBUG) -> None:
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(shapes=Counter() if self.debug else None, scope=scope)
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append(
+                    (b"x-db-time-ms", f"{stats.seconds * 1000:.3f}".encode())
+                )
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            if self.debug:
+                report_repeated_statements(stats, scope["method"], scope["path"])
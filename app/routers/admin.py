@@ -0,0 +1,274 @@
+"""
+Admin Router for Restaurant Booking API.
+
+Operational endpoints for diagnosing the running server. They are disabled
+unless ADMIN_TOKEN is set, and every request must send that value in the
+X-Admin-Token header.
+
+Author: AI Assistant
+"""
+
+import os
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app import allocations, slow_queries
+from app.faults import INJECTOR, FaultConfig
+from app.routers import availability, booking
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# Handlers of these routers are recognised when grouping allocations by route
+route_index = allocations.RouteIndex(availability.router.routes + booking.router.routes)
+
+GROUP_BY_PATTERN = "^(lineno|route)$"
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)) -> str:
+    """
+    Verify the X-Admin-Token header against ADMIN_TOKEN.
+
+    Args:
+        x_admin_token: The X-Admin-Token header value
+
+    Returns:
+        str: The validated token
+
+    Raises:
+        HTTPException: 403 if admin endpoints are disabled (no ADMIN_TOKEN)
+        HTTPException: 401 if the header is missing or wrong
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them"
+        )
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    return x_admin_token
+
+
+@router.get("/slow-queries", summary="Slow Query Log")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum entries to return"),
+    route: Optional[str] = Query(None, description="Only entries from this route template"),
+    min_ms: float = Query(0.0, ge=0, description="Only entries at least this slow"),
+    full_scan: Optional[bool] = Query(None, description="Filter on full table scans"),
+    token: str = Depends(verify_admin_token)
+) -> Dict[str, Any]:
+    """
+    Get the most recent slow-query log entries, newest first.
+
+    Reads the rotating log file, so entries from every worker process are
+    included.
+
+    Args:
+        limit: Maximum entries to return
+        route: Route template filter, e.g. "/api/ConsumerApi/v1/Restaurant/{restaurant_name}/AvailabilitySearch"
+        min_ms: Minimum statement duration in milliseconds
+        full_scan: If set, only entries whose plan does (True) or does not
+            (False) contain a full table scan
+        token: Admin token dependency
+
+    Returns:
+        Dict with the logging threshold and the matching entries
+    """
+    entries = [
+        e for e in slow_queries.read_entries()
+        if (route is None or e.get("route") == route)
+        and e.get("duration_ms", 0) >= min_ms
+        and (full_scan is None or e.get("full_scan") == full_scan)
+    ]
+    entries = entries[-limit:][::-1]
+    return {
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "log_file": os.path.abspath(slow_queries.SLOW_QUERY_LOG),
+        "count": len(entries),
+        "entries": entries,
+    }
+
+
+@router.get("/memory", summary="Allocation Tracing Status")
+async def memory_status(token: str = Depends(verify_admin_token)) -> Dict[str, Any]:
+    """
+    Get the tracemalloc state of this worker.
+
+    Args:
+        token: Admin token dependency
+
+    Returns:
+        Dict with tracing flag, frame limit, traced and peak bytes and the
+        ids of stored snapshots
+    """
+    return allocations.status()
+
+
+@router.post("/memory/start", summary="Start Allocation Tracing")
+async def memory_start(
+    frames: int = Query(allocations.ALLOC_TRACE_FRAMES, ge=1, le=100,
+                        description="Stack frames kept per allocation"),
+    token: str = Depends(verify_admin_token)
+) -> Dict[str, Any]:
+    """
+    Start tracemalloc in this worker.
+
+    Grouping by route needs enough frames to reach the route handler from
+    the allocating line; 25 is usually enough for ORM hydration.
+
+    Args:
+        frames: Stack frames kept per allocation
+        token: Admin token dependency
+
+    Returns:
+        Dict with the new tracing status
+    """
+    allocations.start_tracing(frames)
+    return allocations.status()
+
+
+@router.post("/memory/stop", summary="Stop Allocation Tracing")
+async def memory_stop(token: str = Depends(verify_admin_token)) -> Dict[str, Any]:
+    """
+    Stop tracemalloc in this worker and drop stored snapshots.
+
+    Args:
+        token: Admin token dependency
+
+    Returns:
+        Dict with the new tracing status
+    """
+    allocations.stop_tracing()
+    return allocations.status()
+
+
+@router.post("/memory/snapshot", summary="Take Allocation Snapshot")
+async def memory_snapshot(
+    group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(20, ge=1, le=500),
+    token: str = Depends(verify_admin_token)
+) -> Dict[str, Any]:
+    """
+    Take a snapshot of live traced allocations and show the largest.
+
+    Args:
+        group_by: "lineno" (source line) or "route" (route handler on the stack)
+        limit: Maximum entries returned
+        token: Admin token dependency
+
+    Returns:
+        Dict with the snapshot id and its top entries
+
+    Raises:
+        HTTPException: 409 if tracing has not been started
+    """
+    try:
+        snapshot_id = allocations.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "snapshot_id": snapshot_id,
+        "group_by": group_by,
+        "top": allocations.top(snapshot_id, group_by, route_index, limit),
+    }
+
+
+@router.get("/memory/diff", summary="Diff Allocation Snapshots")
+async def memory_diff(
+    base: int = Query(..., description="Earlier snapshot id"),
+    target: Optional[int] = Query(None, description="Later snapshot id; default: take one now"),
+    group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(20, ge=1, le=500),
+    token: str = Depends(verify_admin_token)
+) -> Dict[str, Any]:
+    """
+    Compare two snapshots and show where allocations grew or shrank.
+
+    Args:
+        base: Earlier snapshot id
+        target: Later snapshot id; a new snapshot is taken when omitted
+        group_by: "lineno" (source line) or "route" (route handler on the stack)
+        limit: Maximum entries returned
+        token: Admin token dependency
+
+    Returns:
+        Dict with both snapshot ids and the entries, largest change first
+
+    Raises:
+        HTTPException: 404 if a snapshot id is unknown
+        HTTPException: 409 if tracing has not been started
+    """
+    if target is None:
+        try:
+            target = allocations.take_snapshot()
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    try:
+        entries = allocations.diff(base, target, group_by, route_index, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot id {e}")
+    return {"base": base, "target": target, "group_by": group_by, "entries": entries}
+
+
+def _fault_state() -> Dict[str, Any]:
+    return {
+        "config": INJECTOR.config.model_dump(),
+        "injected": [
+            {"rule": key, "kind": kind, "count": n}
+            for (key, kind), n in sorted(INJECTOR.injected.items())
+        ],
+    }
+
+
+@router.get("/faults", summary="Fault Injection Configuration")
+async def get_faults(token: str = Depends(verify_admin_token)) -> Dict[str, Any]:
+    """
+    Get the active fault injection rules and how often each has fired.
+
+    Args:
+        token: Admin token dependency
+
+    Returns:
+        Dict with the configuration and injected counts per rule and kind
+    """
+    return _fault_state()
+
+
+@router.put("/faults", summary="Replace Fault Injection Configuration")
+async def put_faults(
+    config: FaultConfig,
+    token: str = Depends(verify_admin_token)
+) -> Dict[str, Any]:
+    """
+    Replace the fault injection rules of this worker.
+
+    Reseeds the random generator from `config.seed` and resets the counters,
+    so the same config and request sequence reproduce the same faults.
+
+    Args:
+        config: New configuration
+        token: Admin token dependency
+
+    Returns:
+        Dict with the new configuration
+    """
+    INJECTOR.configure(config)
+    return _fault_state()
+
+
+@router.delete("/faults", summary="Disable Fault Injection")
+async def delete_faults(token: str = Depends(verify_admin_token)) -> Dict[str, Any]:
+    """
+    Remove all fault injection rules from this worker.
+
+    Args:
+        token: Admin token dependency
+
+    Returns:
+        Dict with the (empty) configuration
+    """
+    INJECTOR.configure(FaultConfig())
+    return _fault_state()
@@ -8,15 +8,20 @@ Author: AI Assistant
 """
 
 from datetime import date
-from typing import Dict, Any
+from typing import Any, Dict, List, Tuple
 
 from fastapi import APIRouter, Form, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
-from app.models import Restaurant, AvailabilitySlot, Booking
+from app.coalescing import AVAILABILITY_COALESCE, AVAILABILITY_FLIGHTS
+from app.faults import inject_faults
+from app.storage import STORAGE_ENGINE, BookingStore, get_store, open_store
 
-router = APIRouter(prefix="/api/ConsumerApi/v1/Restaurant", tags=["availability"])
+router = APIRouter(
+    prefix="/api/ConsumerApi/v1/Restaurant",
+    tags=["availability"],
+    dependencies=[Depends(inject_faults)]
+)
 
 # Fixed mock bearer token for authentication
 MOCK_BEARER_TOKEN = (
@@ -66,7 +71,7 @@ async def availability_search(
     VisitDate: date = Form(..., description="Visit date in YYYY-MM-DD format"),
     PartySize: int = Form(..., description="Number of people in the party"),
     ChannelCode: str = Form(..., description="Booking channel (e.g., 'ONLINE')"),
-    db: Session = Depends(get_db),
+    store: BookingStore = Depends(get_store),
     token: str = Depends(verify_token)
 ) -> Dict[str, Any]:
     """
@@ -81,7 +86,7 @@ async def availability_search(
         VisitDate: The desired visit date
         PartySize: Number of people in the party
         ChannelCode: The booking channel identifier
-        db: Database session dependency
+        store: Storage engine dependency
         token: Authentication token dependency
 
     Returns:
@@ -91,28 +96,77 @@ async def availability_search(
         HTTPException: 404 if restaurant not found
         HTTPException: 401 if authentication fails
     """
+    # The in-memory engine answers in microseconds and is not thread-safe,
+    # so only SQL lookups are coalesced (and moved to the thread pool). The
+    # shared search outlives this request if its client goes away, so it
+    # uses its own session rather than `store`
+    if not AVAILABILITY_COALESCE or STORAGE_ENGINE == "memory":
+        restaurant_id, available_slots = find_available_slots(
+            store, restaurant_name, VisitDate, PartySize
+        )
+    else:
+        restaurant_id, available_slots = await AVAILABILITY_FLIGHTS.do(
+            (restaurant_name, VisitDate, PartySize),
+            lambda: run_in_threadpool(
+                find_available_slots_in_own_store, restaurant_name, VisitDate, PartySize
+            )
+        )
+
+    return {
+        "restaurant": restaurant_name,
+        "restaurant_id": restaurant_id,
+        "visit_date": VisitDate,
+        "party_size": PartySize,
+        "channel_code": ChannelCode,
+        "available_slots": available_slots,
+        "total_slots": len(available_slots)
+    }
+
+
+def find_available_slots_in_own_store(
+    restaurant_name: str, visit_date: date, party_size: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """`find_available_slots` with a store opened and closed for this search alone."""
+    with open_store() as store:
+        return find_available_slots(store, restaurant_name, visit_date, party_size)
+
+
+def find_available_slots(
+    store: BookingStore, restaurant_name: str, visit_date: date, party_size: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Look up a restaurant's slots for a date and party size with their booking counts.
+
+    Concurrent identical searches share one call, so the result must not
+    depend on anything but these arguments and must not be mutated.
+
+    Args:
+        store: Storage engine
+        restaurant_name: The name of the restaurant
+        visit_date: The desired visit date
+        party_size: Number of people in the party
+
+    Returns:
+        Tuple of (restaurant id, slot dicts as returned in `available_slots`)
+
+    Raises:
+        HTTPException: 404 if restaurant not found
+    """
     # Find restaurant by name
-    restaurant = db.query(Restaurant).filter(Restaurant.name == restaurant_name).first()
+    restaurant = store.get_restaurant(restaurant_name)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     # Get availability slots for the requested date
-    slots = db.query(AvailabilitySlot).filter(
-        AvailabilitySlot.restaurant_id == restaurant.id,
-        AvailabilitySlot.date == VisitDate,
-        AvailabilitySlot.max_party_size >= PartySize
-    ).all()
+    slots = store.get_slots(restaurant.id, visit_date, party_size)
 
     # Check for existing bookings at each slot time
     available_slots = []
     for slot in slots:
         # Count existing bookings for this time slot
-        existing_bookings = db.query(Booking).filter(
-            Booking.restaurant_id == restaurant.id,
-            Booking.visit_date == VisitDate,
-            Booking.visit_time == slot.time,
-            Booking.status == "confirmed"
-        ).count()
+        existing_bookings = store.count_confirmed_bookings(
+            restaurant.id, visit_date, slot.time
+        )
 
         # Simple logic: allow up to 3 bookings per time slot
         max_bookings_per_slot = 3
@@ -125,12 +179,4 @@ async def availability_search(
             "current_bookings": existing_bookings
         })
 
-    return {
-        "restaurant": restaurant_name,
-        "restaurant_id": restaurant.id,
-        "visit_date": VisitDate,
-        "party_size": PartySize,
-        "channel_code": ChannelCode,
-        "available_slots": available_slots,
-        "total_slots": len(available_slots)
-    }
+    return restaurant.id, available_slots
@@ -12,14 +12,18 @@ import string
 from datetime import date, time, datetime
 from typing import Optional
 
-from fastapi import APIRouter, Form, HTTPException, Depends, Header
+from fastapi import APIRouter, Form, HTTPException, Depends, Header, Request
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Restaurant, Customer, Booking, CancellationReason
+from app.faults import inject_faults
+from app.idempotency import IDEMPOTENCY, request_fingerprint
+from app.storage import BookingStore, get_store
 
-router = APIRouter(prefix="/api/ConsumerApi/v1/Restaurant", tags=["booking"])
+router = APIRouter(
+    prefix="/api/ConsumerApi/v1/Restaurant",
+    tags=["booking"],
+    dependencies=[Depends(inject_faults)]
+)
 
 # Fixed mock bearer token for authentication
 MOCK_BEARER_TOKEN = (
@@ -90,6 +94,7 @@ class CustomerData(BaseModel):
 
 @router.post("/{restaurant_name}/BookingWithStripeToken")
 async def create_booking_with_stripe(
+    request: Request,
     restaurant_name: str,
     VisitDate: date = Form(...),
     VisitTime: time = Form(...),
@@ -131,94 +136,97 @@ async def create_booking_with_stripe(
     RestaurantSmsMarketingOptInText: Optional[str] = Form(
         None, alias="Customer[RestaurantSmsMarketingOptInText]"
     ),
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    store: BookingStore = Depends(get_store),
     token: str = Depends(verify_token)
 ):
     """
     Create a new booking with Stripe payment token
-    """
-    # Find restaurant
-    restaurant = db.query(Restaurant).filter(Restaurant.name == restaurant_name).first()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    # Create or find customer
-    customer = None
-    if Email:
-        customer = db.query(Customer).filter(Customer.email == Email).first()
-
-    if not customer:
-        customer = Customer(
-            title=Title,
-            first_name=FirstName,
-            surname=Surname,
-            mobile_country_code=MobileCountryCode,
-            mobile=Mobile,
-            phone_country_code=PhoneCountryCode,
-            phone=Phone,
-            email=Email,
-            receive_email_marketing=ReceiveEmailMarketing or False,
-            receive_sms_marketing=ReceiveSmsMarketing or False,
-            group_email_marketing_opt_in_text=GroupEmailMarketingOptInText,
-            group_sms_marketing_opt_in_text=GroupSmsMarketingOptInText,
-            receive_restaurant_email_marketing=ReceiveRestaurantEmailMarketing or False,
-            receive_restaurant_sms_marketing=ReceiveRestaurantSmsMarketing or False,
-            restaurant_email_marketing_opt_in_text=RestaurantEmailMarketingOptInText,
-            restaurant_sms_marketing_opt_in_text=RestaurantSmsMarketingOptInText
-        )
-        db.add(customer)
-        db.commit()
-        db.refresh(customer)
-
-    # Generate unique booking reference
-    booking_reference = generate_booking_reference()
-    while db.query(Booking).filter(
-        Booking.booking_reference == booking_reference
-    ).first():
+    With an Idempotency-Key header, retries of the same request replay the
+    first response instead of creating another booking (see app.idempotency).
+    """
+    def create() -> dict:
+        # Find restaurant
+        restaurant = store.get_restaurant(restaurant_name)
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+
+        # Create or find customer
+        customer = None
+        if Email:
+            customer = store.find_customer_by_email(Email)
+
+        if not customer:
+            customer = store.create_customer(
+                title=Title,
+                first_name=FirstName,
+                surname=Surname,
+                mobile_country_code=MobileCountryCode,
+                mobile=Mobile,
+                phone_country_code=PhoneCountryCode,
+                phone=Phone,
+                email=Email,
+                receive_email_marketing=ReceiveEmailMarketing or False,
+                receive_sms_marketing=ReceiveSmsMarketing or False,
+                group_email_marketing_opt_in_text=GroupEmailMarketingOptInText,
+                group_sms_marketing_opt_in_text=GroupSmsMarketingOptInText,
+                receive_restaurant_email_marketing=ReceiveRestaurantEmailMarketing or False,
+                receive_restaurant_sms_marketing=ReceiveRestaurantSmsMarketing or False,
+                restaurant_email_marketing_opt_in_text=RestaurantEmailMarketingOptInText,
+                restaurant_sms_marketing_opt_in_text=RestaurantSmsMarketingOptInText
+            )
+
+        # Generate unique booking reference
         booking_reference = generate_booking_reference()
+        while store.booking_reference_exists(booking_reference):
+            booking_reference = generate_booking_reference()
+
+        # Create booking
+        booking = store.create_booking(
+            booking_reference=booking_reference,
+            restaurant_id=restaurant.id,
+            customer_id=customer.id,
+            customer=customer,
+            visit_date=VisitDate,
+            visit_time=VisitTime,
+            party_size=PartySize,
+            channel_code=ChannelCode,
+            special_requests=SpecialRequests,
+            is_leave_time_confirmed=IsLeaveTimeConfirmed or False,
+            room_number=RoomNumber,
+            status="confirmed"
+        )
 
-    # Create booking
-    booking = Booking(
-        booking_reference=booking_reference,
-        restaurant_id=restaurant.id,
-        customer_id=customer.id,
-        visit_date=VisitDate,
-        visit_time=VisitTime,
-        party_size=PartySize,
-        channel_code=ChannelCode,
-        special_requests=SpecialRequests,
-        is_leave_time_confirmed=IsLeaveTimeConfirmed or False,
-        room_number=RoomNumber,
-        status="confirmed"
+        return {
+            "booking_reference": booking_reference,
+            "booking_id": booking.id,
+            "restaurant": restaurant_name,
+            "visit_date": VisitDate,
+            "visit_time": VisitTime,
+            "party_size": PartySize,
+            "channel_code": ChannelCode,
+            "special_requests": SpecialRequests,
+            "is_leave_time_confirmed": IsLeaveTimeConfirmed,
+            "room_number": RoomNumber,
+            "customer": {
+                "id": customer.id,
+                "title": customer.title,
+                "first_name": customer.first_name,
+                "surname": customer.surname,
+                "email": customer.email,
+                "mobile": customer.mobile
+            },
+            "status": "confirmed",
+            "created_at": booking.created_at
+        }
+
+    if idempotency_key is None:
+        return create()
+    return await IDEMPOTENCY.run(
+        idempotency_key, await request_fingerprint(request), create
     )
 
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
-
-    return {
-        "booking_reference": booking_reference,
-        "booking_id": booking.id,
-        "restaurant": restaurant_name,
-        "visit_date": VisitDate,
-        "visit_time": VisitTime,
-        "party_size": PartySize,
-        "channel_code": ChannelCode,
-        "special_requests": SpecialRequests,
-        "is_leave_time_confirmed": IsLeaveTimeConfirmed,
-        "room_number": RoomNumber,
-        "customer": {
-            "id": customer.id,
-            "title": customer.title,
-            "first_name": customer.first_name,
-            "surname": customer.surname,
-            "email": customer.email,
-            "mobile": customer.mobile
-        },
-        "status": "confirmed",
-        "created_at": booking.created_at
-    }
-
 
 @router.post("/{restaurant_name}/Booking/{booking_reference}/Cancel")
 async def cancel_booking(
@@ -227,7 +235,7 @@ async def cancel_booking(
     micrositeName: str = Form(...),
     bookingReference: str = Form(...),
     cancellationReasonId: int = Form(...),
-    db: Session = Depends(get_db),
+    store: BookingStore = Depends(get_store),
     token: str = Depends(verify_token)
 ):
     """
@@ -238,15 +246,12 @@ async def cancel_booking(
         raise HTTPException(status_code=400, detail="Booking reference mismatch")
 
     # Find restaurant
-    restaurant = db.query(Restaurant).filter(Restaurant.name == restaurant_name).first()
+    restaurant = store.get_restaurant(restaurant_name)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     # Find booking
-    booking = db.query(Booking).filter(
-        Booking.booking_reference == booking_reference,
-        Booking.restaurant_id == restaurant.id
-    ).first()
+    booking = store.get_booking(restaurant.id, booking_reference)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -255,19 +260,17 @@ async def cancel_booking(
         raise HTTPException(status_code=400, detail="Booking is already cancelled")
 
     # Validate cancellation reason
-    cancellation_reason = db.query(CancellationReason).filter(
-        CancellationReason.id == cancellationReasonId
-    ).first()
+    cancellation_reason = store.get_cancellation_reason(cancellationReasonId)
     if not cancellation_reason:
         raise HTTPException(status_code=400, detail="Invalid cancellation reason")
 
     # Update booking status
-    booking.status = "cancelled"
-    booking.cancellation_reason_id = cancellationReasonId
-    booking.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(booking)
+    booking = store.save_booking(
+        booking,
+        status="cancelled",
+        cancellation_reason_id=cancellationReasonId,
+        updated_at=datetime.utcnow()
+    )
 
     return {
         "booking_reference": booking_reference,
@@ -286,31 +289,26 @@ async def cancel_booking(
 async def get_booking(
     restaurant_name: str,
     booking_reference: str,
-    db: Session = Depends(get_db),
+    store: BookingStore = Depends(get_store),
     token: str = Depends(verify_token)
 ):
     """
     Get booking details by reference
     """
     # Find restaurant
-    restaurant = db.query(Restaurant).filter(Restaurant.name == restaurant_name).first()
+    restaurant = store.get_restaurant(restaurant_name)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     # Find booking with customer data
-    booking = db.query(Booking).filter(
-        Booking.booking_reference == booking_reference,
-        Booking.restaurant_id == restaurant.id
-    ).first()
+    booking = store.get_booking(restaurant.id, booking_reference)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
     # Get cancellation reason if cancelled
     cancellation_reason = None
     if booking.status == "cancelled" and booking.cancellation_reason_id:
-        reason = db.query(CancellationReason).filter(
-            CancellationReason.id == booking.cancellation_reason_id
-        ).first()
+        reason = store.get_cancellation_reason(booking.cancellation_reason_id)
         if reason:
             cancellation_reason = {
                 "id": reason.id,
@@ -354,22 +352,19 @@ async def update_booking(
     PartySize: Optional[int] = Form(None),
     SpecialRequests: Optional[str] = Form(None),
     IsLeaveTimeConfirmed: Optional[bool] = Form(None),
-    db: Session = Depends(get_db),
+    store: BookingStore = Depends(get_store),
     token: str = Depends(verify_token)
 ):
     """
     Update an existing booking
     """
     # Find restaurant
-    restaurant = db.query(Restaurant).filter(Restaurant.name == restaurant_name).first()
+    restaurant = store.get_restaurant(restaurant_name)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     # Find booking
-    booking = db.query(Booking).filter(
-        Booking.booking_reference == booking_reference,
-        Booking.restaurant_id == restaurant.id
-    ).first()
+    booking = store.get_booking(restaurant.id, booking_reference)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -377,40 +372,33 @@ async def update_booking(
     if booking.status == "cancelled":
         raise HTTPException(status_code=400, detail="Cannot update cancelled booking")
 
-    # Track updates
+    # Track updates (keys are booking attribute names)
     updates = {}
     updated = False
 
     if VisitDate is not None and VisitDate != booking.visit_date:
-        booking.visit_date = VisitDate
         updates["visit_date"] = VisitDate
         updated = True
 
     if VisitTime is not None and VisitTime != booking.visit_time:
-        booking.visit_time = VisitTime
         updates["visit_time"] = VisitTime
         updated = True
 
     if PartySize is not None and PartySize != booking.party_size:
-        booking.party_size = PartySize
         updates["party_size"] = PartySize
         updated = True
 
     if SpecialRequests is not None and SpecialRequests != booking.special_requests:
-        booking.special_requests = SpecialRequests
         updates["special_requests"] = SpecialRequests
         updated = True
 
     if (IsLeaveTimeConfirmed is not None and
             IsLeaveTimeConfirmed != booking.is_leave_time_confirmed):
-        booking.is_leave_time_confirmed = IsLeaveTimeConfirmed
         updates["is_leave_time_confirmed"] = IsLeaveTimeConfirmed
         updated = True
 
     if updated:
-        booking.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(booking)
+        booking = store.save_booking(booking, updated_at=datetime.utcnow(), **updates)
 
     return {
         "booking_reference": booking_reference,
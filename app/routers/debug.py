@@ -0,0 +1,73 @@
+"""
+Debug Router for Restaurant Booking API.
+
+In-place diagnostics for a running server. Guarded by the same
+ADMIN_TOKEN / X-Admin-Token check as the admin endpoints.
+
+Author: AI Assistant
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.profiler import SamplingProfiler, profile_lock
+from app.routers.admin import verify_admin_token
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+@router.get(
+    "/profile",
+    summary="Sample CPU Profile",
+    responses={200: {"content": {"text/plain": {}, "application/octet-stream": {}}}}
+)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=120, description="How long to sample"),
+    hz: float = Query(100.0, ge=1, le=1000, description="Samples per second"),
+    format: str = Query("collapsed", pattern="^(collapsed|pstats)$",
+                        description="collapsed stacks or a pstats dump"),
+    include_idle: bool = Query(False, description="Keep samples of idle threads"),
+    token: str = Depends(verify_admin_token)
+) -> Response:
+    """
+    Sample the Python stacks of this worker process for `seconds`.
+
+    The endpoint awaits while sampling, so the worker keeps serving traffic
+    and that traffic is what gets profiled. In production mode each request
+    profiles the one worker that received it; repeat the call to cover more.
+
+    Args:
+        seconds: Sampling duration
+        hz: Sampling rate
+        format: "collapsed" (flamegraph text) or "pstats" (binary dump)
+        include_idle: Keep samples of threads waiting for work
+        token: Admin token dependency
+
+    Returns:
+        Response: Collapsed stacks as text/plain, or a pstats file download.
+        Sample counts are reported in X-Profile-* headers.
+
+    Raises:
+        HTTPException: 409 if a profile is already running in this worker
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        profiler = SamplingProfiler(hz=hz, include_idle=include_idle)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    finally:
+        profile_lock.release()
+
+    headers = {f"X-Profile-{k.title()}": str(v) for k, v in profiler.summary().items()}
+    if format == "pstats":
+        headers["Content-Disposition"] = 'attachment; filename="profile.pstats"'
+        return Response(
+            profiler.pstats_data(), media_type="application/octet-stream", headers=headers
+        )
+    return PlainTextResponse(profiler.collapsed(), headers=headers)
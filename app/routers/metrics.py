@@ -0,0 +1,31 @@
+"""
+Metrics Router for Restaurant Booking API.
+
+Exposes the collected request metrics in the Prometheus text format.
+
+Author: AI Assistant
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import REGISTRY
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    response_class=PlainTextResponse
+)
+async def metrics() -> PlainTextResponse:
+    """
+    Get per-route request counts, latency, in-flight and database time metrics.
+
+    Returns:
+        PlainTextResponse: Metrics in Prometheus text exposition format 0.0.4
+    """
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
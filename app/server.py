@@ -0,0 +1,125 @@
+"""
+Server Launch Configuration.
+
+Development and production launch modes for the restaurant booking mock API,
+used by `python -m app`.
+
+Development mode runs a single auto-reloading process. Production mode runs
+N uvicorn worker processes on uvloop/httptools with access logging disabled
+or sampled and a longer keep-alive. Worker processes are spawned, not forked
+from a process holding connections, so each one builds its own database
+engine when it imports the app.
+
+Author: AI Assistant
+"""
+
+import copy
+import logging
+import os
+import random
+from typing import Any, Dict
+
+import uvicorn
+
+APP_IMPORT_STRING = "app.main:app"
+
+
+class AccessLogSampler(logging.Filter):
+    """
+    Logging filter that passes only a random fraction of access log records.
+
+    Attributes:
+        rate (float): Fraction of records to keep, between 0.0 and 1.0
+    """
+
+    def __init__(self, rate: float = 1.0) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+def sampled_log_config(rate: float) -> Dict[str, Any]:
+    """
+    Build a uvicorn logging config whose access handler samples at `rate`.
+
+    Args:
+        rate: Fraction of access log lines to keep
+
+    Returns:
+        Dict suitable for `logging.config.dictConfig`
+    """
+    config = copy.deepcopy(uvicorn.config.LOGGING_CONFIG)
+    config["filters"] = {
+        "access_sample": {"()": "app.server.AccessLogSampler", "rate": rate}
+    }
+    config["handlers"]["access"]["filters"] = ["access_sample"]
+    return config
+
+
+def run_development(host: str, port: int) -> None:
+    """
+    Run a single auto-reloading server process for local development.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+    """
+    uvicorn.run(
+        APP_IMPORT_STRING, host=host, port=port, reload=True, reload_dirs=["app"]
+    )
+
+
+def run_production(
+    host: str,
+    port: int,
+    workers: int,
+    keep_alive: int = 30,
+    access_log_sample: float = 0.0,
+) -> None:
+    """
+    Run the API with multiple worker processes for load.
+
+    The database is brought up to date once in the launcher before workers
+    start, so workers only ever take the fast startup path and never race each
+    other creating tables or seeding.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes
+        keep_alive: Seconds to hold idle keep-alive connections open
+        access_log_sample: Fraction of requests to access-log (0 disables it)
+
+    Raises:
+        ValueError: If in-memory mode is combined with more than one worker
+    """
+    in_memory = (
+        os.getenv("DATABASE_MODE", "file").lower() == "memory"
+        or os.getenv("STORAGE_ENGINE", "sqlalchemy").lower() == "memory"
+    )
+    if workers > 1 and in_memory:
+        raise ValueError(
+            "In-memory data cannot be shared between worker processes; "
+            "use --workers 1 or the file database with the sqlalchemy engine"
+        )
+
+    import app.init_db as init_db
+    from app.database import engine
+
+    init_db.ensure_database()
+    engine.dispose()
+
+    uvicorn.run(
+        APP_IMPORT_STRING,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        access_log=access_log_sample > 0,
+        log_config=sampled_log_config(access_log_sample),
+        timeout_keep_alive=keep_alive,
+        backlog=4096,
+    )
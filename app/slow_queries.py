@@ -0,0 +1,208 @@
+"""
+Slow-Query Log.
+
+When SLOW_QUERY_MS is set above 0, every SQL statement that takes longer
+than that many milliseconds is written as one JSON line to SLOW_QUERY_LOG
+(default ./slow_queries.log, kept to SLOW_QUERY_LOG_MAX_BYTES with
+SLOW_QUERY_LOG_BACKUPS rotated files). Each entry records:
+
+- the statement and its bound parameters, with customer details redacted
+- the route and path of the request that ran it
+- the output of `EXPLAIN QUERY PLAN`, run on the same connection, and
+  whether the plan contains a full table scan
+
+Off by default (SLOW_QUERY_MS unset or 0). Entries are read back by the
+`/admin/slow-queries` endpoint.
+
+Author: AI Assistant
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import current_query_stats
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))
+
+# Columns holding customer details; values bound to them are never logged
+PII_COLUMNS = frozenset({
+    "title", "first_name", "surname", "email", "mobile", "mobile_country_code",
+    "phone", "phone_country_code", "special_requests", "room_number",
+})
+REDACTED = "<redacted>"
+
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+PHONE_RE = re.compile(r"^\+?\d[\d\s()]{6,}$")
+EXPLAINABLE_RE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+INSERT_COLUMNS_RE = re.compile(r"^\s*INSERT\s+INTO\s+\S+\s*\(([^)]*)\)", re.IGNORECASE)
+BIND_NAME_RE = re.compile(
+    r"(?:(\w+)\"?\s*(?:=|!=|<>|<=|>=|<|>|\bLIKE|\bIN\s*\()\s*)?\?", re.IGNORECASE
+)
+
+logger = logging.getLogger(__name__)
+logger.propagate = False
+
+
+def bind_names(statement: str) -> List[Optional[str]]:
+    """
+    Guess the column each positional `?` parameter is bound to.
+
+    Uses the column list of an INSERT, otherwise the identifier in front of
+    the comparison (`email = ?`). Unknown positions are None.
+
+    Args:
+        statement: SQL text with `?` placeholders
+
+    Returns:
+        List with one column name (lowercase) or None per placeholder
+    """
+    match = INSERT_COLUMNS_RE.match(statement)
+    if match:
+        return [c.strip().strip('"').lower() for c in match.group(1).split(",")]
+    return [
+        m.group(1).lower() if m.group(1) else None
+        for m in BIND_NAME_RE.finditer(statement)
+    ]
+
+
+def redact_parameters(statement: str, parameters: Any) -> Any:
+    """
+    Replace customer details in bound parameters with "<redacted>".
+
+    A value is redacted if it is bound to one of PII_COLUMNS, or if it is a
+    string that looks like an email address or phone number.
+
+    Args:
+        statement: SQL text the parameters belong to
+        parameters: Positional parameter sequence (dicts are redacted by key)
+
+    Returns:
+        Parameters safe to write to the log
+    """
+    def redact(name: Optional[str], value: Any) -> Any:
+        if name in PII_COLUMNS:
+            return REDACTED
+        if isinstance(value, str) and (EMAIL_RE.search(value) or PHONE_RE.match(value)):
+            return REDACTED
+        return value if isinstance(value, (int, float, bool, type(None))) else str(value)
+
+    if isinstance(parameters, dict):
+        return {k: redact(k.lower(), v) for k, v in parameters.items()}
+    names = bind_names(statement)
+    return [
+        redact(names[i] if i < len(names) else None, value)
+        for i, value in enumerate(parameters or ())
+    ]
+
+
+def explain_query_plan(dbapi_connection, statement: str, parameters: Sequence) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN for a statement on the given DBAPI connection.
+
+    Goes through the raw connection so the EXPLAIN itself does not trigger
+    the engine's cursor hooks.
+
+    Returns:
+        List of plan detail lines, e.g. ["SCAN bookings"]; empty for
+        statements other than SELECT/INSERT/UPDATE/DELETE
+    """
+    if not EXPLAINABLE_RE.match(statement):
+        return []
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+
+
+def has_full_scan(plan: List[str]) -> bool:
+    """True if any plan step scans a table without using an index."""
+    return any(
+        step.startswith("SCAN ") and " USING " not in step for step in plan
+    )
+
+
+def configure_log(path: str = SLOW_QUERY_LOG) -> None:
+    """Attach the rotating file handler to the slow-query logger once."""
+    if logger.handlers:
+        return
+    handler = RotatingFileHandler(
+        path, maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def instrument_engine(engine: Engine, threshold_ms: float = SLOW_QUERY_MS) -> None:
+    """
+    Log statements on `engine` that run longer than `threshold_ms`.
+
+    Relies on the start time recorded by the `before_cursor_execute` hook in
+    `app.database`.
+
+    Args:
+        engine: SQLAlchemy engine to watch
+        threshold_ms: Threshold in milliseconds; 0 or less disables logging
+    """
+    if threshold_ms <= 0:
+        return
+    configure_log()
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._query_start
+        if elapsed < threshold or executemany:
+            return
+
+        stats = current_query_stats.get()
+        scope = stats.scope if stats is not None and stats.scope else {}
+        route = scope.get("route")
+        plan = explain_query_plan(cursor.connection, statement, parameters)
+        logger.info(json.dumps({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed * 1000, 3),
+            "method": scope.get("method"),
+            "route": getattr(route, "path", None),
+            "path": scope.get("path"),
+            "statement": " ".join(statement.split()),
+            "parameters": redact_parameters(statement, parameters),
+            "plan": plan,
+            "full_scan": has_full_scan(plan),
+            "pid": os.getpid(),
+        }))
+
+
+def read_entries(path: str = SLOW_QUERY_LOG) -> Iterator[dict]:
+    """
+    Yield logged entries from the rotated files and the current one,
+    oldest first.
+    """
+    paths = [f"{path}.{i}" for i in range(SLOW_QUERY_LOG_BACKUPS, 0, -1)] + [path]
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        with open(p, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # partially written line from a concurrent worker
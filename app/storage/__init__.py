@@ -0,0 +1,90 @@
+"""
+Storage Engines for the Restaurant Booking API.
+
+The routers talk to a `BookingStore` obtained through the `get_store`
+dependency. The engine is chosen with the STORAGE_ENGINE environment variable:
+
+- "sqlalchemy" (default): SQLite through SQLAlchemy, see `app.storage.sql`
+- "memory": pure-Python in-memory engine, see `app.storage.memory`
+
+Author: AI Assistant
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Generator, Iterator
+
+from app.database import SessionLocal
+from app.storage.base import BookingStore
+from app.storage.memory import MemoryStore
+from app.storage.sql import SQLAlchemyStore
+
+STORAGE_ENGINE = os.getenv("STORAGE_ENGINE", "sqlalchemy").lower()
+
+# Process-wide instance used when STORAGE_ENGINE=memory
+memory_store = MemoryStore()
+
+
+def init_storage() -> None:
+    """
+    Prepare the selected storage engine during application startup.
+
+    For SQLAlchemy this runs the database startup pipeline and warms caches;
+    for the in-memory engine it seeds the sample data.
+    """
+    if STORAGE_ENGINE == "memory":
+        memory_store.seed()
+        return
+
+    import app.init_db as init_db
+
+    init_db.ensure_database()
+    init_db.warm_caches()
+
+
+@contextmanager
+def open_store() -> Iterator[BookingStore]:
+    """
+    Open a storage engine for one unit of work.
+
+    Yields the in-memory engine, or a SQLAlchemy engine wrapping a new
+    database session that is closed when the block exits. Work that can
+    outlive the request that started it (e.g. a coalesced search shared
+    with other requests) opens its own store here rather than borrowing the
+    request's.
+
+    Yields:
+        BookingStore: Storage engine for the block
+    """
+    if STORAGE_ENGINE == "memory":
+        yield memory_store
+        return
+
+    db = SessionLocal()
+    try:
+        yield SQLAlchemyStore(db)
+    finally:
+        db.close()
+
+
+def get_store() -> Generator[BookingStore, None, None]:
+    """
+    Storage dependency for FastAPI.
+
+    Yields:
+        BookingStore: Storage engine for this request, closed after it completes
+    """
+    with open_store() as store:
+        yield store
+
+
+__all__ = [
+    "BookingStore",
+    "MemoryStore",
+    "SQLAlchemyStore",
+    "STORAGE_ENGINE",
+    "get_store",
+    "init_storage",
+    "memory_store",
+    "open_store",
+]
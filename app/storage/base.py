@@ -0,0 +1,144 @@
+"""
+Storage Interface for the Restaurant Booking API.
+
+Defines the operations the routers need from a storage engine, independent of
+how data is held. Engines return record objects exposing the same attribute
+names as the models in `app.models` (the SQLAlchemy engine returns the ORM rows
+themselves; the in-memory engine returns the dataclasses below), so routers can
+build responses the same way for either engine.
+
+Author: AI Assistant
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, time, datetime
+from typing import Any, List, Optional
+
+
+@dataclass
+class RestaurantRecord:
+    """Restaurant record with the attributes of `app.models.Restaurant`."""
+
+    id: int
+    name: str
+    microsite_name: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class CustomerRecord:
+    """Customer record with the attributes of `app.models.Customer`."""
+
+    id: int
+    title: Optional[str] = None
+    first_name: Optional[str] = None
+    surname: Optional[str] = None
+    mobile_country_code: Optional[str] = None
+    mobile: Optional[str] = None
+    phone_country_code: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    receive_email_marketing: bool = False
+    receive_sms_marketing: bool = False
+    group_email_marketing_opt_in_text: Optional[str] = None
+    group_sms_marketing_opt_in_text: Optional[str] = None
+    receive_restaurant_email_marketing: bool = False
+    receive_restaurant_sms_marketing: bool = False
+    restaurant_email_marketing_opt_in_text: Optional[str] = None
+    restaurant_sms_marketing_opt_in_text: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class BookingRecord:
+    """Booking record with the attributes of `app.models.Booking`."""
+
+    id: int
+    booking_reference: str
+    restaurant_id: int
+    customer_id: int
+    visit_date: date
+    visit_time: time
+    party_size: int
+    channel_code: str
+    customer: CustomerRecord
+    special_requests: Optional[str] = None
+    is_leave_time_confirmed: bool = False
+    room_number: Optional[str] = None
+    status: str = "confirmed"
+    cancellation_reason_id: Optional[int] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class AvailabilitySlotRecord:
+    """Slot record with the attributes of `app.models.AvailabilitySlot`."""
+
+    id: int
+    restaurant_id: int
+    date: date
+    time: time
+    max_party_size: int = 8
+    available: bool = True
+
+
+@dataclass
+class CancellationReasonRecord:
+    """Reason record with the attributes of `app.models.CancellationReason`."""
+
+    id: int
+    reason: str
+    description: Optional[str] = None
+
+
+class BookingStore(ABC):
+    """
+    Storage operations used by the availability and booking routers.
+
+    Every engine must behave identically for these operations; the contract
+    tests in `tests/test_storage_contract.py` run against each engine.
+    """
+
+    @abstractmethod
+    def get_restaurant(self, name: str) -> Optional[Any]:
+        """Find a restaurant by name, or None."""
+
+    @abstractmethod
+    def get_slots(self, restaurant_id: int, visit_date: date, party_size: int) -> List[Any]:
+        """List slots on a date that accept the party size, ordered by time."""
+
+    @abstractmethod
+    def count_confirmed_bookings(
+        self, restaurant_id: int, visit_date: date, visit_time: time
+    ) -> int:
+        """Count confirmed bookings for one restaurant/date/time slot."""
+
+    @abstractmethod
+    def find_customer_by_email(self, email: str) -> Optional[Any]:
+        """Find a customer by email address, or None."""
+
+    @abstractmethod
+    def create_customer(self, **fields: Any) -> Any:
+        """Create and persist a customer from `app.models.Customer` fields."""
+
+    @abstractmethod
+    def booking_reference_exists(self, booking_reference: str) -> bool:
+        """Check whether a booking reference is already taken."""
+
+    @abstractmethod
+    def create_booking(self, **fields: Any) -> Any:
+        """Create and persist a booking from `app.models.Booking` fields."""
+
+    @abstractmethod
+    def get_booking(self, restaurant_id: int, booking_reference: str) -> Optional[Any]:
+        """Find a booking by reference at a restaurant, or None."""
+
+    @abstractmethod
+    def get_cancellation_reason(self, reason_id: int) -> Optional[Any]:
+        """Find a cancellation reason by id, or None."""
+
+    @abstractmethod
+    def save_booking(self, booking: Any, **changes: Any) -> Any:
+        """Apply attribute changes to a booking, persist and return it."""
@@ -0,0 +1,158 @@
+"""
+In-Memory Storage Engine.
+
+Implements `BookingStore` with plain Python data structures, avoiding SQLite
+round trips entirely. Data lives only in the current process and is lost on
+shutdown, so this engine is for single-process mock and test runs.
+
+Indexes:
+- restaurants by name
+- slots by (restaurant, date), each list kept sorted by time
+- confirmed-booking counters by (restaurant, date, time)
+- bookings by reference, customers by email
+
+Author: AI Assistant
+"""
+
+import random
+from collections import defaultdict
+from datetime import date, time, datetime, timedelta
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.storage.base import (
+    BookingStore,
+    RestaurantRecord,
+    CustomerRecord,
+    BookingRecord,
+    AvailabilitySlotRecord,
+    CancellationReasonRecord,
+)
+
+SlotKey = Tuple[int, date, time]
+
+
+class MemoryStore(BookingStore):
+    """
+    Storage engine holding all records in process memory.
+
+    Booking counts per slot are maintained incrementally on every write, so
+    availability checks are dictionary lookups rather than scans.
+    """
+
+    def __init__(self) -> None:
+        self._ids = defaultdict(lambda: count(1))
+        self.restaurants: Dict[str, RestaurantRecord] = {}
+        self.slots: Dict[Tuple[int, date], List[AvailabilitySlotRecord]] = {}
+        self.slot_counts: Dict[SlotKey, int] = defaultdict(int)
+        self.customers_by_email: Dict[str, CustomerRecord] = {}
+        self.bookings: Dict[str, BookingRecord] = {}
+        self.reasons: Dict[int, CancellationReasonRecord] = {}
+
+    def _next_id(self, table: str) -> int:
+        return next(self._ids[table])
+
+    def seed(self) -> None:
+        """
+        Populate the store with the same sample data as `app.init_db`.
+        """
+        from app.init_db import (
+            SAMPLE_RESTAURANT, SAMPLE_DAYS, SAMPLE_TIMES, CANCELLATION_REASONS
+        )
+
+        if self.restaurants:
+            return
+
+        restaurant = RestaurantRecord(
+            id=self._next_id("restaurants"),
+            name=SAMPLE_RESTAURANT,
+            microsite_name=SAMPLE_RESTAURANT
+        )
+        self.restaurants[restaurant.name] = restaurant
+
+        start_date = datetime.now().date()
+        for i in range(SAMPLE_DAYS):
+            current_date = start_date + timedelta(days=i)
+            for slot_time in SAMPLE_TIMES:
+                self.add_slot(AvailabilitySlotRecord(
+                    id=self._next_id("availability_slots"),
+                    restaurant_id=restaurant.id,
+                    date=current_date,
+                    time=slot_time,
+                    max_party_size=8,
+                    available=random.random() > 0.2  # 80% availability
+                ))
+
+        for reason_data in CANCELLATION_REASONS:
+            reason = CancellationReasonRecord(**reason_data)
+            self.reasons[reason.id] = reason
+
+    def add_slot(self, slot: AvailabilitySlotRecord) -> None:
+        """Insert a slot, keeping its (restaurant, date) list sorted by time."""
+        day = self.slots.setdefault((slot.restaurant_id, slot.date), [])
+        day.append(slot)
+        day.sort(key=lambda s: s.time)
+
+    def get_restaurant(self, name: str) -> Optional[RestaurantRecord]:
+        return self.restaurants.get(name)
+
+    def get_slots(
+        self, restaurant_id: int, visit_date: date, party_size: int
+    ) -> List[AvailabilitySlotRecord]:
+        return [
+            slot for slot in self.slots.get((restaurant_id, visit_date), ())
+            if slot.max_party_size >= party_size
+        ]
+
+    def count_confirmed_bookings(
+        self, restaurant_id: int, visit_date: date, visit_time: time
+    ) -> int:
+        return self.slot_counts.get((restaurant_id, visit_date, visit_time), 0)
+
+    def find_customer_by_email(self, email: str) -> Optional[CustomerRecord]:
+        return self.customers_by_email.get(email)
+
+    def create_customer(self, **fields: Any) -> CustomerRecord:
+        customer = CustomerRecord(id=self._next_id("customers"), **fields)
+        # First customer with an email wins, matching `.first()` in SQL
+        if customer.email and customer.email not in self.customers_by_email:
+            self.customers_by_email[customer.email] = customer
+        return customer
+
+    def booking_reference_exists(self, booking_reference: str) -> bool:
+        return booking_reference in self.bookings
+
+    def create_booking(self, **fields: Any) -> BookingRecord:
+        customer = fields.pop("customer")
+        booking = BookingRecord(
+            id=self._next_id("bookings"), customer=customer, **fields
+        )
+        self.bookings[booking.booking_reference] = booking
+        self._count(booking, 1)
+        return booking
+
+    def get_booking(
+        self, restaurant_id: int, booking_reference: str
+    ) -> Optional[BookingRecord]:
+        booking = self.bookings.get(booking_reference)
+        if booking is None or booking.restaurant_id != restaurant_id:
+            return None
+        return booking
+
+    def get_cancellation_reason(
+        self, reason_id: int
+    ) -> Optional[CancellationReasonRecord]:
+        return self.reasons.get(reason_id)
+
+    def save_booking(self, booking: BookingRecord, **changes: Any) -> BookingRecord:
+        self._count(booking, -1)
+        for name, value in changes.items():
+            setattr(booking, name, value)
+        self._count(booking, 1)
+        return booking
+
+    def _count(self, booking: BookingRecord, delta: int) -> None:
+        """Adjust the slot counter for a booking if it is confirmed."""
+        if booking.status == "confirmed":
+            key = (booking.restaurant_id, booking.visit_date, booking.visit_time)
+            self.slot_counts[key] += delta
@@ -0,0 +1,95 @@
+"""
+SQLAlchemy Storage Engine.
+
+Implements `BookingStore` on top of the SQLite database configured in
+`app.database`, issuing the same queries the routers used to run directly.
+Records are returned as ORM rows.
+
+Author: AI Assistant
+"""
+
+from datetime import date, time
+from typing import Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Restaurant, Customer, Booking, AvailabilitySlot, CancellationReason
+)
+from app.storage.base import BookingStore
+
+
+class SQLAlchemyStore(BookingStore):
+    """
+    Storage engine backed by a SQLAlchemy session.
+
+    One instance wraps one request-scoped session.
+
+    Attributes:
+        db (Session): Database session used for all operations
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get_restaurant(self, name: str) -> Optional[Restaurant]:
+        return self.db.query(Restaurant).filter(Restaurant.name == name).first()
+
+    def get_slots(
+        self, restaurant_id: int, visit_date: date, party_size: int
+    ) -> List[AvailabilitySlot]:
+        return self.db.query(AvailabilitySlot).filter(
+            AvailabilitySlot.restaurant_id == restaurant_id,
+            AvailabilitySlot.date == visit_date,
+            AvailabilitySlot.max_party_size >= party_size
+        ).order_by(AvailabilitySlot.time).all()
+
+    def count_confirmed_bookings(
+        self, restaurant_id: int, visit_date: date, visit_time: time
+    ) -> int:
+        return self.db.query(Booking).filter(
+            Booking.restaurant_id == restaurant_id,
+            Booking.visit_date == visit_date,
+            Booking.visit_time == visit_time,
+            Booking.status == "confirmed"
+        ).count()
+
+    def find_customer_by_email(self, email: str) -> Optional[Customer]:
+        return self.db.query(Customer).filter(Customer.email == email).first()
+
+    def create_customer(self, **fields: Any) -> Customer:
+        customer = Customer(**fields)
+        self.db.add(customer)
+        self.db.commit()
+        self.db.refresh(customer)
+        return customer
+
+    def booking_reference_exists(self, booking_reference: str) -> bool:
+        return self.db.query(Booking).filter(
+            Booking.booking_reference == booking_reference
+        ).first() is not None
+
+    def create_booking(self, **fields: Any) -> Booking:
+        booking = Booking(**fields)
+        self.db.add(booking)
+        self.db.commit()
+        self.db.refresh(booking)
+        return booking
+
+    def get_booking(self, restaurant_id: int, booking_reference: str) -> Optional[Booking]:
+        return self.db.query(Booking).filter(
+            Booking.booking_reference == booking_reference,
+            Booking.restaurant_id == restaurant_id
+        ).first()
+
+    def get_cancellation_reason(self, reason_id: int) -> Optional[CancellationReason]:
+        return self.db.query(CancellationReason).filter(
+            CancellationReason.id == reason_id
+        ).first()
+
+    def save_booking(self, booking: Booking, **changes: Any) -> Booking:
+        for name, value in changes.items():
+            setattr(booking, name, value)
+        self.db.commit()
+        self.db.refresh(booking)
+        return booking
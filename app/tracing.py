@@ -0,0 +1,399 @@
+"""
+Lightweight Request Tracing.
+
+Follows one chat turn from the Flask chat app through its HTTP calls into the
+API and down to individual SQL statements. Trace and span ids travel between
+processes in W3C `traceparent` headers
+(`00-<32 hex trace id>-<16 hex span id>-01`), and every finished span is
+appended as one JSON line to the file named by TRACE_FILE. Tracing is off
+(and costs nothing) when TRACE_FILE is unset.
+
+This module only depends on the standard library (SQLAlchemy is imported
+lazily by `instrument_engine`), so the chat app can use it without pulling
+in the API.
+
+View a trace file as a waterfall:
+    python -m app.tracing traces.jsonl              # every trace
+    python -m app.tracing traces.jsonl --trace <id> # one trace
+    python -m app.tracing traces.jsonl --chrome out.json
+
+The --chrome output loads in chrome://tracing or https://ui.perfetto.dev.
+
+Author: AI Assistant
+"""
+
+import argparse
+import functools
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """
+    One timed operation within a trace.
+
+    Attributes:
+        trace_id (str): 32 hex digit id shared by every span of the trace
+        span_id (str): 16 hex digit id of this span
+        parent_id (str): span_id of the parent span, None for a root span
+        name (str): Operation name, e.g. "POST /AvailabilitySearch"
+        service (str): Process that recorded the span ("chat_app", "api")
+        start (float): Start time as a Unix timestamp
+        duration_ms (float): Duration, filled in when the span ends
+        attributes (dict): Extra details (route, status code, statement, ...)
+    """
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    service: str
+    start: float
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a traceparent header.
+
+    Args:
+        value: Header value, may be None
+
+    Returns:
+        Tuple of (trace_id, parent span_id), or None if missing or malformed
+    """
+    if not value:
+        return None
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Tracer:
+    """
+    Creates spans for one service and appends finished spans to a JSONL file.
+
+    Args:
+        service: Name recorded on every span
+        path: Output file; defaults to TRACE_FILE. Tracing is disabled when empty.
+    """
+
+    def __init__(self, service: str, path: Optional[str] = None) -> None:
+        self.service = service
+        self.path = TRACE_FILE if path is None else path
+        self.enabled = bool(self.path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start_span(self, name: str, parent: Optional[Span] = None,
+                   traceparent: Optional[str] = None, **attributes: Any) -> Span:
+        """
+        Start a span without making it current.
+
+        The parent is, in order: `parent`, the span named by `traceparent`,
+        the current span. With none of those a new trace is started.
+        """
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            remote = parse_traceparent(traceparent)
+            if remote:
+                trace_id, parent_id = remote
+            else:
+                current = current_span.get()
+                if current is not None:
+                    trace_id, parent_id = current.trace_id, current.span_id
+                else:
+                    trace_id, parent_id = secrets.token_hex(16), None
+        return Span(
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            name=name,
+            service=self.service,
+            start=time.time(),
+            attributes=attributes,
+        )
+
+    def finish(self, span: Span) -> None:
+        """Set the span's duration and export it."""
+        span.duration_ms = (time.time() - span.start) * 1000
+        self.export(span)
+
+    @contextmanager
+    def span(self, name: str, traceparent: Optional[str] = None,
+             **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Context manager running its block inside a new current span.
+
+        Yields None when tracing is disabled. An exception leaving the block
+        is recorded in the span's "error" attribute and re-raised.
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, traceparent=traceparent, **attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def traced(self, name: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator running every call of the function inside a span.
+
+        Returns the function unchanged when tracing is disabled, so disabled
+        tracing adds no per-call cost.
+        """
+        def decorator(fn: Callable) -> Callable:
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inject(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Return a copy of `headers` carrying the current span's traceparent.
+
+        Args:
+            headers: Outgoing request headers
+
+        Returns:
+            New dict; equal to `headers` when there is no current span
+        """
+        headers = dict(headers or {})
+        span = current_span.get()
+        if self.enabled and span is not None:
+            headers["traceparent"] = span.traceparent
+        return headers
+
+    def export(self, span: Span) -> None:
+        """Append the span to the trace file as one JSON line."""
+        line = json.dumps(asdict(span), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=1, encoding="utf-8")
+            self._file.write(line)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware wrapping each HTTP request in a server span.
+
+    Continues the caller's trace when the request carries a traceparent
+    header, records the matched route template and status code, and returns
+    the server span's traceparent in the response headers.
+    """
+
+    def __init__(self, app: Callable, tracer: Tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}", traceparent=traceparent,
+            kind="server"
+        ) as span:
+            async def send_wrapper(message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["status_code"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"traceparent", span.traceparent.encode()))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+
+
+def instrument_engine(engine, tracer: Tracer) -> None:
+    """
+    Record a span for every SQL statement run on `engine`.
+
+    Spans carry the statement text only; bound parameters are left out so
+    customer details never reach the trace file.
+
+    Args:
+        engine: SQLAlchemy engine
+        tracer: Tracer to record with; nothing is registered when disabled
+    """
+    if not tracer.enabled:
+        return
+
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_sql_span(conn, cursor, statement, parameters, context, executemany) -> None:
+        if current_span.get() is not None:
+            context._trace_span = tracer.start_span(
+                "SQL " + statement.split(None, 1)[0].upper(),
+                statement=" ".join(statement.split()),
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish_sql_span(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            tracer.finish(span)
+
+
+def load_spans(path: str) -> Dict[str, List[dict]]:
+    """
+    Read a trace file.
+
+    Returns:
+        Dict mapping trace_id to its spans, ordered by start time
+    """
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    for spans in traces.values():
+        spans.sort(key=lambda s: s["start"])
+    return traces
+
+
+def render_waterfall(spans: List[dict], width: int = 50) -> str:
+    """
+    Render one trace as a text waterfall, children indented under parents.
+
+    Args:
+        spans: Spans of a single trace
+        width: Characters used for the timeline bar
+
+    Returns:
+        str: Multi-line waterfall
+    """
+    t0 = min(s["start"] for s in spans)
+    total_ms = max(
+        (s["start"] - t0) * 1000 + s["duration_ms"] for s in spans
+    ) or 1.0
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[dict]] = defaultdict(list)
+    for s in spans:
+        # Spans whose parent was not recorded (e.g. from an untraced caller)
+        # are shown as roots
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+
+    lines = [f"trace {spans[0]['trace_id']}  {total_ms:.1f} ms"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for s in children.get(parent, []):
+            offset_ms = (s["start"] - t0) * 1000
+            left = int(offset_ms / total_ms * width)
+            bar = max(1, int(s["duration_ms"] / total_ms * width))
+            label = f"{'  ' * depth}[{s['service']}] {s['name']}"
+            lines.append(
+                f"{label[:48]:<48} {' ' * left}{'█' * min(bar, width - left)}"
+                f"{' ' * max(0, width - left - bar)} {offset_ms:8.1f} +{s['duration_ms']:.1f} ms"
+            )
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def to_chrome_trace(traces: Dict[str, List[dict]]) -> dict:
+    """
+    Convert spans to the Chrome Trace Event format (one row per service).
+
+    Returns:
+        dict: JSON object loadable by chrome://tracing and Perfetto
+    """
+    events = []
+    for trace_id, spans in traces.items():
+        for s in spans:
+            events.append({
+                "name": s["name"],
+                "cat": s["service"],
+                "ph": "X",
+                "ts": s["start"] * 1e6,
+                "dur": s["duration_ms"] * 1000,
+                "pid": trace_id[:8],
+                "tid": s["service"],
+                "args": dict(s["attributes"], span_id=s["span_id"],
+                             parent_id=s["parent_id"]),
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show a trace file as a waterfall")
+    parser.add_argument("path", help="JSONL file written via TRACE_FILE")
+    parser.add_argument("--trace", help="only show this trace id")
+    parser.add_argument("--last", type=int, help="only show the N most recent traces")
+    parser.add_argument("--chrome", metavar="OUT", help="write Chrome trace JSON instead")
+    args = parser.parse_args()
+
+    traces = load_spans(args.path)
+    if args.trace:
+        traces = {args.trace: traces.get(args.trace, [])}
+    ordered = sorted(traces.items(), key=lambda item: item[1][0]["start"] if item[1] else 0)
+    if args.last:
+        ordered = ordered[-args.last:]
+
+    if args.chrome:
+        with open(args.chrome, "w") as f:
+            json.dump(to_chrome_trace(dict(ordered)), f)
+        return 0
+
+    for _, spans in ordered:
+        if spans:
+            print(render_waterfall(spans))
+            print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
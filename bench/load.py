@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator for the mock API.
+
+Starts a local server (python -m app --production) in a scratch directory,
+drives it with a configurable mix of the five API operations over httpx, and
+prints a JSON report with throughput, p50/p95/p99/max latency and an error
+breakdown per operation.
+
+Two load models are supported:
+
+- closed loop (default): --concurrency users each send the next request as
+  soon as the previous one completes
+- open loop: requests arrive at --rate per second (Poisson arrivals)
+  regardless of how fast the server answers; latency is measured from the
+  scheduled arrival time so queueing delay is not hidden
+
+A warmup phase runs first and is excluded from the report.
+
+Usage:
+    python bench/load.py --duration 20 --concurrency 32
+    python bench/load.py --mode open --rate 500 --duration 20
+    python bench/load.py --mix availability=70,book=10,get=10,update=5,cancel=5
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from app.routers.availability import MOCK_BEARER_TOKEN  # noqa: E402
+
+RESTAURANT = "TheHungryUnicorn"
+PREFIX = f"/api/ConsumerApi/v1/Restaurant/{RESTAURANT}"
+SLOT_TIMES = ["12:00:00", "12:30:00", "13:00:00", "13:30:00",
+              "19:00:00", "19:30:00", "20:00:00", "20:30:00"]
+DEFAULT_MIX = "availability=60,book=15,get=15,update=5,cancel=5"
+OPERATIONS = ("availability", "book", "get", "update", "cancel")
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "op=weight,..." into a weight per operation."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # Multiply before dividing so e.g. p7 of 100 values is exactly rank 7
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Latencies and outcomes per operation for the measured phase."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.enabled = False
+
+    def record(self, op: str, seconds: float, error: Optional[str]) -> None:
+        if not self.enabled:
+            return
+        self.latencies[op].append(seconds)
+        if error:
+            self.errors[op][error] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        def stats(values: List[float], errors: Counter) -> dict:
+            ordered = sorted(values)
+            return {
+                "requests": len(ordered),
+                "throughput_rps": round(len(ordered) / elapsed, 1),
+                "errors": sum(errors.values()),
+                "error_breakdown": dict(errors),
+                "latency_ms": {
+                    "p50": round(percentile(ordered, 50) * 1000, 2),
+                    "p95": round(percentile(ordered, 95) * 1000, 2),
+                    "p99": round(percentile(ordered, 99) * 1000, 2),
+                    "max": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+                },
+            }
+
+        all_latencies = [v for vs in self.latencies.values() for v in vs]
+        all_errors = sum(self.errors.values(), Counter())
+        return {
+            "total": stats(all_latencies, all_errors),
+            "operations": {
+                op: stats(self.latencies[op], self.errors[op])
+                for op in sorted(self.latencies)
+            },
+        }
+
+
+class Workload:
+    """Builds and sends requests for the configured operation mix."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float],
+                 rng: random.Random, recorder: Recorder) -> None:
+        self.client = client
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.rng = rng
+        self.recorder = recorder
+        self.refs: List[str] = []
+
+    def _visit_date(self) -> str:
+        return (date.today() + timedelta(days=self.rng.randrange(0, 28))).isoformat()
+
+    async def run_one(self, scheduled: Optional[float] = None) -> None:
+        """Send one request; latency counts from `scheduled` when given."""
+        op = self.rng.choices(self.ops, self.weights)[0]
+        if op in ("get", "update", "cancel") and not self.refs:
+            op = "book"
+        start = scheduled if scheduled is not None else time.perf_counter()
+        error = None
+        try:
+            resp = await self._send(op)
+            if resp.status_code >= 400:
+                error = f"http_{resp.status_code}"
+            elif op == "book":
+                self.refs.append(resp.json()["booking_reference"])
+        except httpx.TimeoutException:
+            error = "timeout"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.recorder.record(op, time.perf_counter() - start, error)
+
+    async def _send(self, op: str) -> httpx.Response:
+        if op == "availability":
+            return await self.client.post(f"{PREFIX}/AvailabilitySearch", data={
+                "VisitDate": self._visit_date(),
+                "PartySize": self.rng.randint(1, 8),
+                "ChannelCode": "ONLINE",
+            })
+        if op == "book":
+            return await self.client.post(f"{PREFIX}/BookingWithStripeToken", data={
+                "VisitDate": self._visit_date(),
+                "VisitTime": self.rng.choice(SLOT_TIMES),
+                "PartySize": self.rng.randint(1, 8),
+                "ChannelCode": "ONLINE",
+                "Customer[FirstName]": "Load",
+                "Customer[Surname]": "Test",
+                "Customer[Email]": f"load{self.rng.randrange(1000)}@example.com",
+            })
+        if op == "get":
+            ref = self.rng.choice(self.refs)
+            return await self.client.get(f"{PREFIX}/Booking/{ref}")
+        if op == "update":
+            ref = self.rng.choice(self.refs)
+            return await self.client.patch(f"{PREFIX}/Booking/{ref}", data={
+                "PartySize": self.rng.randint(1, 8),
+            })
+        # cancel: take the reference out of the pool so it is cancelled once
+        ref = self.refs.pop(self.rng.randrange(len(self.refs)))
+        return await self.client.post(f"{PREFIX}/Booking/{ref}/Cancel", data={
+            "micrositeName": RESTAURANT,
+            "bookingReference": ref,
+            "cancellationReasonId": 1,
+        })
+
+
+async def closed_loop(workload: Workload, concurrency: int, seconds: float) -> None:
+    """Run `concurrency` users back to back until `seconds` elapse."""
+    deadline = time.perf_counter() + seconds
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            await workload.run_one()
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(workload: Workload, rate: float, seconds: float,
+                    max_outstanding: int) -> int:
+    """
+    Start requests at Poisson arrival times for `seconds`.
+
+    Returns:
+        int: Arrivals dropped because `max_outstanding` requests were in flight
+    """
+    tasks = set()
+    dropped = 0
+    next_at = time.perf_counter()
+    deadline = next_at + seconds
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_outstanding:
+            dropped += 1
+        else:
+            task = asyncio.create_task(workload.run_one(scheduled=next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        next_at += workload.rng.expovariate(rate)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return dropped
+
+
+async def drive(args: argparse.Namespace, base_url: str) -> dict:
+    """Warm up, measure, and build the report."""
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=args.concurrency if args.mode == "closed" else args.max_outstanding,
+        max_keepalive_connections=args.concurrency if args.mode == "closed" else args.max_outstanding,
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {MOCK_BEARER_TOKEN}"},
+        limits=limits,
+        timeout=args.timeout,
+    ) as client:
+        workload = Workload(client, args.mix, random.Random(args.seed), recorder)
+
+        async def phase(seconds: float) -> int:
+            if args.mode == "closed":
+                await closed_loop(workload, args.concurrency, seconds)
+                return 0
+            return await open_loop(workload, args.rate, seconds, args.max_outstanding)
+
+        await phase(args.warmup)
+        recorder.enabled = True
+        start = time.perf_counter()
+        dropped = await phase(args.duration)
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "config": {
+            "mode": args.mode,
+            "concurrency": args.concurrency if args.mode == "closed" else None,
+            "rate": args.rate if args.mode == "open" else None,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": args.mix,
+            "workers": args.workers,
+            "storage_engine": args.storage_engine,
+            "seed": args.seed,
+            "cores": os.cpu_count(),
+        },
+        "elapsed_s": round(elapsed, 2),
+    }
+    if args.mode == "open":
+        report["dropped_arrivals"] = dropped
+    report.update(recorder.summary(elapsed))
+    return report
+
+
+def start_server(args: argparse.Namespace, workdir: str) -> (subprocess.Popen, str):
+    """Launch the API in `workdir` and wait until it answers."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, STORAGE_ENGINE=args.storage_engine)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app", "--production", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(args.workers)],
+        cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return proc, base_url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("server did not become ready")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="closed loop: simultaneous users")
+    parser.add_argument("--rate", type=float, default=200.0,
+                        help="open loop: arrivals per second")
+    parser.add_argument("--max-outstanding", type=int, default=256,
+                        help="open loop: cap on requests in flight")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds discarded")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    parser.add_argument("--storage-engine", choices=["sqlalchemy", "memory"],
+                        default="sqlalchemy")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        proc, base_url = start_server(args, workdir)
+        try:
+            report = asyncio.run(drive(args, base_url))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the chat parsing functions.
+
+Runs each parser in chat_app.py over the utterance corpus in
+bench/data/chat_corpus.txt and reports the best-of-N cost in ns per call,
+plus the parse cost of one whole chat turn (intent detection followed by a
+slot-filling pass, as process_message does for a booking message). Results
+are compared with the stored baseline in bench/baselines/parsers.json.
+
+intent_keywords times the compiled keyword matcher detect_intent uses;
+intent_keywords_legacy times the any()-per-intent scan it replaced, over the
+same INTENT_RULES, for comparison. --corpus bench/data/chat_corpus_large.txt
+runs everything over a larger generated corpus; the baseline is only
+compared for the default corpus.
+
+The parsers print DEBUG lines; stdout is sent to /dev/null while timing, so
+the numbers include formatting those lines but not terminal I/O.
+
+Usage:
+    python bench/parsers.py
+    python bench/parsers.py --save-baseline
+    python bench/parsers.py --max-regression 20
+    python bench/parsers.py --corpus bench/data/chat_corpus_large.txt
+
+Exits with status 1 if --max-regression is given and any benchmark is more
+than that many percent slower than its baseline.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+CORPUS_PATH = os.path.join(REPO_ROOT, "bench", "data", "chat_corpus.txt")
+BASELINE_PATH = os.path.join(REPO_ROOT, "bench", "baselines", "parsers.json")
+
+# chat_app refuses to import without a token; the parsers never use it
+os.environ.setdefault("BOOKING_API_TOKEN", "benchmark-token")
+
+import chat_app  # noqa: E402
+
+# detect_intent only reads the message; any session state will do
+assistant = chat_app.BookingAssistant()
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    """Read the utterance corpus, lowercased and stripped like process_message."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line.lower() for line in lines if line and not line.startswith("#")]
+
+
+def turn_parse(message: str) -> None:
+    """Parse work for one booking turn: intent detection plus slot filling."""
+    sess = {"slots": dict.fromkeys(
+        ["date", "time", "party", "name", "email", "mobile", "ref"]
+    )}
+    # One assistant per turn, sharing its message analysis as process_message does
+    turn = chat_app.BookingAssistant(sess)
+    turn.detect_intent(message)
+    chat_app.fill_booking_slots(sess, message, turn.analyze(message))
+
+
+def legacy_intent_keywords(message: str) -> object:
+    """The keyword scan detect_intent did before IntentMatcher."""
+    for intent, keywords in chat_app.INTENT_RULES:
+        if any(word in message for word in keywords):
+            return intent
+    return None
+
+
+BENCHMARKS: Dict[str, Callable[[str], object]] = {
+    "parse_date_natural": chat_app.parse_date_natural,
+    "extract_time_from_text": chat_app.extract_time_from_text,
+    "normalize_time_to_hhmmss": chat_app.normalize_time_to_hhmmss,
+    "parse_party": chat_app.parse_party,
+    "detect_intent": lambda m: assistant.detect_intent(m),
+    "turn_parse": turn_parse,
+    "intent_keywords": chat_app.intent_matcher.match,
+    "intent_keywords_legacy": legacy_intent_keywords,
+}
+
+
+def time_over_corpus(fn: Callable[[str], object], corpus: List[str], loops: int) -> float:
+    """Run `fn` over the corpus `loops` times and return elapsed seconds."""
+    start = time.perf_counter()
+    for _ in range(loops):
+        for message in corpus:
+            fn(message)
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable[[str], object], corpus: List[str],
+            repeat: int, min_time: float) -> float:
+    """
+    Best-of-`repeat` cost of one call in nanoseconds.
+
+    The loop count is calibrated first so each repeat runs for at least
+    `min_time` seconds.
+    """
+    loops = 1
+    while time_over_corpus(fn, corpus, loops) < min_time:
+        loops *= 2
+    best = min(time_over_corpus(fn, corpus, loops) for _ in range(repeat))
+    return best / (loops * len(corpus)) * 1e9
+
+
+def load_baseline() -> dict:
+    """Return the stored baseline, or an empty one if none exists yet."""
+    if not os.path.exists(BASELINE_PATH):
+        return {"results_ns": {}}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds per repeat")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append",
+                        help="run only this benchmark (may be repeated)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"write the results to {os.path.relpath(BASELINE_PATH, REPO_ROOT)}")
+    parser.add_argument("--max-regression", type=float,
+                        help="fail if any benchmark is this many percent over baseline")
+    parser.add_argument("--corpus", default=CORPUS_PATH,
+                        help="utterance file (default: %(default)s)")
+    args = parser.parse_args()
+
+    # Baselines are per corpus; only the default one has stored numbers
+    default_corpus = os.path.abspath(args.corpus) == CORPUS_PATH
+    if args.save_baseline and not default_corpus:
+        parser.error("--save-baseline only applies to the default corpus")
+
+    corpus = load_corpus(args.corpus)
+    names = args.only or list(BENCHMARKS)
+
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name in names:
+            results[name] = measure(BENCHMARKS[name], corpus, args.repeat, args.min_time)
+
+    baseline = load_baseline() if default_corpus else {"results_ns": {}}
+    report = {
+        "corpus_size": len(corpus),
+        "python": platform.python_version(),
+        "benchmarks": {},
+    }
+    regressions = []
+    for name, ns in results.items():
+        entry = {"ns_per_op": round(ns)}
+        base = baseline["results_ns"].get(name)
+        if base:
+            change = (ns - base) / base * 100
+            entry["baseline_ns"] = base
+            entry["change_pct"] = round(change, 1)
+            if args.max_regression is not None and change > args.max_regression:
+                regressions.append(name)
+        report["benchmarks"][name] = entry
+    if args.max_regression is not None:
+        report["regressions"] = regressions
+
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        baseline["results_ns"].update({name: round(ns) for name, ns in results.items()})
+        baseline["python"] = platform.python_version()
+        baseline["machine"] = platform.machine()
+        baseline["corpus_size"] = len(corpus)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
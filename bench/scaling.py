@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Worker-scaling benchmark for the production launcher.
+
+Starts `python -m app --production` with 1, 2, 4, ... workers (up to the
+core count) in a scratch directory and drives it with several client
+processes, each looping AvailabilitySearch requests over its own keep-alive
+connection for a fixed duration. Prints requests/sec per worker count as
+JSON, together with the machine's core count.
+
+Usage:
+    python bench/scaling.py --duration 10 --clients 8
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from app.routers.availability import MOCK_BEARER_TOKEN  # noqa: E402
+
+PATH = "/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn/AvailabilitySearch"
+HEADERS = {
+    "Authorization": f"Bearer {MOCK_BEARER_TOKEN}",
+    "Content-Type": "application/x-www-form-urlencoded",
+}
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    """Block until the server answers GET /."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not become ready")
+
+
+def client_loop(port: int, duration: float, result_queue) -> None:
+    """Send requests on one keep-alive connection until `duration` elapses."""
+    body = urlencode({
+        "VisitDate": (date.today() + timedelta(days=1)).isoformat(),
+        "PartySize": 2,
+        "ChannelCode": "ONLINE",
+    })
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    ok = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            conn.request("POST", PATH, body=body, headers=HEADERS)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status == 200:
+                ok += 1
+            else:
+                errors += 1
+        except OSError:
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    result_queue.put((ok, errors))
+
+
+def measure(workers: int, clients: int, duration: float, workdir: str) -> dict:
+    """Run one server configuration and return its throughput."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app", "--production", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        queue = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=client_loop, args=(port, duration, queue))
+            for _ in range(clients)
+        ]
+        for p in procs:
+            p.start()
+        totals = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    ok = sum(t[0] for t in totals)
+    errors = sum(t[1] for t in totals)
+    return {
+        "workers": workers,
+        "requests": ok,
+        "errors": errors,
+        "requests_per_sec": round(ok / duration, 1),
+    }
+
+
+def main() -> int:
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=max(4, cores * 2))
+    parser.add_argument("--max-workers", type=int, default=cores)
+    args = parser.parse_args()
+
+    counts = []
+    n = 1
+    while n < args.max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(args.max_workers)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [measure(w, args.clients, args.duration, workdir) for w in counts]
+
+    print(json.dumps({"cores": cores, "clients": args.clients, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
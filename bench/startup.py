@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the mock API server.
+
+Launches the server in a fresh process and measures the wall time from spawn
+(interpreter start + import of app.main + lifespan startup) until the first
+successful response from GET /. The first run uses an empty database and
+takes the slow path (create tables + seed); the following runs reuse that
+database and should take the fast path.
+
+Each run happens in a scratch directory so the project's own
+restaurant_booking.db is never touched.
+
+Usage:
+    python bench/startup.py --runs 5 --budget-ms 1500
+
+Exits with status 1 if the median warm startup exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_once(workdir: str, timeout: float, extra_env: dict) -> float:
+    """Start the server once and return milliseconds until the first 200."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, **extra_env)
+    url = f"http://127.0.0.1:{port}/"
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"server did not answer within {timeout}s")
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="warm runs to measure")
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="budget for the median warm startup")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--prerender-openapi", action="store_true",
+                        help="set PRERENDER_OPENAPI=1 for the server")
+    args = parser.parse_args()
+
+    extra_env = {"PRERENDER_OPENAPI": "1"} if args.prerender_openapi else {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cold = measure_once(workdir, args.timeout, extra_env)
+        warm = [measure_once(workdir, args.timeout, extra_env) for _ in range(args.runs)]
+
+    median = statistics.median(warm)
+    result = {
+        "cold_ms": round(cold, 1),
+        "warm_ms": [round(w, 1) for w in warm],
+        "warm_median_ms": round(median, 1),
+        "budget_ms": args.budget_ms,
+        "within_budget": median <= args.budget_ms,
+    }
+    print(json.dumps(result, indent=2))
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
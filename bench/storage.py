@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Storage engine throughput benchmark.
+
+Measures requests/sec for the five API operations against each storage
+engine (STORAGE_ENGINE = sqlalchemy and memory) through the FastAPI app
+in-process, along with the SQL statements each one runs (from the
+X-Query-Count header), so query-count regressions show up here. Requests
+are driven straight through the ASGI interface, so the numbers reflect the
+app and storage cost without any network overhead. Behaviour the engines
+must share is tested in tests/test_storage_contract.py.
+
+Each engine runs in its own subprocess and scratch directory (the engine is
+chosen at import time, and the project's restaurant_booking.db is never
+touched).
+
+Usage:
+    python bench/storage.py --seconds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ["sqlalchemy", "memory"]
+
+# Response headers of the most recent call(), lower-cased names
+last_headers = {}
+PREFIX = "/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn"
+
+
+async def call(app, method: str, path: str, form: dict = None, headers: dict = None):
+    """Send one request through the ASGI interface; return (status, json)."""
+    body = urlencode(form or {}).encode()
+    raw_headers = [(b"content-type", b"application/x-www-form-urlencoded")]
+    raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": raw_headers,
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8547),
+    }
+    sent = False
+    chunks = []
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            last_headers.clear()
+            last_headers.update(
+                (k.decode().lower(), v.decode()) for k, v in message.get("headers", [])
+            )
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, json.loads(b"".join(chunks) or b"null")
+
+
+async def run_engine(seconds: float) -> dict:
+    """Throughput for the engine in STORAGE_ENGINE."""
+    sys.path.insert(0, REPO_ROOT)
+    from app.main import app
+    from app.routers.availability import MOCK_BEARER_TOKEN
+    from app.storage import init_storage
+
+    init_storage()
+    auth = {"Authorization": f"Bearer {MOCK_BEARER_TOKEN}"}
+    visit = (date.today() + timedelta(days=2)).isoformat()
+    search = {"VisitDate": visit, "PartySize": 2, "ChannelCode": "ONLINE"}
+
+    # A booking for the get/update operations to work on
+    book_form = dict(search, VisitTime="19:00:00", **{"Customer[Email]": "bench@example.com"})
+    status, booked = await call(app, "POST", f"{PREFIX}/BookingWithStripeToken", book_form, auth)
+    assert status == 200, booked
+    ref = booked["booking_reference"]
+
+    ops = {
+        "availability_search": lambda: call(app, "POST", f"{PREFIX}/AvailabilitySearch", search, auth),
+        "create_booking": lambda: call(app, "POST", f"{PREFIX}/BookingWithStripeToken", book_form, auth),
+        "get_booking": lambda: call(app, "GET", f"{PREFIX}/Booking/{ref}", headers=auth),
+        "update_booking": lambda: call(app, "PATCH", f"{PREFIX}/Booking/{ref}", {"SpecialRequests": str(time.perf_counter())}, auth),
+        "root": lambda: call(app, "GET", "/"),
+    }
+    results = {}
+    queries = {}
+    for name, op in ops.items():
+        await op()
+        queries[name] = int(last_headers.get("x-query-count", 0))
+        n = 0
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            await op()
+            n += 1
+        results[name] = round(n / (time.perf_counter() - start), 1)
+    return {"requests_per_sec": results, "queries_per_request": queries}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=3.0, help="per operation")
+    parser.add_argument("--engine", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(asyncio.run(run_engine(args.seconds))))
+        return 0
+
+    report = {}
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as workdir:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--engine", engine,
+                 "--seconds", str(args.seconds)],
+                cwd=workdir, env=dict(os.environ, STORAGE_ENGINE=engine),
+                capture_output=True, text=True,
+            )
+        if out.returncode != 0:
+            print(out.stderr, file=sys.stderr)
+            return 1
+        report[engine] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    base = report["sqlalchemy"]["requests_per_sec"]
+    report["speedup"] = {
+        op: round(rps / base[op], 1)
+        for op, rps in report["memory"]["requests_per_sec"].items()
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Booking API Client shared by the chat frontends.
+
+`BookingClient` (requests) and `AsyncBookingClient` (httpx) wrap the five
+booking API operations plus the server status check, with:
+
+- one pooled HTTP session per client, so calls reuse keep-alive connections
+  instead of opening a TCP connection each
+- a connect and a read timeout on every call (API_CONNECT_TIMEOUT_S,
+  API_READ_TIMEOUT_S)
+- up to API_RETRIES retries with full-jitter exponential backoff (base
+  API_BACKOFF_S, honouring Retry-After) after connection errors, timeouts
+  and 429/502/503/504 responses, for idempotent calls only: availability
+  search, get and update, and booking creation, which is sent with an
+  Idempotency-Key so a retry replays the first booking rather than making
+  another. Cancellation is never retried.
+- `ApiResponse` results instead of raw HTTP responses
+- per-operation call counts, errors, retries and timings (`stats()`)
+
+An optional `app.tracing.Tracer` wraps each call in a client span and sends
+the traceparent header.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+API_CONNECT_TIMEOUT_S = float(os.getenv("API_CONNECT_TIMEOUT_S", "3"))
+API_READ_TIMEOUT_S = float(os.getenv("API_READ_TIMEOUT_S", "10"))
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+API_BACKOFF_S = float(os.getenv("API_BACKOFF_S", "0.2"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+
+# Longest single backoff, including a server-sent Retry-After
+MAX_BACKOFF_S = 5.0
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+@dataclass
+class ApiResponse:
+    """
+    Outcome of one API operation, after any retries.
+
+    Attributes:
+        operation (str): Operation name, e.g. "availability_search"
+        status_code (int): HTTP status, or 0 if no response was received
+        data (dict): Parsed JSON body ({} when absent or not JSON)
+        text (str): Raw body, for error messages
+        elapsed_ms (float): Time for all attempts including backoff
+        attempts (int): Requests sent
+        error (str): Network error description when status_code is 0
+    """
+
+    operation: str
+    status_code: int = 0
+    data: Dict[str, Any] = field(default_factory=dict)
+    text: str = ""
+    elapsed_ms: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def error_message(self) -> str:
+        """Short description of a failed call, for showing to the user."""
+        if self.error is not None:
+            return f"Network error: {self.error}"
+        return f"API error {self.status_code}: {self.text[:200]}"
+
+
+@dataclass
+class CallStats:
+    """Counters and timings for one operation."""
+
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+@dataclass
+class Call:
+    """A prepared API call: what to send and whether it may be retried."""
+
+    operation: str
+    span_name: str
+    method: str
+    url: str
+    data: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    idempotent: bool = False
+
+
+class _BookingClientBase:
+    """
+    Builds calls and keeps statistics; subclasses send them.
+
+    Args:
+        base_url: Restaurant base URL, e.g.
+            http://localhost:8547/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn
+        token: Bearer token
+        tracer: Optional `app.tracing.Tracer` for client spans
+        retries: Retries after the first attempt for idempotent calls
+        backoff: Base backoff in seconds
+    """
+
+    def __init__(self, base_url: str, token: str, tracer: Any = None,
+                 retries: int = API_RETRIES, backoff: float = API_BACKOFF_S) -> None:
+        self.base_url = base_url.rstrip("/")
+        parts = urlsplit(self.base_url)
+        self.root_url = f"{parts.scheme}://{parts.netloc}/"
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.tracer = tracer
+        self.retries = retries
+        self.backoff = backoff
+        self.call_stats: Dict[str, CallStats] = {}
+
+    # Call builders
+
+    def _availability_call(self, visit_date: str, party_size: int,
+                           channel_code: str = "ONLINE") -> Call:
+        return Call(
+            "availability_search", "POST AvailabilitySearch", "POST",
+            f"{self.base_url}/AvailabilitySearch",
+            data={"VisitDate": visit_date, "PartySize": party_size, "ChannelCode": channel_code},
+            idempotent=True,
+        )
+
+    def _create_booking_call(self, visit_date: str, visit_time: str, party_size: int,
+                             customer: Dict[str, Any], special_requests: str = "",
+                             channel_code: str = "ONLINE",
+                             idempotency_key: Optional[str] = None) -> Call:
+        data = {
+            "VisitDate": visit_date,
+            "VisitTime": visit_time,
+            "PartySize": party_size,
+            "ChannelCode": channel_code,
+            "SpecialRequests": special_requests,
+        }
+        for name, value in customer.items():
+            data[f"Customer[{name}]"] = value
+        return Call(
+            "create_booking", "POST BookingWithStripeToken", "POST",
+            f"{self.base_url}/BookingWithStripeToken", data=data,
+            headers={"Idempotency-Key": idempotency_key or uuid.uuid4().hex},
+            idempotent=True,
+        )
+
+    def _get_booking_call(self, reference: str) -> Call:
+        return Call("get_booking", "GET Booking", "GET",
+                    f"{self.base_url}/Booking/{reference}", idempotent=True)
+
+    def _update_booking_call(self, reference: str, changes: Dict[str, Any]) -> Call:
+        # Fields are set to absolute values, so repeating the call is harmless
+        return Call("update_booking", "PATCH Booking", "PATCH",
+                    f"{self.base_url}/Booking/{reference}", data=changes, idempotent=True)
+
+    def _cancel_booking_call(self, reference: str, reason_id: int,
+                             microsite_name: str) -> Call:
+        return Call(
+            "cancel_booking", "POST Booking Cancel", "POST",
+            f"{self.base_url}/Booking/{reference}/Cancel",
+            data={
+                "micrositeName": microsite_name,
+                "bookingReference": reference,
+                "cancellationReasonId": str(reason_id),
+            },
+        )
+
+    def _status_call(self) -> Call:
+        return Call("server_status", "GET /", "GET", self.root_url, idempotent=True)
+
+    # Retry policy and bookkeeping
+
+    def _request_headers(self, call: Call) -> Dict[str, str]:
+        headers = dict(self.headers, **call.headers)
+        return self.tracer.inject(headers) if self.tracer is not None else headers
+
+    def _span(self, call: Call) -> ContextManager:
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(call.span_name, kind="client")
+
+    def _retry_delay(self, call: Call, attempt: int, status_code: int,
+                     retry_after: Optional[str]) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None to stop.
+
+        Args:
+            call: The call that failed
+            attempt: Attempts made so far (1 after the first)
+            status_code: Response status, 0 after a network error
+            retry_after: Retry-After header of the response, if any
+        """
+        if not call.idempotent or attempt > self.retries:
+            return None
+        if status_code and status_code not in RETRY_STATUSES:
+            return None
+        delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return min(delay, MAX_BACKOFF_S)
+
+    def _record(self, result: ApiResponse) -> ApiResponse:
+        stats = self.call_stats.get(result.operation)
+        if stats is None:
+            stats = self.call_stats[result.operation] = CallStats()
+        stats.calls += 1
+        stats.retries += result.attempts - 1
+        stats.total_ms += result.elapsed_ms
+        stats.max_ms = max(stats.max_ms, result.elapsed_ms)
+        if not result.ok:
+            stats.errors += 1
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and timings per operation."""
+        return {op: stats.as_dict() for op, stats in sorted(self.call_stats.items())}
+
+
+def _read_response(result: ApiResponse, response: Any) -> None:
+    """Copy status and body of a requests or httpx response into `result`."""
+    result.status_code, result.error = response.status_code, None
+    result.text = response.text
+    result.data = {}
+    if "json" in response.headers.get("content-type", ""):
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        if isinstance(data, dict):
+            result.data = data
+
+
+class BookingClient(_BookingClientBase):
+    """
+    Synchronous client on a pooled `requests.Session`.
+
+    Safe to share between threads for sending; statistics updates are not
+    synchronised, so counts may be approximate under heavy concurrency.
+
+    Args:
+        pool_size: Keep-alive connections kept per host
+        (see `_BookingClientBase` for the rest)
+    """
+
+    def __init__(self, base_url: str, token: str, tracer: Any = None,
+                 retries: int = API_RETRIES, backoff: float = API_BACKOFF_S,
+                 pool_size: int = API_POOL_SIZE) -> None:
+        super().__init__(base_url, token, tracer, retries, backoff)
+        self.timeout: Tuple[float, float] = (API_CONNECT_TIMEOUT_S, API_READ_TIMEOUT_S)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, call: Call) -> ApiResponse:
+        """Send a prepared call, retrying according to the retry policy."""
+        result = ApiResponse(call.operation)
+        start = time.perf_counter()
+        with self._span(call):
+            while True:
+                result.attempts += 1
+                retry_after = None
+                try:
+                    response = self.session.request(
+                        call.method, call.url, data=call.data,
+                        headers=self._request_headers(call), timeout=self.timeout
+                    )
+                    _read_response(result, response)
+                    retry_after = response.headers.get("Retry-After")
+                except requests.RequestException as e:
+                    result.status_code, result.error = 0, str(e)
+                delay = None if result.ok else self._retry_delay(
+                    call, result.attempts, result.status_code, retry_after
+                )
+                if delay is None:
+                    break
+                time.sleep(delay)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return self._record(result)
+
+    def check_availability(self, visit_date: str, party_size: int,
+                           channel_code: str = "ONLINE") -> ApiResponse:
+        return self.send(self._availability_call(visit_date, party_size, channel_code))
+
+    def create_booking(self, visit_date: str, visit_time: str, party_size: int,
+                       customer: Dict[str, Any], special_requests: str = "",
+                       channel_code: str = "ONLINE",
+                       idempotency_key: Optional[str] = None) -> ApiResponse:
+        return self.send(self._create_booking_call(
+            visit_date, visit_time, party_size, customer, special_requests,
+            channel_code, idempotency_key
+        ))
+
+    def get_booking(self, reference: str) -> ApiResponse:
+        return self.send(self._get_booking_call(reference))
+
+    def update_booking(self, reference: str, **changes: Any) -> ApiResponse:
+        return self.send(self._update_booking_call(reference, changes))
+
+    def cancel_booking(self, reference: str, reason_id: int = 1,
+                       microsite_name: str = "TheHungryUnicorn") -> ApiResponse:
+        return self.send(self._cancel_booking_call(reference, reason_id, microsite_name))
+
+    def server_status(self) -> ApiResponse:
+        return self.send(self._status_call())
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncBookingClient(_BookingClientBase):
+    """
+    Asynchronous client on a pooled `httpx.AsyncClient`.
+
+    Create and use it inside one event loop; call `aclose()` when done.
+    Requests beyond `pool_size` wait on a semaphore rather than in httpx's
+    pool queue, whose bookkeeping grows with the queue on every request and
+    which would fail them after the pool timeout.
+
+    Args:
+        pool_size: Keep-alive connections kept, and requests sent at once
+        (see `_BookingClientBase` for the rest)
+    """
+
+    def __init__(self, base_url: str, token: str, tracer: Any = None,
+                 retries: int = API_RETRIES, backoff: float = API_BACKOFF_S,
+                 pool_size: int = API_POOL_SIZE) -> None:
+        super().__init__(base_url, token, tracer, retries, backoff)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(API_READ_TIMEOUT_S, connect=API_CONNECT_TIMEOUT_S),
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size),
+        )
+        self.slots = asyncio.Semaphore(pool_size)
+
+    async def send(self, call: Call) -> ApiResponse:
+        """Send a prepared call, retrying according to the retry policy."""
+        result = ApiResponse(call.operation)
+        start = time.perf_counter()
+        with self._span(call):
+            while True:
+                result.attempts += 1
+                retry_after = None
+                try:
+                    async with self.slots:
+                        response = await self.client.request(
+                            call.method, call.url, data=call.data,
+                            headers=self._request_headers(call)
+                        )
+                    _read_response(result, response)
+                    retry_after = response.headers.get("Retry-After")
+                except httpx.HTTPError as e:
+                    result.status_code, result.error = 0, str(e) or type(e).__name__
+                delay = None if result.ok else self._retry_delay(
+                    call, result.attempts, result.status_code, retry_after
+                )
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return self._record(result)
+
+    async def check_availability(self, visit_date: str, party_size: int,
+                                 channel_code: str = "ONLINE") -> ApiResponse:
+        return await self.send(self._availability_call(visit_date, party_size, channel_code))
+
+    async def create_booking(self, visit_date: str, visit_time: str, party_size: int,
+                             customer: Dict[str, Any], special_requests: str = "",
+                             channel_code: str = "ONLINE",
+                             idempotency_key: Optional[str] = None) -> ApiResponse:
+        return await self.send(self._create_booking_call(
+            visit_date, visit_time, party_size, customer, special_requests,
+            channel_code, idempotency_key
+        ))
+
+    async def get_booking(self, reference: str) -> ApiResponse:
+        return await self.send(self._get_booking_call(reference))
+
+    async def update_booking(self, reference: str, **changes: Any) -> ApiResponse:
+        return await self.send(self._update_booking_call(reference, changes))
+
+    async def cancel_booking(self, reference: str, reason_id: int = 1,
+                             microsite_name: str = "TheHungryUnicorn") -> ApiResponse:
+        return await self.send(self._cancel_booking_call(reference, reason_id, microsite_name))
+
+    async def server_status(self) -> ApiResponse:
+        return await self.send(self._status_call())
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
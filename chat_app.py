@@ -1,11 +1,27 @@
-from flask import Flask, render_template, request, jsonify, session
-import requests
+from flask import Flask, Response, render_template, request, jsonify, session
 import json
 from datetime import datetime, date, timedelta
 import re
 import os
+import time
+import contextvars
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo  # Python 3.9+ (UK tz)
+from app.tracing import Tracer
+from booking_client import BookingClient
+from chat_sessions import make_session_store
+from intents import IntentMatcher
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Tracing is enabled by TRACE_FILE (see app/tracing.py); spans from this app
+# and the API share a trace via the traceparent header
+tracer = Tracer("chat_app")
 
 # UK timezone for date calculations
 UK_TZ = ZoneInfo("Europe/London")
@@ -13,23 +29,25 @@ UK_TZ = ZoneInfo("Europe/London")
 def today_uk():
     return datetime.now(UK_TZ).date()
 
+# Time patterns within the text, tried in order: (pattern, is AM/PM)
+# Pattern: "at 8 PM", "8 PM", "8pm", "19:30", etc.
+TIME_PATTERNS = [
+    (re.compile(r'\bat\s+(\d{1,2})\s+(pm|am)\b'), True),  # "at 8 PM"
+    (re.compile(r'\b(\d{1,2})\s+(pm|am)\b'), True),        # "8 PM"
+    (re.compile(r'\b(\d{1,2})(pm|am)\b'), True),           # "8pm"
+    (re.compile(r'\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b'), False),  # "19:30" or "19:30:00"
+]
+
+@tracer.traced("parse.extract_time_from_text")
 def extract_time_from_text(text: str) -> str | None:
     """Extract time patterns from text and normalize to HH:MM:SS"""
     if not text: return None
     
-    # Look for time patterns within the text
-    # Pattern: "at 8 PM", "8 PM", "8pm", "19:30", etc.
-    time_patterns = [
-        r'\bat\s+(\d{1,2})\s+(pm|am)\b',  # "at 8 PM"
-        r'\b(\d{1,2})\s+(pm|am)\b',        # "8 PM"
-        r'\b(\d{1,2})(pm|am)\b',           # "8pm"
-        r'\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b',  # "19:30" or "19:30:00"
-    ]
-    
-    for pattern in time_patterns:
-        match = re.search(pattern, text.lower())
+    text = text.lower()
+    for pattern, is_ampm in TIME_PATTERNS:
+        match = pattern.search(text)
         if match:
-            if 'pm' in pattern or 'am' in pattern:
+            if is_ampm:
                 # AM/PM format
                 h = int(match.group(1))
                 if match.group(2) == "pm" and h != 12: h += 12
@@ -43,6 +61,13 @@ def extract_time_from_text(text: str) -> str | None:
     
     return None
 
+TIME_AMPM_RE = re.compile(r"^(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?(am|pm)$")
+TIME_SHORT_AMPM_RE = re.compile(r"^(\d{1,2})(pm|am)$")
+TIME_SPACE_AMPM_RE = re.compile(r"^(\d{1,2})\s+(pm|am)$")
+TIME_24H_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)(?::([0-5]\d))?$")
+TIME_HHMMSS_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d):([0-5]\d)$")
+
+@tracer.traced("parse.normalize_time_to_hhmmss")
 def normalize_time_to_hhmmss(t: str | None) -> str | None:
     if not t: return None
     # accept "7 pm", "7pm", "19:30", "19:30:15", "12:30", "12:30:00"
@@ -51,7 +76,7 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
     print(f"DEBUG: normalize_time_to_hhmmss input: '{t}' -> '{s}'")
     
     # map common am/pm
-    m_ampm = re.match(r"^(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?(am|pm)$", s)
+    m_ampm = TIME_AMPM_RE.match(s)
     if m_ampm:
         h = int(m_ampm.group(1)); mm = int(m_ampm.group(2) or 0); ss = int(m_ampm.group(3) or 0)
         if m_ampm.group(4) == "pm" and h != 12: h += 12
@@ -61,7 +86,7 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
         return result
     
     # 7pm without colon
-    m_short = re.match(r"^(\d{1,2})(pm|am)$", s)
+    m_short = TIME_SHORT_AMPM_RE.match(s)
     if m_short:
         h = int(m_short.group(1))
         if m_short.group(2) == "pm" and h != 12: h += 12
@@ -71,7 +96,7 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
         return result
     
     # Handle "8 PM" format (with space)
-    m_space_ampm = re.match(r"^(\d{1,2})\s+(pm|am)$", s)
+    m_space_ampm = TIME_SPACE_AMPM_RE.match(s)
     if m_space_ampm:
         h = int(m_space_ampm.group(1))
         if m_space_ampm.group(2) == "pm" and h != 12: h += 12
@@ -81,7 +106,7 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
         return result
     
     # 24h forms: "12:30", "19:30", "12:30:00"
-    m_24 = re.match(r"^([01]?\d|2[0-3]):([0-5]\d)(?::([0-5]\d))?$", s)
+    m_24 = TIME_24H_RE.match(s)
     if m_24:
         h, mm, ss = int(m_24.group(1)), int(m_24.group(2)), int(m_24.group(3) or 0)
         result = f"{h:02d}:{mm:02d}:{ss:02d}"
@@ -89,7 +114,7 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
         return result
     
     # Already in HH:MM:SS format
-    if re.match(r"^([01]?\d|2[0-3]):([0-5]\d):([0-5]\d)$", s):
+    if TIME_HHMMSS_RE.match(s):
         print(f"DEBUG: Already HH:MM:SS format -> {s}")
         return s
     
@@ -97,10 +122,20 @@ def normalize_time_to_hhmmss(t: str | None) -> str | None:
     return None
 
 MONTHS = "(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)"
+MONTH_ABBREVS = ["jan","feb","mar","apr","may","jun","jul","aug","sep","oct","nov","dec"]
+DATE_MONTH_DAY_RE = re.compile(rf"\b({MONTHS})[a-z]*\.?\s+(\d{{1,2}})(st|nd|rd|th)?\b")
+DATE_DAY_MONTH_RE = re.compile(rf"\b(\d{{1,2}})\s+({MONTHS})[a-z]*\.?(st|nd|rd|th)?\b")
+DATE_ISO_RE = re.compile(r"\b(20\d{2}-\d{2}-\d{2})\b")
+# (weekday, index, "next <day>", "on <day>") in Monday..Sunday order
+WEEKDAY_PHRASES = [
+    (name, idx, f"next {name}", f"on {name}")
+    for idx, name in enumerate(["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"])
+]
 
-def parse_date_natural(text: str) -> date | None:
+@tracer.traced("parse.parse_date_natural")
+def parse_date_natural(text: str, today: date | None = None) -> date | None:
     t = text.lower()
-    d0 = today_uk()
+    d0 = today or today_uk()
     
     print(f"DEBUG: parse_date_natural input: '{text}' -> '{t}'")
     print(f"DEBUG: today_uk() = {d0}")
@@ -120,9 +155,9 @@ def parse_date_natural(text: str) -> date | None:
         return sat
     
     # explicit weekday: "on Saturday", "next Friday"
-    wk_map = {"monday":0,"tuesday":1,"wednesday":2,"thursday":3,"friday":4,"saturday":5,"sunday":6}
-    for name, idx in wk_map.items():
-        if f"next {name}" in t or f"on {name}" in t or t.strip()==name:
+    stripped = t.strip()
+    for name, idx, next_phrase, on_phrase in WEEKDAY_PHRASES:
+        if next_phrase in t or on_phrase in t or stripped == name:
             wd = d0.weekday()
             delta = (idx - wd) % 7
             if delta == 0: delta = 7  # "next" same weekday → a week later
@@ -131,14 +166,14 @@ def parse_date_natural(text: str) -> date | None:
             return result
     
     # "August 7", "7 Aug", "Aug 7th"
-    m1 = re.search(rf"\b({MONTHS})[a-z]*\.?\s+(\d{{1,2}})(st|nd|rd|th)?\b", t)
+    m1 = DATE_MONTH_DAY_RE.search(t)
     if m1:
         mon = m1.group(1)[:3]
         day = int(m1.group(2))
         year = d0.year
         print(f"DEBUG: Pattern 1 match: month='{mon}', day={day}, year={year}")
         # if that date already passed this year, roll to next year
-        mon_num = ["jan","feb","mar","apr","may","jun","jul","aug","sep","oct","nov","dec"].index(mon) + 1
+        mon_num = MONTH_ABBREVS.index(mon) + 1
         try:
             cand = date(year, mon_num, day)
             if cand < d0: 
@@ -151,12 +186,12 @@ def parse_date_natural(text: str) -> date | None:
             return None
     
     # "7 August"
-    m2 = re.search(rf"\b(\d{{1,2}})\s+({MONTHS})[a-z]*\.?(st|nd|rd|th)?\b", t)
+    m2 = DATE_DAY_MONTH_RE.search(t)
     if m2:
         day = int(m2.group(1)); mon = m2.group(2)[:3]
         year = d0.year
         print(f"DEBUG: Pattern 2 match: day={day}, month='{mon}', year={year}")
-        mon_num = ["jan","feb","mar","apr","may","jun","jul","aug","sep","oct","nov","dec"].index(mon) + 1
+        mon_num = MONTH_ABBREVS.index(mon) + 1
         try:
             cand = date(year, mon_num, day)
             if cand < d0: 
@@ -169,7 +204,7 @@ def parse_date_natural(text: str) -> date | None:
             return None
     
     # ISO date fallback
-    m3 = re.search(r"\b(20\d{2}-\d{2}-\d{2})\b", t)
+    m3 = DATE_ISO_RE.search(t)
     if m3:
         try:
             cand = datetime.strptime(m3.group(1), "%Y-%m-%d").date()
@@ -182,17 +217,91 @@ def parse_date_natural(text: str) -> date | None:
     print(f"DEBUG: No date patterns matched")
     return None
 
+PARTY_RE = re.compile(r"\b(\d+)\s*(people|persons|guests|pax|party|seats?)\b")
+PARTY_NUMBER_RE = re.compile(r"\b([1-9]|1[0-2])\b")  # conservative
+
+@tracer.traced("parse.parse_party")
 def parse_party(text: str) -> int | None:
-    m = re.search(r"\b(\d+)\s*(people|persons|guests|pax|party|seats?)\b", text.lower())
+    m = PARTY_RE.search(text.lower())
     if m: return int(m.group(1))
-    m2 = re.search(r"\b([1-9]|1[0-2])\b", text)  # conservative
+    m2 = PARTY_NUMBER_RE.search(text)
     return int(m2.group(1)) if m2 else None
 
 def not_past(d: date) -> bool:
     return d >= today_uk()
 
-# Load environment variables from .env file
-load_dotenv()
+# naive contact extraction; improve as needed
+EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+MOBILE_RE = re.compile(r"\b(\+?\d{10,14})\b")
+NAME_RE = re.compile(r"\bfor\s+\d+\s+([A-Za-z]+)\b")  # "for 2 John"
+
+class parsed_once:
+    """
+    Method turned into an attribute computed on first access and then stored
+    on the instance. Unlike functools.cached_property before Python 3.12 it
+    takes no lock, which would cost more than most of these parses.
+    """
+    
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.fn(instance)
+        return value
+
+class MessageAnalysis:
+    """
+    What the parsers find in one message, each parsed at most once.
+    
+    A turn builds one analysis and every step (intent detection, the
+    conversation flow, slot filling) reads it instead of re-running the
+    parsers; a field is only parsed when first asked for.
+    """
+    
+    def __init__(self, text: str, today: date | None = None):
+        self.text = text
+        if today is not None:
+            self.today = today
+    
+    @parsed_once
+    def today(self):
+        return today_uk()
+    
+    @parsed_once
+    def date(self):
+        return parse_date_natural(self.text, self.today)
+    
+    @parsed_once
+    def time(self):
+        return extract_time_from_text(self.text)
+    
+    @parsed_once
+    def normalized_time(self):
+        """The whole message read as a time ("7 pm", "19:30"), for intent detection"""
+        return normalize_time_to_hhmmss(self.text)
+    
+    @parsed_once
+    def party(self):
+        return parse_party(self.text)
+    
+    @parsed_once
+    def email(self):
+        m = EMAIL_RE.search(self.text)
+        return m.group(0) if m else None
+    
+    @parsed_once
+    def mobile(self):
+        m = MOBILE_RE.search(self.text.replace(" ", ""))
+        return m.group(1) if m else None
+    
+    @parsed_once
+    def name(self):
+        m = NAME_RE.search(self.text)
+        return m.group(1).title() if m else None
 
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'restaurant_booking_secret_key')
@@ -208,24 +317,157 @@ TOKEN = os.getenv("BOOKING_API_TOKEN")
 if not TOKEN:
     raise RuntimeError("BOOKING_API_TOKEN environment variable is required. Please set it in your .env file or environment.")
 
-# Headers for API requests
-HEADERS = {
-    "Authorization": f"Bearer {TOKEN}",
-    "Content-Type": "application/x-www-form-urlencoded"
-}
+# Bounded pool for API lookups a turn makes concurrently, and the overall
+# time a turn waits for them
+FANOUT_WORKERS = int(os.getenv("CHAT_FANOUT_WORKERS", "8"))
+FANOUT_DEADLINE_S = float(os.getenv("CHAT_FANOUT_DEADLINE_S", "5"))
+
+# The blocking API client and the fan-out pool are built on first use, so
+# modules importing the turn logic (chat_app_async has its own async client
+# and runs lookups as tasks) do not create them
+_api_client = None
+_fanout_pool = None
+_lazy_lock = threading.Lock()
+
+def get_api_client():
+    """Pooled keep-alive client with timeouts and retries (see booking_client.py)"""
+    global _api_client
+    if _api_client is None:
+        with _lazy_lock:
+            if _api_client is None:
+                _api_client = BookingClient(BASE_URL, TOKEN, tracer=tracer)
+    return _api_client
+
+def get_fanout_pool():
+    """Thread pool the lookups of StartLookups effects run on"""
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _lazy_lock:
+            if _fanout_pool is None:
+                _fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS,
+                                                  thread_name_prefix="chat-fanout")
+    return _fanout_pool
+
+# Availability answers are reused for a short while; our own bookings,
+# changes and cancellations drop the affected date straight away
+AVAILABILITY_CACHE_TTL_S = float(os.getenv("AVAILABILITY_CACHE_TTL_S", "30"))
+AVAILABILITY_CACHE_SIZE = int(os.getenv("AVAILABILITY_CACHE_SIZE", "256"))
+
+class AvailabilityCache:
+    """
+    Bounded TTL + LRU cache of availability search results.
+    
+    Keyed by (visit date, party size); safe to use from the fan-out threads.
+    Only successful results are stored, and callers must not modify them.
+    """
+    
+    def __init__(self, ttl: float = AVAILABILITY_CACHE_TTL_S, max_entries: int = AVAILABILITY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (visit_date, party_size) -> (expires_at, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+    
+    def get(self, visit_date: str, party_size: int):
+        """Return the cached result, or None if absent or expired"""
+        key = (visit_date, party_size)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, visit_date: str, party_size: int, result: dict):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        key = (visit_date, party_size)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate_date(self, visit_date: str):
+        """Drop every party size cached for a date"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == visit_date]:
+                del self.entries[key]
+                self.invalidations += 1
+    
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "ttl_s": self.ttl
+            }
+
+availability_cache = AvailabilityCache()
+
+# Keyword intents, highest priority first; a message takes the first intent
+# with any keyword in it (see intents.py)
+INTENT_RULES = [
+    ("check_availability", ['available', 'availability', 'check', 'search', 'time', 'slot', 'when']),
+    ("book", ['book', 'reservation', 'reserve', 'make booking', 'table for', 'dinner', 'lunch']),
+    ("show_booking", ['my booking', 'booking info', 'reservation details', 'show booking', 'what time', 'show my']),
+    ("modify_booking", ['change', 'modify', 'update', 'edit', 'move']),
+    ("cancel_booking", ['cancel', 'cancellation']),
+    ("help", ['help']),
+]
+intent_matcher = IntentMatcher(INTENT_RULES)
 
 class BookingAssistant:
-    def __init__(self):
-        self.conversation_state = {}
-        self.current_booking = {}
+    def __init__(self, sess=None):
+        # One user's conversation state (see new_session); the assistant
+        # itself holds nothing between turns
+        self.sess = sess if sess is not None else new_session()
+        self.analysis = None
+    
+    def analyze(self, user_message):
+        """The turn's MessageAnalysis, built on first use"""
+        if self.analysis is None or self.analysis.text != user_message:
+            self.analysis = MessageAnalysis(user_message)
+        return self.analysis
+    
+    @property
+    def conversation_state(self):
+        return self.sess["conversation_state"]
+    
+    @property
+    def current_booking(self):
+        return self.sess["current_booking"]
+    
+    @current_booking.setter
+    def current_booking(self, booking):
+        self.sess["current_booking"] = booking
     
     def process_message(self, user_message):
         """Process user message and return appropriate response"""
+        return run_turn(self.turn(user_message))
+    
+    def turn(self, user_message):
+        """
+        process_message as a turn: a generator that yields the API work it
+        needs (see ApiCall) and returns the response. run_turn runs it on the
+        blocking client, chat_app_async.py on the async one.
+        """
         user_message = user_message.lower().strip()
-        
-        # Get or create session for this user
-        session_id = "default"  # In a real app, use user ID or session ID
-        sess = get_or_create_session(session_id)
+        sess = self.sess
+        analysis = self.analyze(user_message)
         
         # Smart intent detection
         intent = self.detect_intent(user_message)
@@ -240,7 +482,7 @@ class BookingAssistant:
         if sess["intent"] == "book":
             print("DEBUG: Continuing booking conversation")
             # Check if user is changing the date (e.g., "today", "tomorrow")
-            new_date = parse_date_natural(user_message)
+            new_date = analysis.date
             if new_date:
                 print("DEBUG: User changed date in booking mode, updating date slot")
                 sess["slots"]["date"] = new_date
@@ -248,7 +490,7 @@ class BookingAssistant:
                 missing = next_missing_booking_slot(sess)
                 if not missing:
                     # All slots filled, proceed with booking
-                    return self.handle_booking_creation(user_message)
+                    return (yield from self.handle_booking_creation(user_message))
                 else:
                     # Still missing slots, ask for next one
                     if missing == "time":
@@ -256,13 +498,13 @@ class BookingAssistant:
                     elif missing == "party":
                         return {"reply": "How many people?", "action": "ask_party"}
             
-            return self.handle_booking_creation(user_message)
+            return (yield from self.handle_booking_creation(user_message))
         
         # If we have an active availability intent, check if user wants to book
         if sess["intent"] == "check_availability":
             print("DEBUG: Continuing availability conversation")
             # Check if user is trying to book (has time/party info)
-            if extract_time_from_text(user_message) or parse_party(user_message):
+            if analysis.time or analysis.party:
                 print("DEBUG: User wants to book after availability check, switching to booking mode")
                 sess["intent"] = "book"
                 # Pre-fill slots from availability context
@@ -272,31 +514,31 @@ class BookingAssistant:
                         sess["slots"]["date"] = context["date"]
                     if context.get("party_size") and not sess["slots"]["party"]:
                         sess["slots"]["party"] = context["party_size"]
-                return self.handle_booking_creation(user_message)
+                return (yield from self.handle_booking_creation(user_message))
             
             # Check if user is changing the date (e.g., "today", "tomorrow")
-            new_date = parse_date_natural(user_message)
+            new_date = analysis.date
             if new_date:
                 print("DEBUG: User changed date, updating availability context")
                 sess["availability_context"]["date"] = new_date
-                return self.handle_availability_search(user_message)
+                return (yield from self.handle_availability_search(user_message))
                 
-            return self.handle_availability_search(user_message)
+            return (yield from self.handle_availability_search(user_message))
         
         # If we have an active booking intent, continue with slot filling
         if sess["intent"] == "book":
             print("DEBUG: Continuing booking conversation")
             
             # Check if user is selecting a time from suggestions
-            selected_time = extract_time_from_text(user_message)
+            selected_time = analysis.time
             if selected_time:
                 print(f"DEBUG: User selected time: {selected_time}")
                 sess["slots"]["time"] = selected_time
                 # Now try to book with the selected time
-                return self.handle_booking_creation(user_message)
+                return (yield from self.handle_booking_creation(user_message))
             
             # Check if user is changing the date (e.g., "today", "tomorrow")
-            new_date = parse_date_natural(user_message)
+            new_date = analysis.date
             if new_date:
                 print("DEBUG: User changed date in booking mode, updating date slot")
                 sess["slots"]["date"] = new_date
@@ -304,7 +546,7 @@ class BookingAssistant:
                 missing = next_missing_booking_slot(sess)
                 if not missing:
                     # All slots filled, proceed with booking
-                    return self.handle_booking_creation(user_message)
+                    return (yield from self.handle_booking_creation(user_message))
                 else:
                     # Still missing slots, ask for next one
                     if missing == "time":
@@ -312,7 +554,7 @@ class BookingAssistant:
                     elif missing == "party":
                         return {"reply": "How many people?", "action": "ask_party"}
             
-            return self.handle_booking_creation(user_message)
+            return (yield from self.handle_booking_creation(user_message))
         
         # Handle explicit intents first (HIGH PRIORITY) - these always take precedence
         if intent == "check_availability":
@@ -320,25 +562,25 @@ class BookingAssistant:
             sess["intent"] = "check_availability"
             sess["slots"] = {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None}
             sess["availability_context"] = None
-            return self.handle_availability_search(user_message)
+            return (yield from self.handle_availability_search(user_message))
         elif intent == "show_booking":
             print("DEBUG: User wants to see booking info - clearing current session")
             sess["intent"] = None
             sess["slots"] = {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None}
             sess["availability_context"] = None
-            return self.handle_booking_info(user_message)
+            return (yield from self.handle_booking_info(user_message))
         elif intent == "modify_booking":
             print("DEBUG: User wants to modify booking - clearing current session")
             sess["intent"] = None
             sess["slots"] = {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None}
             sess["availability_context"] = None
-            return self.handle_booking_modification(user_message)
+            return (yield from self.handle_booking_modification(user_message))
         elif intent == "cancel_booking":
             print("DEBUG: User wants to cancel booking - clearing current session")
             sess["intent"] = None
             sess["slots"] = {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None}
             sess["availability_context"] = None
-            return self.handle_booking_cancellation(user_message)
+            return (yield from self.handle_booking_cancellation(user_message))
         elif intent == "help":
             print("DEBUG: User wants help - clearing current session")
             sess["intent"] = None
@@ -347,13 +589,11 @@ class BookingAssistant:
             return self.get_help_message()
         elif intent == "reset" or user_message.lower().strip() == "reset":
             print("DEBUG: Resetting conversation state")
-            # Clear the entire session
-            session_id = "default"
-            SESSIONS[session_id] = {
-                "intent": None,
-                "slots": {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None},
-                "availability_context": None
-            }
+            # Clear the entire conversation; an existing booking is kept
+            booking = sess["current_booking"]
+            sess.clear()
+            sess.update(new_session())
+            sess["current_booking"] = booking
             return {"reply": "Conversation reset! How can I help you today?", "action": "reset"}
         elif intent == "book":
             print("DEBUG: User wants to book")
@@ -361,55 +601,33 @@ class BookingAssistant:
             sess["intent"] = "book"
             sess["slots"] = {"date": None, "time": None, "party": None, "name": None, "email": None, "mobile": None, "ref": None}
             sess["availability_context"] = None
-            return self.handle_booking_creation(user_message)
+            return (yield from self.handle_booking_creation(user_message))
         
         # If no clear intent but has date/time/party info, assume booking intent
-        if any([parse_date_natural(user_message), extract_time_from_text(user_message), parse_party(user_message)]):
+        if any([analysis.date, analysis.time, analysis.party]):
             print("DEBUG: Assuming booking intent from date/time/party info")
             sess["intent"] = "book"
-            return self.handle_booking_creation(user_message)
+            return (yield from self.handle_booking_creation(user_message))
         
         print("DEBUG: No clear intent, returning default response")
         return self.get_default_response()
     
+    @tracer.traced("parse.detect_intent")
     def detect_intent(self, user_message):
         """Detect user intent from message"""
         text = user_message.lower()
+        analysis = self.analyze(text)
         
         print(f"DEBUG: detect_intent analyzing: '{text}'")
         
-        # Check availability - HIGH PRIORITY
-        if any(word in text for word in ['available', 'availability', 'check', 'search', 'time', 'slot', 'when']):
-            print(f"DEBUG: Intent detected as 'check_availability'")
-            return "check_availability"
-        
-        # Book reservation
-        if any(word in text for word in ['book', 'reservation', 'reserve', 'make booking', 'table for', 'dinner', 'lunch']):
-            print(f"DEBUG: Intent detected as 'book'")
-            return "book"
-        
-        # Show booking
-        if any(word in text for word in ['my booking', 'booking info', 'reservation details', 'show booking', 'what time', 'show my']):
-            print(f"DEBUG: Intent detected as 'show_booking'")
-            return "show_booking"
-        
-        # Modify booking
-        if any(word in text for word in ['change', 'modify', 'update', 'edit', 'move']):
-            print(f"DEBUG: Intent detected as 'modify_booking'")
-            return "modify_booking"
-        
-        # Cancel booking
-        if any(word in text for word in ['cancel', 'cancellation']):
-            print(f"DEBUG: Intent detected as 'cancel_booking'")
-            return "cancel_booking"
-        
-        # Help
-        if 'help' in text:
-            print(f"DEBUG: Intent detected as 'help'")
-            return "help"
+        # Keyword intents, in INTENT_RULES priority order
+        intent = intent_matcher.match(text)
+        if intent:
+            print(f"DEBUG: Intent detected as '{intent}'")
+            return intent
         
         # If no clear intent but has date/time/party info, assume booking intent
-        if any([parse_date_natural(text), normalize_time_to_hhmmss(text), parse_party(text)]):
+        if any([analysis.date, analysis.normalized_time, analysis.party]):
             print(f"DEBUG: Intent detected as 'book' (from date/time/party info)")
             return "book"
         
@@ -568,16 +786,15 @@ class BookingAssistant:
     
     def handle_availability_search(self, user_message):
         """Handle availability search requests with smart parsing"""
-        # Get current session
-        session_id = "default"
-        sess = get_or_create_session(session_id)
+        sess = self.sess
         
         # Set intent to availability
         sess["intent"] = "check_availability"
         
         # Use the new smart parsers
-        d = parse_date_natural(user_message)
-        p = parse_party(user_message) or 2  # Default to 2 if not specified
+        analysis = self.analyze(user_message)
+        d = analysis.date
+        p = analysis.party or 2  # Default to 2 if not specified
         
         if not d:
             return {
@@ -592,7 +809,8 @@ class BookingAssistant:
             }
         
         # Check availability via API
-        res = api_check_availability(d.strftime("%Y-%m-%d"), p)
+        yield Progress(f"🔎 Checking availability on {d} for {p} people…", "checking_availability")
+        res = yield from api_check_availability(d.strftime("%Y-%m-%d"), p)
         
         if "error" in res:
             return {
@@ -606,8 +824,7 @@ class BookingAssistant:
         self.conversation_state['search_party_size'] = p
         
         # Store in session for smooth transition to booking
-        session_id = "default"
-        sess = get_or_create_session(session_id)
+        sess = self.sess
         sess["availability_context"] = {
             "date": d,
             "party_size": p,
@@ -619,15 +836,15 @@ class BookingAssistant:
         if times:
             # Create clickable time buttons
             time_buttons = []
-            for time in times[:6]:  # Show up to 6 times
+            for slot_time in times[:6]:  # Show up to 6 times
                 # Convert HH:MM:SS to readable format (e.g., "13:00:00" -> "1:00 PM")
                 try:
-                    time_obj = datetime.strptime(time, "%H:%M:%S")
+                    time_obj = datetime.strptime(slot_time, "%H:%M:%S")
                     display_time = time_obj.strftime("%I:%M %p").lstrip("0")
                 except:
-                    display_time = time
+                    display_time = slot_time
                 
-                time_buttons.append(f'<button class="time-btn" onclick="selectTime(\'{time}\', \'{d.strftime("%Y-%m-%d")}\', {p})">{display_time}</button>')
+                time_buttons.append(f'<button class="time-btn" onclick="selectTime(\'{slot_time}\', \'{d.strftime("%Y-%m-%d")}\', {p})">{display_time}</button>')
             
             buttons_html = " ".join(time_buttons)
             
@@ -646,13 +863,11 @@ class BookingAssistant:
     
     def handle_booking_creation(self, user_message):
         """Handle booking creation requests with smart slot-filling"""
-        # Get or create session for this user
-        session_id = "default"  # In a real app, use user ID or session ID
-        sess = get_or_create_session(session_id)
+        sess = self.sess
         sess["intent"] = "book"
         
         # Fill slots from user message
-        fill_booking_slots(sess, user_message)
+        fill_booking_slots(sess, user_message, self.analyze(user_message))
         
         # Check what's missing
         missing = next_missing_booking_slot(sess)
@@ -685,7 +900,8 @@ class BookingAssistant:
             }
         
         # 1) Check availability
-        avail = api_check_availability(d.strftime("%Y-%m-%d"), p)
+        yield Progress(f"🔎 Checking availability on {d} at {tm} for {p} people…", "checking_availability")
+        avail = yield from api_check_availability(d.strftime("%Y-%m-%d"), p)
         
         if "error" in avail:
             return {
@@ -704,20 +920,49 @@ class BookingAssistant:
         if tm not in slots:
             # Format available times for display
             available_times = []
-            for time in slots[:4]:
+            for slot_time in slots[:4]:
                 try:
-                    time_obj = datetime.strptime(time, "%H:%M:%S")
+                    time_obj = datetime.strptime(slot_time, "%H:%M:%S")
                     display_time = time_obj.strftime("%I:%M %p").lstrip("0")
                 except:
-                    display_time = time
+                    display_time = slot_time
                 available_times.append(display_time)
             
-            # Check next and previous dates for availability
+            yield Progress(
+                f"❌ {tm} isn't available on {d}. Checking the days either side…",
+                "checking_alternatives"
+            )
+            
+            # Look up the next and previous dates together, reporting each
+            # day's times as soon as it answers
             next_date = d + timedelta(days=1)
             prev_date = d - timedelta(days=1)
-            
-            next_avail = api_check_availability(next_date.strftime("%Y-%m-%d"), p)
-            prev_avail = api_check_availability(prev_date.strftime("%Y-%m-%d"), p)
+            labels = {next_date: "Next day", prev_date: "Previous day"}
+            deadline = time.monotonic() + FANOUT_DEADLINE_S
+            lookups = yield StartLookups({
+                day: api_check_availability(day.strftime("%Y-%m-%d"), p)
+                for day in (next_date, prev_date)
+            })
+            try:
+                pending = dict(lookups)
+                nearby = {}
+                while pending:
+                    arrived = yield WaitLookups(pending, deadline, first=True)
+                    for day, day_avail in arrived.items():
+                        nearby[day] = day_avail
+                        del pending[day]
+                        day_slots = [s["time"] for s in day_avail.get("available_slots", []) if s.get("available")]
+                        if day_slots:
+                            yield Progress(
+                                f"**{labels[day]} ({day}):** {', '.join(day_slots[:3])}",
+                                "alternative_found"
+                            )
+            finally:
+                # Nothing is left running if the turn ends early
+                for handle in lookups.values():
+                    handle.cancel()
+            next_avail = nearby[next_date]
+            prev_avail = nearby[prev_date]
             
             next_slots = [s["time"] for s in next_avail.get("available_slots", []) if s.get("available")]
             prev_slots = [s["time"] for s in prev_avail.get("available_slots", []) if s.get("available")]
@@ -729,6 +974,9 @@ class BookingAssistant:
                 reply += f"**Next day ({next_date}):** {', '.join(next_slots[:3])}\n"
             if prev_slots:
                 reply += f"**Previous day ({prev_date}):** {', '.join(prev_slots[:3])}\n"
+            for day, day_avail in ((next_date, next_avail), (prev_date, prev_avail)):
+                if day_avail.get("timed_out"):
+                    reply += f"_(Couldn't check {day} in time)_\n"
             
             reply += "\n💡 **Choose an option:**\n"
             reply += f"• Pick from available times on {d}\n"
@@ -756,6 +1004,8 @@ class BookingAssistant:
             }
         
         # 2) Proceed to booking
+        yield Progress(f"✅ {tm} is available. Booking it for {p} people…", "booking")
+        
         customer = {
             "FirstName": sess["slots"]["name"] or "Guest",
             "Surname": "User",
@@ -763,7 +1013,7 @@ class BookingAssistant:
             "Mobile": sess["slots"]["mobile"] or "07000000000"
         }
         
-        res = api_book(d.strftime("%Y-%m-%d"), tm, p, customer)
+        res = yield from api_book(d.strftime("%Y-%m-%d"), tm, p, customer)
         
         if "error" in res:
             return {
@@ -803,13 +1053,10 @@ class BookingAssistant:
             }
         
         try:
-            response = requests.get(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}", 
-                headers=HEADERS
-            )
+            response = yield ApiCall("get_booking", self.current_booking['reference'])
             
-            if response.status_code == 200:
-                booking_data = response.json()
+            if response.ok:
+                booking_data = response.data
                 
                 reply = f"📋 Here are your booking details:\n\n"
                 reply += f"🔢 Reference: {self.current_booking['reference']}\n"
@@ -866,13 +1113,14 @@ class BookingAssistant:
             update_data["PartySize"] = new_party_size
         
         try:
-            response = requests.patch(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}", 
-                headers=HEADERS,
-                data=update_data
-            )
+            response = yield ApiCall("update_booking", self.current_booking['reference'], **update_data)
             
-            if response.status_code == 200:
+            if response.ok:
+                # Both the old and the new date's slot counts have changed
+                availability_cache.invalidate_date(self.current_booking['date'])
+                if new_date:
+                    availability_cache.invalidate_date(new_date)
+                
                 # Update local booking info
                 if new_date:
                     self.current_booking['date'] = new_date
@@ -891,7 +1139,7 @@ class BookingAssistant:
                 return {
                     "reply": reply,
                     "action": "booking_modified",
-                    "data": response.json()
+                    "data": response.data
                 }
             else:
                 return {
@@ -923,19 +1171,13 @@ class BookingAssistant:
                     "action": "validation_error"
                 }
             
-            data = {
-                "micrositeName": "TheHungryUnicorn",
-                "bookingReference": self.current_booking['reference'],
-                "cancellationReasonId": str(reason_id)  # Convert to string as API expects
-            }
-            
-            response = requests.post(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}/Cancel", 
-                headers=HEADERS,
-                data=data
+            response = yield ApiCall(
+                "cancel_booking", self.current_booking['reference'], reason_id,
+                microsite_name=RESTAURANT
             )
             
-            if response.status_code == 200:
+            if response.ok:
+                availability_cache.invalidate_date(self.current_booking['date'])
                 cancelled_booking = self.current_booking.copy()
                 self.current_booking = {}
                 
@@ -949,7 +1191,7 @@ class BookingAssistant:
                 return {
                     "reply": reply,
                     "action": "booking_cancelled",
-                    "data": response.json()
+                    "data": response.data
                 }
             else:
                 return {
@@ -1045,77 +1287,82 @@ What would you like to do? You can say "help" for more information.""",
         }
 
 # Session management for slot-filling
-SESSIONS = {}
-
-def get_or_create_session(session_id):
-    """Get existing session or create new one with empty slots"""
-    if session_id not in SESSIONS:
-        SESSIONS[session_id] = {
-            "flow": None,  # "book", "check", etc.
-            "slots": { 
-                "date": None, 
-                "time": None, 
-                "party": None, 
-                "name": None, 
-                "email": None, 
-                "mobile": None, 
-                "ref": None 
-            },
-            "suggest": {    # store last suggestions to interpret the user's next reply
-                "date": None,
-                "times": [],           # e.g. ["19:00:00","19:30:00","20:30:00"]
-                "alt_date": None,
-                "alt_times": []
-            }
-        }
-    return SESSIONS[session_id]
+def new_session():
+    """Conversation state for a new user, with empty slots"""
+    return {
+        "intent": None,  # "book", "check_availability", etc.
+        "availability_context": None,
+        "slots": { 
+            "date": None, 
+            "time": None, 
+            "party": None, 
+            "name": None, 
+            "email": None, 
+            "mobile": None, 
+            "ref": None 
+        },
+        "suggest": {    # store last suggestions to interpret the user's next reply
+            "date": None,
+            "times": [],           # e.g. ["19:00:00","19:30:00","20:30:00"]
+            "alt_date": None,
+            "alt_times": []
+        },
+        "current_booking": {},     # reference, date, time, party_size
+        "conversation_state": {}
+    }
+
+# Memory for one worker, or SQLite shared by several (see chat_sessions.py)
+SESSIONS = make_session_store(new_session)
 
-def fill_booking_slots(sess, text: str):
+def chat_session_id():
+    """This browser's session id, kept in the signed Flask session cookie"""
+    session_id = session.get("sid")
+    if session_id is None:
+        session_id = session["sid"] = uuid.uuid4().hex
+    return session_id
+
+@tracer.traced("parse.fill_booking_slots")
+def fill_booking_slots(sess, text: str, analysis: MessageAnalysis | None = None):
     """Fill booking slots from user text - only fill what's missing"""
     slots = sess["slots"]
+    if analysis is None:
+        analysis = MessageAnalysis(text)
     
     print(f"DEBUG: fill_booking_slots input: '{text}'")
     print(f"DEBUG: Current slots before filling: {slots}")
     
     # Fill date if missing
     if slots["date"] is None:
-        d = parse_date_natural(text)
-        if d and not_past(d): 
+        d = analysis.date
+        if d and d >= analysis.today: 
             slots["date"] = d
             print(f"DEBUG: Filled date slot: {d}")
     
     # Fill time if missing
     if slots["time"] is None:
-        tm = extract_time_from_text(text)
+        tm = analysis.time
         if tm: 
             slots["time"] = tm
             print(f"DEBUG: Filled time slot: {tm}")
     
     # Fill party if missing
     if slots["party"] is None:
-        p = parse_party(text)
+        p = analysis.party
         if p: 
             slots["party"] = p
             print(f"DEBUG: Filled party slot: {p}")
     
-    # naive contact extraction; improve as needed
-    if slots["email"] is None:
-        m = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
-        if m: 
-            slots["email"] = m.group(0)
-            print(f"DEBUG: Filled email slot: {m.group(0)}")
-    
-    if slots["mobile"] is None:
-        m = re.search(r"\b(\+?\d{10,14})\b", text.replace(" ", ""))
-        if m: 
-            slots["mobile"] = m.group(1)
-            print(f"DEBUG: Filled mobile slot: {m.group(1)}")
-    
-    if slots["name"] is None:
-        m = re.search(r"\bfor\s+\d+\s+([A-Za-z]+)\b", text)  # "for 2 John"
-        if m: 
-            slots["name"] = m.group(1).title()
-            print(f"DEBUG: Filled name slot: {m.group(1).title()}")
+    if slots["email"] is None and analysis.email:
+        slots["email"] = analysis.email
+        print(f"DEBUG: Filled email slot: {analysis.email}")
+    
+    if slots["mobile"] is None and analysis.mobile:
+        slots["mobile"] = analysis.mobile
+        print(f"DEBUG: Filled mobile slot: {analysis.mobile}")
+    
+    if slots["name"] is None and analysis.name:
+        slots["name"] = analysis.name
+        print(f"DEBUG: Filled name slot: {analysis.name}")
     
     print(f"DEBUG: Slots after filling: {slots}")
 
@@ -1132,56 +1379,141 @@ def ok(reply, action="success"):
     """Helper to return JSON response"""
     return jsonify({"reply": reply, "action": action})
 
-def api_check_availability(visit_date: str, party_size: int):
-    """Check availability via API"""
-    try:
-        data = {
-            "VisitDate": visit_date,
-            "PartySize": party_size,
-            "ChannelCode": "ONLINE"
-        }
-        
-        response = requests.post(f"{BASE_URL}/AvailabilitySearch", headers=HEADERS, data=data, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.HTTPError as e:
-        error_detail = response.text[:200] if hasattr(response, 'text') else str(e)
-        return {"error": f"API error {response.status_code}: {error_detail}"}
-    except requests.RequestException as e:
-        return {"error": f"Network error: {str(e)}"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+# A turn (BookingAssistant.turn and the handlers it calls) is a generator
+# that yields its API work as effects and is sent each outcome, instead of
+# calling the API itself. The same turns then run on the blocking client here
+# (run_turn, stream_turn) and on the async client in chat_app_async.py.
 
-def api_book(visit_date: str, visit_time: str, party_size: int, customer: dict):
-    """Create booking via API"""
-    try:
-        data = {
-            "VisitDate": visit_date,
-            "VisitTime": visit_time,
-            "PartySize": party_size,
-            "ChannelCode": "ONLINE",
-            "SpecialRequests": "",
-            "Customer[FirstName]": customer.get("FirstName", "Demo"),
-            "Customer[Surname]": customer.get("Surname", "Customer"),
-            "Customer[Email]": customer.get("Email", "demo@example.com"),
-            "Customer[Mobile]": customer.get("Mobile", "1234567890")
+class ApiCall:
+    """Effect: call an API client method; the turn is sent its ApiResponse"""
+    __slots__ = ("method", "args", "kwargs")
+    
+    def __init__(self, method: str, *args, **kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+class StartLookups:
+    """
+    Effect: start sub-turns running concurrently. The turn is sent a handle
+    per key, to pass to WaitLookups or to cancel() when no longer needed.
+    """
+    __slots__ = ("turns",)
+    
+    def __init__(self, turns: dict):
+        self.turns = turns
+
+class WaitLookups:
+    """
+    Effect: wait for started sub-turns until `deadline` (a time.monotonic()
+    value). The turn is sent each sub-turn's result under its key; sub-turns
+    still running at the deadline are cancelled and give lookup_timed_out()
+    so the turn can show the results that did arrive.
+    
+    With `first`, the wait ends as soon as any sub-turn finishes and only
+    the finished ones are sent, so the turn can act on each as it arrives
+    and wait again for the rest.
+    """
+    __slots__ = ("handles", "deadline", "first")
+    
+    def __init__(self, handles: dict, deadline: float, first: bool = False):
+        self.handles = handles
+        self.deadline = deadline
+        self.first = first
+
+class Progress:
+    """
+    Effect: report how the turn is getting on, as a reply/action dict like
+    the final response. Streamed to the page by /send/stream and dropped
+    otherwise; the turn is sent None.
+    """
+    __slots__ = ("reply", "action")
+    
+    def __init__(self, reply: str, action: str = "progress"):
+        self.reply = reply
+        self.action = action
+
+def lookup_timed_out():
+    """Result of a sub-turn that missed its WaitLookups deadline"""
+    return {"error": f"Timed out after {FANOUT_DEADLINE_S:g}s", "timed_out": True}
+
+def run_turn(turn):
+    """Run a turn to completion with the blocking API client and return its result"""
+    for event, payload in stream_turn(turn):
+        if event == "reply":
+            return payload
+
+def stream_turn(turn):
+    """
+    Run a turn with the blocking API client, yielding ("progress", dict) for
+    each Progress effect as it happens and finally ("reply", response).
+    """
+    value, error = None, None
+    while True:
+        try:
+            effect = turn.throw(error) if error is not None else turn.send(value)
+        except StopIteration as stop:
+            yield "reply", stop.value
+            return
+        if isinstance(effect, Progress):
+            yield "progress", {"reply": effect.reply, "action": effect.action}
+            value, error = None, None
+            continue
+        try:
+            value, error = perform_effect(effect), None
+        except Exception as e:
+            # Raised inside the turn, so the handlers' own error handling applies
+            value, error = None, e
+
+def perform_effect(effect):
+    """Carry out one effect of a turn; lookups run on the fan-out pool"""
+    if isinstance(effect, ApiCall):
+        return getattr(get_api_client(), effect.method)(*effect.args, **effect.kwargs)
+    if isinstance(effect, StartLookups):
+        # Each lookup runs inside the caller's trace context
+        pool = get_fanout_pool()
+        return {
+            key: pool.submit(contextvars.copy_context().run, run_turn, turn)
+            for key, turn in effect.turns.items()
         }
-        
-        response = requests.post(f"{BASE_URL}/BookingWithStripeToken", headers=HEADERS, data=data, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.HTTPError as e:
-        error_detail = response.text[:200] if hasattr(response, 'text') else str(e)
-        return {"error": f"API error {response.status_code}: {error_detail}"}
-    except requests.RequestException as e:
-        return {"error": f"Network error: {str(e)}"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+    if isinstance(effect, WaitLookups):
+        futures = effect.handles
+        done, _ = wait(futures.values(), timeout=max(0.0, effect.deadline - time.monotonic()),
+                       return_when=FIRST_COMPLETED if effect.first else ALL_COMPLETED)
+        results = {}
+        for key, future in futures.items():
+            if future in done:
+                results[key] = future.result()
+            elif not done or not effect.first:
+                future.cancel()
+                results[key] = lookup_timed_out()
+        return results
+    raise TypeError(f"Unknown turn effect: {effect!r}")
 
-# Initialize the booking assistant
-assistant = BookingAssistant()
+def api_check_availability(visit_date: str, party_size: int):
+    """Check availability via API (a sub-turn), reusing a recent answer for the same date and party size"""
+    cached = availability_cache.get(visit_date, party_size)
+    if cached is not None:
+        return cached
+    response = yield ApiCall("check_availability", visit_date, party_size)
+    if not response.ok:
+        return {"error": response.error_message()}
+    availability_cache.put(visit_date, party_size, response.data)
+    return response.data
+
+def api_book(visit_date: str, visit_time: str, party_size: int, customer: dict):
+    """Create booking via API (a sub-turn)"""
+    customer = {
+        "FirstName": customer.get("FirstName", "Demo"),
+        "Surname": customer.get("Surname", "Customer"),
+        "Email": customer.get("Email", "demo@example.com"),
+        "Mobile": customer.get("Mobile", "1234567890")
+    }
+    response = yield ApiCall("create_booking", visit_date, visit_time, party_size, customer)
+    if not response.ok:
+        return {"error": response.error_message()}
+    availability_cache.invalidate_date(visit_date)
+    return response.data
 
 @app.route("/")
 def index():
@@ -1204,8 +1536,11 @@ def send():
         if not user_message:
             return jsonify({"reply": "Please enter a message.", "action": "error"})
         
-        # Process the message with the assistant
-        response = assistant.process_message(user_message)
+        # Process the message with this user's state; the whole turn is one trace
+        with tracer.span("POST /send", kind="server",
+                         traceparent=request.headers.get("traceparent")):
+            with SESSIONS.open(chat_session_id()) as sess:
+                response = BookingAssistant(sess).process_message(user_message)
         
         return response  # Already a JSON response
     
@@ -1215,21 +1550,112 @@ def send():
             "action": "error"
         })
 
+# Streamed replies must reach the browser as they are written, not when a
+# proxy's buffer fills
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data: dict) -> str:
+    """One Server-Sent Events message carrying `data` as JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route("/send/stream", methods=["POST"])
+def send_stream():
+    """
+    Handle a chat message like /send, streaming the turn as Server-Sent Events:
+    a "progress" event for each step of a multi-step turn as it happens
+    (checking availability, alternative days as they answer, booking), then
+    one "reply" event with the response /send would return.
+    """
+    data = request.get_json(silent=True) or {}
+    user_message = str(data.get("message", "")).strip()
+    if not user_message:
+        return Response(sse_event("reply", {"reply": "Please enter a message.", "action": "error"}),
+                        mimetype="text/event-stream", headers=SSE_HEADERS)
+    
+    # Read before streaming starts; the session cookie goes out with the headers
+    session_id = chat_session_id()
+    traceparent = request.headers.get("traceparent")
+    
+    def events():
+        try:
+            with tracer.span("POST /send/stream", kind="server", traceparent=traceparent):
+                with SESSIONS.open(session_id) as sess:
+                    for event, payload in stream_turn(BookingAssistant(sess).turn(user_message)):
+                        yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("reply", {
+                "reply": f"Sorry, I encountered an error: {str(e)}",
+                "action": "error"
+            })
+    
+    return Response(events(), mimetype="text/event-stream", headers=SSE_HEADERS)
+
 @app.route("/status")
 def status():
-    """Check if the booking API is accessible"""
-    try:
-        response = requests.get(f"{BASE_URL.replace('/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn', '')}/", timeout=5)
-        return jsonify({"status": "connected", "api_url": BASE_URL})
-    except:
-        return jsonify({"status": "disconnected", "api_url": BASE_URL})
+    """Check if the booking API is accessible, with per-call API timings"""
+    client = get_api_client()
+    response = client.server_status()
+    return jsonify({
+        "status": "connected" if response.ok else "disconnected",
+        "api_url": BASE_URL,
+        "api_calls": client.stats(),
+        "availability_cache": availability_cache.stats(),
+        "sessions": SESSIONS.stats()
+    })
+
+def run_production(host: str, port: int, workers: int,
+                   target: str = "chat_app:app", interface: str = "wsgi"):
+    """
+    Serve the chat app from several worker processes.
+    
+    Workers are uvicorn processes running the Flask app through its WSGI
+    adapter, each with a pool of request threads, or the app named by
+    `target` with the given uvicorn `interface` (chat_app_async.py passes
+    its ASGI app). With more than one worker the session store defaults to
+    SQLite so a user's turns can land on any worker; the in-memory store is
+    refused.
+    """
+    import uvicorn
+    
+    if workers > 1:
+        if os.getenv("CHAT_SESSION_STORE", "sqlite").lower() == "memory":
+            raise ValueError(
+                "In-memory chat sessions cannot be shared between worker processes; "
+                "use --workers 1 or CHAT_SESSION_STORE=sqlite"
+            )
+        # Inherited by the worker processes, which import chat_app afresh
+        os.environ["CHAT_SESSION_STORE"] = "sqlite"
+    
+    uvicorn.run(target, host=host, port=port, workers=workers,
+                interface=interface, access_log=False)
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="python chat_app.py")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument(
+        "--production", action="store_true",
+        help="run multiple workers without the debugger and reloader"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="worker processes in production mode (default: CPU count)"
+    )
+    args = parser.parse_args()
+    
     print("🚀 Starting Restaurant Booking Chat Interface...")
     print(f"📡 API Base URL: {BASE_URL}")
     print(f"🔑 Bearer Token: {TOKEN[:20]}...")
-    print("🌐 Web Interface: http://localhost:5001")
+    print(f"🌐 Web Interface: http://localhost:{args.port}")
     print("📚 API Documentation: http://localhost:8547/docs")
     print("\nPress Ctrl+C to stop the server")
     
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    if args.production:
+        try:
+            run_production(args.host, args.port, args.workers)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        app.run(host=args.host, port=args.port, debug=True)
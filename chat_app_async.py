@@ -0,0 +1,257 @@
+"""
+Async Chat Web Server.
+
+The chat interface of chat_app.py as an ASGI app: the same routes (/, /welcome,
+/send, /send/stream, /status) and the same BookingAssistant turns, with the booking API
+called through `AsyncBookingClient`. A turn waiting on the API is a suspended
+coroutine rather than a blocked request thread (plus a fan-out thread per
+concurrent lookup), so one process keeps thousands of slow conversations in
+flight.
+
+Sessions come from the store chat_app.py selects (CHAT_SESSION_STORE). Turns
+of one session are serialised with asyncio locks before the store is opened,
+so the store's own thread locks are never waited on inside the event loop.
+The SQLite store's reads and writes are short local file operations and run
+on the loop.
+
+Run with:
+    python chat_app_async.py [--port 5001] [--workers N]
+or:
+    uvicorn chat_app_async:app --port 5001
+
+Author: AI Assistant
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+from starlette.middleware.sessions import SessionMiddleware
+
+from booking_client import AsyncBookingClient
+from chat_app import (
+    BASE_URL, SESSIONS, SSE_HEADERS, TOKEN, ApiCall, BookingAssistant, Progress, StartLookups,
+    WaitLookups, app as flask_app, availability_cache, lookup_timed_out, run_production,
+    sse_event, tracer,
+)
+from chat_sessions import LOCK_STRIPES
+
+# API requests sent at once; further turns wait for a free connection. httpx
+# spends CPU per request in proportion to the pool size, so keep it modest
+CHAT_ASYNC_API_POOL_SIZE = int(os.getenv("CHAT_ASYNC_API_POOL_SIZE", "50"))
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
+
+# Turns of a session run one at a time; sessions share a lock when their ids
+# hash alike, matching the SQLite store's own lock striping
+session_locks = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the API client on the serving event loop and close it on shutdown."""
+    app.state.api_client = AsyncBookingClient(
+        BASE_URL, TOKEN, tracer=tracer, pool_size=CHAT_ASYNC_API_POOL_SIZE
+    )
+    yield
+    await app.state.api_client.aclose()
+
+
+app = FastAPI(title="Restaurant Booking Chat", docs_url=None, redoc_url=None,
+              openapi_url=None, lifespan=lifespan)
+app.add_middleware(SessionMiddleware, secret_key=flask_app.secret_key)
+
+
+async def run_turn_async(turn, client: AsyncBookingClient):
+    """
+    Run a turn to completion with the async API client and return its result.
+
+    Args:
+        turn: Generator from BookingAssistant.turn or one of its handlers
+        client: Client the turn's ApiCall effects are sent to
+
+    Returns:
+        The turn's response dict
+    """
+    # Read to the end, so the stream generator finishes here and is not
+    # left for the event loop to finalise
+    async for event, payload in stream_turn_async(turn, client):
+        if event == "reply":
+            response = payload
+    return response
+
+
+async def stream_turn_async(turn, client: AsyncBookingClient) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Run a turn with the async API client, yielding ("progress", dict) for
+    each Progress effect as it happens and finally ("reply", response).
+    """
+    value, error = None, None
+    while True:
+        try:
+            effect = turn.throw(error) if error is not None else turn.send(value)
+        except StopIteration as stop:
+            yield "reply", stop.value
+            return
+        if isinstance(effect, Progress):
+            yield "progress", {"reply": effect.reply, "action": effect.action}
+            value, error = None, None
+            continue
+        try:
+            value, error = await perform_effect_async(effect, client), None
+        except Exception as e:
+            # Raised inside the turn, so the handlers' own error handling applies
+            value, error = None, e
+
+
+async def perform_effect_async(effect, client: AsyncBookingClient):
+    """Carry out one effect of a turn; lookups run as tasks on the event loop"""
+    if isinstance(effect, ApiCall):
+        return await getattr(client, effect.method)(*effect.args, **effect.kwargs)
+    if isinstance(effect, StartLookups):
+        return {
+            key: asyncio.ensure_future(run_turn_async(turn, client))
+            for key, turn in effect.turns.items()
+        }
+    if isinstance(effect, WaitLookups):
+        tasks = effect.handles
+        timeout = max(0.0, effect.deadline - time.monotonic())
+        return_when = asyncio.FIRST_COMPLETED if effect.first else asyncio.ALL_COMPLETED
+        done = (await asyncio.wait(tasks.values(), timeout=timeout,
+                                   return_when=return_when))[0] if tasks else set()
+        results = {}
+        for key, task in tasks.items():
+            if task in done:
+                results[key] = task.result()
+            elif not done or not effect.first:
+                task.cancel()
+                results[key] = lookup_timed_out()
+        return results
+    raise TypeError(f"Unknown turn effect: {effect!r}")
+
+
+def chat_session_id(request: Request) -> str:
+    """This browser's session id, kept in the signed session cookie"""
+    session_id = request.session.get("sid")
+    if session_id is None:
+        session_id = request.session["sid"] = uuid.uuid4().hex
+    return session_id
+
+
+@app.get("/")
+async def index(request: Request):
+    """Main chat interface"""
+    return templates.TemplateResponse(request, "chat.html")
+
+
+@app.get("/welcome")
+async def welcome():
+    """Get welcome message with quick actions"""
+    return BookingAssistant().get_welcome_message()
+
+
+@app.post("/send")
+async def send(request: Request):
+    """Handle chat messages with session management"""
+    try:
+        data = await request.json()
+        user_message = data.get("message", "").strip()
+
+        if not user_message:
+            return {"reply": "Please enter a message.", "action": "error"}
+
+        # Process the message with this user's state; the whole turn is one trace
+        session_id = chat_session_id(request)
+        with tracer.span("POST /send", kind="server",
+                         traceparent=request.headers.get("traceparent")):
+            async with session_locks[hash(session_id) % LOCK_STRIPES]:
+                with SESSIONS.open(session_id) as sess:
+                    return await run_turn_async(
+                        BookingAssistant(sess).turn(user_message), request.app.state.api_client
+                    )
+
+    except Exception as e:
+        return {
+            "reply": f"Sorry, I encountered an error: {str(e)}",
+            "action": "error"
+        }
+
+
+@app.post("/send/stream")
+async def send_stream(request: Request):
+    """Handle a chat message like /send, streaming Server-Sent Events (see chat_app.send_stream)"""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    user_message = str(data.get("message", "")).strip() if isinstance(data, dict) else ""
+    if not user_message:
+        return StreamingResponse(
+            iter([sse_event("reply", {"reply": "Please enter a message.", "action": "error"})]),
+            media_type="text/event-stream", headers=SSE_HEADERS
+        )
+
+    # Read before streaming starts; the session cookie goes out with the headers
+    session_id = chat_session_id(request)
+    client = request.app.state.api_client
+    traceparent = request.headers.get("traceparent")
+
+    async def events():
+        try:
+            with tracer.span("POST /send/stream", kind="server", traceparent=traceparent):
+                async with session_locks[hash(session_id) % LOCK_STRIPES]:
+                    with SESSIONS.open(session_id) as sess:
+                        turn = BookingAssistant(sess).turn(user_message)
+                        async for event, payload in stream_turn_async(turn, client):
+                            yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("reply", {
+                "reply": f"Sorry, I encountered an error: {str(e)}",
+                "action": "error"
+            })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/status")
+async def status(request: Request):
+    """Check if the booking API is accessible, with per-call API timings"""
+    client = request.app.state.api_client
+    response = await client.server_status()
+    return {
+        "status": "connected" if response.ok else "disconnected",
+        "api_url": BASE_URL,
+        "api_calls": client.stats(),
+        "availability_cache": availability_cache.stats(),
+        "sessions": SESSIONS.stats()
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python chat_app_async.py")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="worker processes, each with its own event loop (default: 1)"
+    )
+    args = parser.parse_args()
+
+    print("🚀 Starting Restaurant Booking Chat Interface (async)...")
+    print(f"📡 API Base URL: {BASE_URL}")
+    print(f"🌐 Web Interface: http://localhost:{args.port}")
+    print("\nPress Ctrl+C to stop the server")
+
+    try:
+        run_production(args.host, args.port, args.workers,
+                       target="chat_app_async:app", interface="asgi3")
+    except ValueError as e:
+        parser.error(str(e))
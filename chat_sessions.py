@@ -0,0 +1,264 @@
+"""
+Chat Session Stores.
+
+Conversation state for the chat app, one JSON-serialisable dict per browser
+session, kept in one of two stores with the same interface:
+
+- `MemorySessionStore`: a dict in the process, for a single worker. The
+  state object stays in memory between turns.
+- `SQLiteSessionStore`: a local SQLite file in WAL mode, shared by every
+  worker process on the machine, so consecutive turns of one user may land
+  on different workers. The state is loaded at the start of a turn and
+  written back, as zlib-compressed compact JSON, at the end.
+
+Both keep at most CHAT_SESSION_MAX sessions (least recently used dropped
+first) and forget sessions idle for CHAT_SESSION_IDLE_TTL_S. The SQLite
+store applies both limits in a sweep that runs at most every
+CHAT_SESSION_SWEEP_S, on the request path.
+
+Turns of one session are serialised within a process. Two turns of the same
+session running at the same moment in different processes both start from
+the stored state and the last one to finish wins; a browser sends one chat
+message at a time, so this only matters for duplicated requests.
+
+Select the store with CHAT_SESSION_STORE (memory or sqlite) and the file with
+CHAT_SESSION_DB.
+
+Author: AI Assistant
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterator
+
+CHAT_SESSION_STORE = os.getenv("CHAT_SESSION_STORE", "memory").lower()
+CHAT_SESSION_DB = os.getenv("CHAT_SESSION_DB", "chat_sessions.db")
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "10000"))
+CHAT_SESSION_IDLE_TTL_S = float(os.getenv("CHAT_SESSION_IDLE_TTL_S", "1800"))
+CHAT_SESSION_SWEEP_S = float(os.getenv("CHAT_SESSION_SWEEP_S", "60"))
+
+SESSION_STORES = ("memory", "sqlite")
+# Locks serialising turns per session in the SQLite store; sessions share
+# a lock when their ids hash alike, which only costs a little parallelism
+LOCK_STRIPES = 64
+
+SCHEMA_SQL = (
+    "CREATE TABLE IF NOT EXISTS chat_sessions ("
+    "id TEXT PRIMARY KEY, state BLOB NOT NULL, last_used REAL NOT NULL)"
+)
+INDEX_SQL = "CREATE INDEX IF NOT EXISTS ix_chat_sessions_last_used ON chat_sessions (last_used)"
+LOAD_SQL = "SELECT state FROM chat_sessions WHERE id = ? AND last_used >= ?"
+SAVE_SQL = (
+    "INSERT INTO chat_sessions (id, state, last_used) VALUES (?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET state = excluded.state, last_used = excluded.last_used"
+)
+EXPIRE_SQL = "DELETE FROM chat_sessions WHERE last_used < ?"
+EVICT_SQL = (
+    "DELETE FROM chat_sessions WHERE id IN "
+    "(SELECT id FROM chat_sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)"
+)
+COUNT_SQL = "SELECT COUNT(*) FROM chat_sessions"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in a chat session")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Serialise session state to compressed compact JSON; dates are tagged."""
+    payload = json.dumps(state, separators=(",", ":"), default=_encode_value)
+    return zlib.compress(payload.encode("utf-8"), 1)
+
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    """Inverse of `encode_state`."""
+    return json.loads(zlib.decompress(blob), object_hook=_decode_object)
+
+
+class MemorySessionStore:
+    """
+    Sessions in a process-local LRU dict.
+
+    Args:
+        new_state: Factory for the state of a new session
+        max_sessions: Sessions kept before the least recently used is dropped
+        idle_ttl: Seconds without a turn after which a session is forgotten
+
+    Attributes:
+        entries (OrderedDict[str, list]): session id -> [last_used, lock, state],
+            least recently used first
+        evicted (int): Sessions dropped for exceeding `max_sessions`
+        expired (int): Sessions dropped for being idle
+    """
+
+    kind = "memory"
+
+    def __init__(self, new_state: Callable[[], Dict[str, Any]],
+                 max_sessions: int = CHAT_SESSION_MAX,
+                 idle_ttl: float = CHAT_SESSION_IDLE_TTL_S) -> None:
+        self.new_state = new_state
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.entries: "OrderedDict[str, list]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    @contextmanager
+    def open(self, session_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield the session's state, creating it if needed, for one turn."""
+        with self.lock:
+            now = time.monotonic()
+            # Least recently used first, so idle sessions are at the front
+            while self.entries:
+                oldest_id, oldest = next(iter(self.entries.items()))
+                if now - oldest[0] < self.idle_ttl:
+                    break
+                del self.entries[oldest_id]
+                self.expired += 1
+            entry = self.entries.get(session_id)
+            if entry is None:
+                entry = self.entries[session_id] = [now, threading.Lock(), self.new_state()]
+                while len(self.entries) > self.max_sessions:
+                    self.entries.popitem(last=False)
+                    self.evicted += 1
+            else:
+                entry[0] = now
+                self.entries.move_to_end(session_id)
+        with entry[1]:
+            yield entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "store": self.kind,
+                "active": len(self.entries),
+                "max": self.max_sessions,
+                "idle_ttl_s": self.idle_ttl,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file shared by the worker processes of one machine.
+
+    Each thread keeps its own connection. Wall-clock time is used for
+    `last_used` because it is compared across processes.
+
+    Args:
+        new_state: Factory for the state of a new session
+        path: Database file
+        max_sessions: Sessions kept by the sweep, most recently used first
+        idle_ttl: Seconds without a turn after which a session is forgotten
+        sweep_interval: Minimum seconds between sweeps in this process
+
+    Attributes:
+        swept (int): Rows deleted by this process's sweeps
+    """
+
+    kind = "sqlite"
+
+    def __init__(self, new_state: Callable[[], Dict[str, Any]],
+                 path: str = CHAT_SESSION_DB,
+                 max_sessions: int = CHAT_SESSION_MAX,
+                 idle_ttl: float = CHAT_SESSION_IDLE_TTL_S,
+                 sweep_interval: float = CHAT_SESSION_SWEEP_S) -> None:
+        self.new_state = new_state
+        self.path = path
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.local = threading.local()
+        self.locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.sweep_lock = threading.Lock()
+        self.next_sweep = 0.0
+        self.swept = 0
+        conn = self.connection()
+        conn.execute(SCHEMA_SQL)
+        conn.execute(INDEX_SQL)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def open(self, session_id: str) -> Iterator[Dict[str, Any]]:
+        """Load the session's state (or a new one), yield it, then save it."""
+        now = time.time()
+        if now >= self.next_sweep:
+            self.sweep(now)
+        with self.locks[hash(session_id) % LOCK_STRIPES]:
+            conn = self.connection()
+            row = conn.execute(LOAD_SQL, (session_id, now - self.idle_ttl)).fetchone()
+            state = decode_state(row[0]) if row is not None else self.new_state()
+            yield state
+            conn.execute(SAVE_SQL, (session_id, encode_state(state), time.time()))
+
+    def sweep(self, now: float) -> None:
+        """Delete idle sessions, then the least recently used beyond `max_sessions`."""
+        if not self.sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self.next_sweep = now + self.sweep_interval
+            conn = self.connection()
+            deleted = conn.execute(EXPIRE_SQL, (now - self.idle_ttl,)).rowcount
+            deleted += conn.execute(EVICT_SQL, (self.max_sessions,)).rowcount
+            self.swept += deleted
+        finally:
+            self.sweep_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": self.kind,
+            "active": self.connection().execute(COUNT_SQL).fetchone()[0],
+            "max": self.max_sessions,
+            "idle_ttl_s": self.idle_ttl,
+            "swept": self.swept,
+            "path": self.path,
+        }
+
+
+def make_session_store(new_state: Callable[[], Dict[str, Any]],
+                       kind: str = CHAT_SESSION_STORE):
+    """
+    Build the session store selected by CHAT_SESSION_STORE.
+
+    Args:
+        new_state: Factory for the state of a new session
+        kind: "memory" or "sqlite"
+
+    Returns:
+        MemorySessionStore or SQLiteSessionStore
+
+    Raises:
+        ValueError: If `kind` is not one of SESSION_STORES
+    """
+    if kind == "memory":
+        return MemorySessionStore(new_state)
+    if kind == "sqlite":
+        return SQLiteSessionStore(new_state)
+    raise ValueError(f"CHAT_SESSION_STORE must be one of {', '.join(SESSION_STORES)}, not {kind!r}")
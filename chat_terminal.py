@@ -9,7 +9,6 @@ Usage:
     python chat_terminal.py
 """
 
-import requests
 import json
 import re
 from datetime import datetime, date
@@ -19,6 +18,9 @@ import sys
 import os
 from dotenv import load_dotenv
 
+from booking_client import BookingClient
+from intents import IntentMatcher
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -31,11 +33,18 @@ TOKEN = os.getenv("BOOKING_API_TOKEN")
 if not TOKEN:
     raise RuntimeError("BOOKING_API_TOKEN environment variable is required. Please set it in your .env file or environment.")
 
-# Headers for API requests
-HEADERS = {
-    "Authorization": f"Bearer {TOKEN}",
-    "Content-Type": "application/x-www-form-urlencoded"
-}
+# Pooled keep-alive client with timeouts and retries (see booking_client.py)
+api_client = BookingClient(BASE_URL, TOKEN)
+
+# Keyword intents, highest priority first (see intents.py)
+INTENT_RULES = [
+    ("check_availability", ['available', 'availability', 'check', 'search', 'time', 'slot']),
+    ("book", ['book', 'reservation', 'reserve', 'make booking']),
+    ("show_booking", ['my booking', 'booking info', 'reservation details', 'show booking']),
+    ("modify_booking", ['change', 'modify', 'update', 'edit']),
+    ("cancel_booking", ['cancel', 'cancellation']),
+]
+intent_matcher = IntentMatcher(INTENT_RULES)
 
 class TerminalBookingAssistant:
     def __init__(self):
@@ -95,19 +104,23 @@ class TerminalBookingAssistant:
         print(help_text)
     
     def check_api_status(self):
-        """Check if the booking API is accessible"""
-        try:
-            response = requests.get(f"{BASE_URL.replace('/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn', '')}/", timeout=5)
-            if response.status_code == 200:
-                print("✅ API Status: Connected")
-                print(f"📡 API URL: {BASE_URL}")
-                return True
-            else:
-                print("❌ API Status: Error")
-                return False
-        except Exception as e:
-            print(f"❌ API Status: Disconnected - {str(e)}")
-            return False
+        """Check if the booking API is accessible and show API call timings"""
+        response = api_client.server_status()
+        if response.ok:
+            print("✅ API Status: Connected")
+            print(f"📡 API URL: {BASE_URL}")
+        elif response.error is None:
+            print("❌ API Status: Error")
+        else:
+            print(f"❌ API Status: Disconnected - {response.error}")
+        
+        stats = api_client.stats()
+        if stats:
+            print("⏱️  API calls this session:")
+            for operation, counts in stats.items():
+                print(f"   {operation}: {counts['calls']} calls, {counts['errors']} errors, "
+                      f"{counts['retries']} retries, avg {counts['avg_ms']} ms, max {counts['max_ms']} ms")
+        return response.ok
     
     def extract_date(self, text):
         """Extract date from text"""
@@ -255,16 +268,10 @@ class TerminalBookingAssistant:
         print(f"🔍 Checking availability for {party_size} people on {visit_date}...")
         
         try:
-            data = {
-                "VisitDate": visit_date,
-                "PartySize": party_size,
-                "ChannelCode": "ONLINE"
-            }
-            
-            response = requests.post(f"{BASE_URL}/AvailabilitySearch", headers=HEADERS, data=data)
+            response = api_client.check_availability(visit_date, party_size)
             
-            if response.status_code == 200:
-                availability_data = response.json()
+            if response.ok:
+                availability_data = response.data
                 self.conversation_state['last_availability'] = availability_data
                 self.conversation_state['search_date'] = visit_date
                 self.conversation_state['search_party_size'] = party_size
@@ -286,7 +293,7 @@ class TerminalBookingAssistant:
                     print("   Would you like to try a different date or party size?")
                 
             else:
-                print(f"❌ Error checking availability. Status: {response.status_code}")
+                print(f"❌ Error checking availability. {response.error_message()}")
         
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -305,22 +312,20 @@ class TerminalBookingAssistant:
         print(f"📅 Creating booking for {self.conversation_state['search_party_size']} people on {self.conversation_state['search_date']} at {visit_time}...")
         
         try:
-            data = {
-                "VisitDate": self.conversation_state['search_date'],
-                "VisitTime": visit_time,
-                "PartySize": self.conversation_state['search_party_size'],
-                "ChannelCode": "ONLINE",
-                "SpecialRequests": "",
-                "Customer[FirstName]": "Demo",
-                "Customer[Surname]": "Customer",
-                "Customer[Email]": "demo@example.com",
-                "Customer[Mobile]": "1234567890"
+            customer = {
+                "FirstName": "Demo",
+                "Surname": "Customer",
+                "Email": "demo@example.com",
+                "Mobile": "1234567890"
             }
             
-            response = requests.post(f"{BASE_URL}/BookingWithStripeToken", headers=HEADERS, data=data)
+            response = api_client.create_booking(
+                self.conversation_state['search_date'], visit_time,
+                self.conversation_state['search_party_size'], customer
+            )
             
-            if response.status_code == 200:
-                booking_data = response.json()
+            if response.ok:
+                booking_data = response.data
                 booking_ref = booking_data.get('booking_reference', 'DEMO123')
                 
                 self.current_booking = {
@@ -341,7 +346,7 @@ class TerminalBookingAssistant:
                 print("   or modify it by saying 'Change my booking'.")
                 
             else:
-                print(f"❌ Error creating booking. Status: {response.status_code}")
+                print(f"❌ Error creating booking. {response.error_message()}")
         
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -355,13 +360,10 @@ class TerminalBookingAssistant:
         print(f"📋 Retrieving booking details for reference: {self.current_booking['reference']}...")
         
         try:
-            response = requests.get(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}", 
-                headers=HEADERS
-            )
+            response = api_client.get_booking(self.current_booking['reference'])
             
-            if response.status_code == 200:
-                booking_data = response.json()
+            if response.ok:
+                booking_data = response.data
                 
                 print("📋 Here are your booking details:")
                 print()
@@ -376,7 +378,7 @@ class TerminalBookingAssistant:
                 print("   or cancel it by saying 'Cancel my booking'.")
                 
             else:
-                print(f"❌ Error retrieving booking. Status: {response.status_code}")
+                print(f"❌ Error retrieving booking. {response.error_message()}")
         
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -408,13 +410,9 @@ class TerminalBookingAssistant:
         print(f"✏️ Updating your booking...")
         
         try:
-            response = requests.patch(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}", 
-                headers=HEADERS,
-                data=update_data
-            )
+            response = api_client.update_booking(self.current_booking['reference'], **update_data)
             
-            if response.status_code == 200:
+            if response.ok:
                 # Update local booking info
                 if new_date:
                     self.current_booking['date'] = new_date
@@ -433,7 +431,7 @@ class TerminalBookingAssistant:
                 print("🤖 Is there anything else you'd like to modify?")
                 
             else:
-                print(f"❌ Error updating booking. Status: {response.status_code}")
+                print(f"❌ Error updating booking. {response.error_message()}")
         
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -447,19 +445,11 @@ class TerminalBookingAssistant:
         print(f"❌ Cancelling your booking...")
         
         try:
-            data = {
-                "micrositeName": "TheHungryUnicorn",
-                "bookingReference": self.current_booking['reference'],
-                "cancellationReasonId": 1  # Default reason
-            }
-            
-            response = requests.post(
-                f"{BASE_URL}/Booking/{self.current_booking['reference']}/Cancel", 
-                headers=HEADERS,
-                data=data
+            response = api_client.cancel_booking(
+                self.current_booking['reference'], 1, microsite_name=RESTAURANT  # Default reason
             )
             
-            if response.status_code == 200:
+            if response.ok:
                 cancelled_booking = self.current_booking.copy()
                 self.current_booking = {}
                 
@@ -473,7 +463,7 @@ class TerminalBookingAssistant:
                 print("😔 We're sorry to see you go. Would you like to make a new reservation for another time?")
                 
             else:
-                print(f"❌ Error cancelling booking. Status: {response.status_code}")
+                print(f"❌ Error cancelling booking. {response.error_message()}")
         
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -498,29 +488,16 @@ class TerminalBookingAssistant:
             self.check_api_status()
             return
         
-        # Check for availability search
-        if any(word in user_message for word in ['available', 'availability', 'check', 'search', 'time', 'slot']):
-            self.handle_availability_search(user_message)
-            return
-        
-        # Check for booking creation
-        if any(word in user_message for word in ['book', 'reservation', 'reserve', 'make booking']):
-            self.handle_booking_creation(user_message)
-            return
-        
-        # Check for booking info
-        if any(word in user_message for word in ['my booking', 'booking info', 'reservation details', 'show booking']):
-            self.handle_booking_info(user_message)
-            return
-        
-        # Check for booking modification
-        if any(word in user_message for word in ['change', 'modify', 'update', 'edit']):
-            self.handle_booking_modification(user_message)
-            return
-        
-        # Check for booking cancellation
-        if any(word in user_message for word in ['cancel', 'cancellation']):
-            self.handle_booking_cancellation(user_message)
+        handlers = {
+            "check_availability": self.handle_availability_search,
+            "book": self.handle_booking_creation,
+            "show_booking": self.handle_booking_info,
+            "modify_booking": self.handle_booking_modification,
+            "cancel_booking": self.handle_booking_cancellation,
+        }
+        intent = intent_matcher.match(user_message)
+        if intent:
+            handlers[intent](user_message)
             return
         
         # Default response
@@ -0,0 +1,68 @@
+"""
+Keyword Intent Matching for the chat frontends.
+
+An intent table lists intents in priority order, each with the keywords that
+signal it. A message has the first intent in the table that has any of its
+keywords anywhere in the message (plain substring match, so "book" also
+matches "booking").
+
+`IntentMatcher` compiles the whole table into one regex alternation and
+scans the message once instead of testing every keyword of every intent in
+turn. At each position the alternation tries the keywords in priority order.
+The scan resumes one character after each hit, so overlapping keywords are
+found too ("my booking" also contains "book"). It stops early once a keyword
+of the top intent is seen. New intents are added as rows in the table.
+
+Author: AI Assistant
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+IntentRules = Sequence[Tuple[str, Sequence[str]]]
+
+
+class IntentMatcher:
+    """
+    Finds the highest-priority intent whose keywords occur in a text.
+
+    Args:
+        rules: (intent, keywords) pairs, highest priority first; a keyword
+            listed under several intents belongs to the first
+
+    Attributes:
+        intents (List[str]): Intent names in priority order
+        priority (Dict[str, int]): Keyword -> index of its intent in `intents`
+    """
+
+    def __init__(self, rules: IntentRules) -> None:
+        self.intents: List[str] = []
+        self.priority: Dict[str, int] = {}
+        for intent, keywords in rules:
+            self.intents.append(intent)
+            for keyword in keywords:
+                self.priority.setdefault(keyword, len(self.intents) - 1)
+        # Alternatives starting at the same position are tried in priority
+        # order, longest first within an intent
+        keywords = sorted(self.priority, key=lambda k: (self.priority[k], -len(k)))
+        self.pattern = re.compile("|".join(map(re.escape, keywords))) if keywords else None
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Return the intent of `text`, or None if no keyword occurs in it.
+
+        Args:
+            text: Message, already lowercased if keywords are lowercase
+        """
+        if self.pattern is None:
+            return None
+        search = self.pattern.search
+        best = len(self.intents)
+        pos = 0
+        while best:
+            m = search(text, pos)
+            if m is None:
+                break
+            best = min(best, self.priority[m.group()])
+            pos = m.start() + 1
+        return self.intents[best] if best < len(self.intents) else None
@@ -0,0 +1,64 @@
+"""
+Shared test fixtures.
+
+Tests run on the in-memory SQLite database (DATABASE_MODE=memory), so they
+never touch ./restaurant_booking.db. The chat modules get a placeholder
+BOOKING_API_TOKEN; tests never send requests with it.
+
+Author: AI Assistant
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_MODE", "memory")
+os.environ.setdefault("BOOKING_API_TOKEN", "test-token")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+PREFIX = "/api/ConsumerApi/v1/Restaurant/TheHungryUnicorn"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Client for the API app, with the startup pipeline run once."""
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth():
+    """Authorization header accepted by the API."""
+    from app.routers.availability import MOCK_BEARER_TOKEN
+
+    return {"Authorization": f"Bearer {MOCK_BEARER_TOKEN}"}
+
+
+@pytest.fixture
+def search(client, auth):
+    """Run an AvailabilitySearch for a visit date; returns its slots by time."""
+    def search(visit_date, party_size: int = 2) -> dict:
+        response = client.post(f"{PREFIX}/AvailabilitySearch", headers=auth, data={
+            "VisitDate": visit_date.isoformat(), "PartySize": party_size,
+            "ChannelCode": "ONLINE",
+        })
+        assert response.status_code == 200, response.text
+        return {slot["time"]: slot for slot in response.json()["available_slots"]}
+    return search
+
+
+@pytest.fixture
+def free_slot(search):
+    """Find an available (visit date, time) at least `days_ahead` days out."""
+    from datetime import date, timedelta
+
+    def free_slot(days_ahead: int = 1):
+        for offset in range(days_ahead, 30):
+            visit_date = date.today() + timedelta(days=offset)
+            for slot_time, slot in search(visit_date).items():
+                if slot["available"]:
+                    return visit_date, slot_time
+        raise AssertionError("no available slot in the sample data")
+    return free_slot
@@ -0,0 +1,122 @@
+"""
+Tests for rate limiting and the concurrency cap of admission control.
+
+Author: AI Assistant
+"""
+
+import asyncio
+
+import pytest
+
+from app.admission import (
+    AdmissionController, AdmissionMiddleware, ConcurrencyLimiter, RateLimiter
+)
+
+
+def limiter(token_rate=0.0, token_burst=1.0, route_rate=0.0, route_burst=1.0,
+            route_overrides=None) -> RateLimiter:
+    return RateLimiter(token_rate, token_burst, route_rate, route_burst,
+                       route_overrides or {})
+
+
+def test_burst_is_admitted_then_refilled_at_rate():
+    rate_limiter = limiter(token_rate=1.0, token_burst=3.0)
+    assert [rate_limiter.check_token(b"t", 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert rate_limiter.check_token(b"t", 0.0) == pytest.approx(1.0)
+    assert rate_limiter.check_token(b"t", 0.5) == pytest.approx(0.5)
+    assert rate_limiter.check_token(b"t", 1.0) == 0.0
+    # Buckets are per token
+    assert rate_limiter.check_token(b"other", 1.0) == 0.0
+
+
+def test_rate_below_one_still_admits_requests():
+    rate_limiter = limiter(token_rate=0.5, token_burst=1.0)
+    assert rate_limiter.check_token(b"t", 0.0) == 0.0
+    assert rate_limiter.check_token(b"t", 1.0) == pytest.approx(1.0)
+    assert rate_limiter.check_token(b"t", 2.0) == 0.0
+
+
+def test_route_override_with_lone_rate_gets_whole_token_burst():
+    rate_limiter = limiter(route_overrides={"availability_search": [0.5]})
+    assert rate_limiter.route_limits["availability_search"] == (0.5, 1.0)
+    assert rate_limiter.check_route("availability_search", 0.0) == 0.0
+    assert rate_limiter.check_route("availability_search", 0.0) > 0
+    # Routes without an override use the default, here unlimited
+    assert rate_limiter.check_route("get_booking", 0.0) == 0.0
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"token_rate": 0.5, "token_burst": 0.5},
+    {"route_rate": 2.0, "route_burst": 0.9},
+    {"route_overrides": {"create_booking": [5, 0.5]}},
+])
+def test_burst_below_one_is_rejected(kwargs):
+    with pytest.raises(ValueError):
+        limiter(**kwargs)
+
+
+def test_queue_admits_in_order_and_rejects_when_full():
+    async def run():
+        concurrency = ConcurrencyLimiter(limit=1, queue_size=2, queue_timeout=1.0)
+        admitted = []
+
+        async def request(name):
+            reason = await concurrency.acquire()
+            admitted.append((name, reason))
+
+        assert await concurrency.acquire() is None
+        first = asyncio.ensure_future(request("first"))
+        second = asyncio.ensure_future(request("second"))
+        await asyncio.sleep(0)
+        assert len(concurrency.waiters) == 2
+        assert await concurrency.acquire() == "queue_full"
+
+        concurrency.release()
+        await first
+        concurrency.release()
+        await second
+        assert admitted == [("first", None), ("second", None)]
+        assert concurrency.active == 1
+
+    asyncio.run(run())
+
+
+def test_queued_request_times_out():
+    async def run():
+        concurrency = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.01)
+        assert await concurrency.acquire() is None
+        assert await concurrency.acquire() == "queue_timeout"
+        assert not concurrency.waiters
+        concurrency.release()
+        assert concurrency.active == 0
+
+    asyncio.run(run())
+
+
+def test_slot_is_released_when_request_fails():
+    controller = AdmissionController()
+    controller.concurrency = ConcurrencyLimiter(limit=1, queue_size=0, queue_timeout=0.01)
+    sent = []
+
+    async def app(scope, receive, send):
+        if scope["path"].endswith("/fail"):
+            raise RuntimeError("handler failed")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    def scope(path):
+        return {"type": "http", "method": "GET", "path": path, "headers": []}
+
+    async def run():
+        middleware = AdmissionMiddleware(app, controller=controller)
+        with pytest.raises(RuntimeError):
+            await middleware(scope("/api/fail"), None, send)
+        assert controller.concurrency.active == 0
+        await middleware(scope("/api/ok"), None, send)
+
+    asyncio.run(run())
+    assert sent[0]["status"] == 200
+    assert controller.shed["queue_full"] == 0
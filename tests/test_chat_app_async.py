@@ -0,0 +1,33 @@
+"""
+Tests for the async chat server's use of the shared turn logic.
+
+Author: AI Assistant
+"""
+
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_build_blocking_client_or_pool():
+    # A fresh interpreter, since other tests may already have used chat_app
+    check = (
+        "import threading, chat_app_async, chat_app\n"
+        "assert chat_app._api_client is None, 'BookingClient created'\n"
+        "assert chat_app._fanout_pool is None, 'fan-out pool created'\n"
+        "assert threading.active_count() == 1, threading.enumerate()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check], cwd=REPO_ROOT, capture_output=True, text=True,
+        env=dict(os.environ, BOOKING_API_TOKEN=os.environ.get("BOOKING_API_TOKEN", "test-token")),
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_blocking_client_and_pool_are_built_once_on_demand():
+    import chat_app
+
+    assert chat_app.get_api_client() is chat_app.get_api_client()
+    assert chat_app.get_fanout_pool() is chat_app.get_fanout_pool()
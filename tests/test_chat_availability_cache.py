@@ -0,0 +1,107 @@
+"""
+Tests that the chat app's availability cache never shows a slot as free
+after the chat itself has booked, moved or cancelled a booking there.
+
+The chat's `BookingClient` is pointed at the API app in-process, and turns
+are driven directly, so the cache sees the real API's answers.
+
+Author: AI Assistant
+"""
+
+import pytest
+
+import chat_app
+from booking_client import BookingClient
+from tests.conftest import PREFIX
+
+MAX_BOOKINGS_PER_SLOT = 3  # see app.routers.availability.find_available_slots
+
+
+@pytest.fixture
+def api(client, auth):
+    """A BookingClient sending its requests to the API app in-process."""
+    api = BookingClient(f"http://testserver{PREFIX}", auth["Authorization"].split()[1])
+    api.session = client
+    return api
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(chat_app, "availability_cache", chat_app.AvailabilityCache(ttl=300))
+
+
+def drive(turn, api):
+    """Run a turn, sending its API calls to `api`."""
+    value = None
+    while True:
+        try:
+            effect = turn.send(value)
+        except StopIteration as stop:
+            return stop.value
+        if isinstance(effect, chat_app.ApiCall):
+            value = getattr(api, effect.method)(*effect.args, **effect.kwargs)
+        elif isinstance(effect, chat_app.Progress):
+            value = None
+        else:
+            raise AssertionError(f"unexpected effect {effect!r}")
+
+
+def listed_times(api, visit_date: str) -> set:
+    """Times the chat would offer: a (possibly cached) availability search."""
+    result = drive(chat_app.api_check_availability(visit_date, 2), api)
+    return {slot["time"] for slot in result["available_slots"] if slot["available"]}
+
+
+def book(api, visit_date: str, visit_time: str) -> dict:
+    booking = drive(chat_app.api_book(visit_date, visit_time, 2, {}), api)
+    assert "error" not in booking, booking
+    return booking
+
+
+@pytest.fixture
+def nearly_full_slot(api, search, free_slot):
+    """A free slot with one booking left before it is full."""
+    visit_date, visit_time = free_slot(days_ahead=10)
+    current = search(visit_date)[visit_time]["current_bookings"]
+    for _ in range(MAX_BOOKINGS_PER_SLOT - 1 - current):
+        api.create_booking(visit_date.isoformat(), visit_time, 2, {"Email": "filler@example.com"})
+    return visit_date.isoformat(), visit_time
+
+
+def session_with(booking: dict) -> dict:
+    sess = chat_app.new_session()
+    sess["current_booking"] = {
+        "reference": booking["booking_reference"], "date": booking["visit_date"],
+        "time": booking["visit_time"], "party_size": 2,
+    }
+    return sess
+
+
+def test_booking_removes_slot_from_next_search(api, nearly_full_slot):
+    visit_date, visit_time = nearly_full_slot
+    assert visit_time in listed_times(api, visit_date)
+
+    book(api, visit_date, visit_time)
+    assert visit_time not in listed_times(api, visit_date)
+
+
+def test_cancellation_lists_slot_again(api, nearly_full_slot):
+    visit_date, visit_time = nearly_full_slot
+    sess = session_with(book(api, visit_date, visit_time))
+    assert visit_time not in listed_times(api, visit_date)
+
+    reply = drive(chat_app.BookingAssistant(sess).handle_booking_cancellation("cancel"), api)
+    assert reply["action"] == "booking_cancelled", reply
+    assert visit_time in listed_times(api, visit_date)
+
+
+def test_update_lists_old_slot_again(api, nearly_full_slot):
+    visit_date, visit_time = nearly_full_slot
+    sess = session_with(book(api, visit_date, visit_time))
+    assert visit_time not in listed_times(api, visit_date)
+
+    new_time = "12:00:00" if visit_time != "12:00:00" else "20:30:00"
+    message = f"change time to {new_time[:5]}"
+    reply = drive(chat_app.BookingAssistant(sess).handle_booking_modification(message), api)
+    assert reply["action"] == "booking_modified", reply
+    assert visit_time in listed_times(api, visit_date)
@@ -0,0 +1,143 @@
+"""
+Chat Session Store Contract Tests.
+
+Every session store must behave the same way for the chat app. Each test
+runs against both `MemorySessionStore` and `SQLiteSessionStore` (on a
+temporary file), on a fake clock.
+
+Author: AI Assistant
+"""
+
+from datetime import date
+
+import pytest
+
+import chat_sessions
+from chat_sessions import (
+    MemorySessionStore, SQLiteSessionStore, decode_state, encode_state
+)
+
+MAX_SESSIONS = 2
+IDLE_TTL = 10.0
+
+
+class FakeClock:
+    """Stands in for the `time` module in chat_sessions."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def new_state() -> dict:
+    return {"slots": {"date": None, "party": None}, "history": []}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(chat_sessions, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, clock, tmp_path):
+    """Each session store in turn, holding at most MAX_SESSIONS sessions."""
+    if request.param == "memory":
+        return MemorySessionStore(new_state, max_sessions=MAX_SESSIONS, idle_ttl=IDLE_TTL)
+    return SQLiteSessionStore(new_state, path=str(tmp_path / "sessions.db"),
+                              max_sessions=MAX_SESSIONS, idle_ttl=IDLE_TTL,
+                              sweep_interval=0)
+
+
+def set_slot(store, session_id: str, value) -> None:
+    with store.open(session_id) as sess:
+        sess["slots"]["party"] = value
+
+
+def get_slot(store, session_id: str):
+    with store.open(session_id) as sess:
+        return sess["slots"]["party"]
+
+
+def test_new_session_gets_fresh_state(store):
+    with store.open("a") as sess:
+        assert sess == new_state()
+
+
+def test_state_is_kept_between_turns(store):
+    state = {"date": date(2025, 8, 6), "name": "Zoë", "times": ["19:00:00"]}
+    with store.open("a") as sess:
+        sess["slots"]["party"] = 4
+        sess["history"].append(state)
+    with store.open("a") as sess:
+        assert sess["slots"]["party"] == 4
+        assert sess["history"] == [state]
+        assert isinstance(sess["history"][0]["date"], date)
+
+
+def test_sessions_are_separate(store):
+    set_slot(store, "a", 2)
+    set_slot(store, "b", 5)
+    assert (get_slot(store, "a"), get_slot(store, "b")) == (2, 5)
+
+
+def test_least_recently_used_session_is_evicted(store, clock):
+    for session_id, party in (("a", 1), ("b", 2), ("c", 3)):
+        set_slot(store, session_id, party)
+        clock.advance(1)
+    assert get_slot(store, "c") == 3
+    clock.advance(1)
+    assert get_slot(store, "a") is None
+
+
+def test_recently_used_session_survives_eviction(store, clock):
+    set_slot(store, "a", 1)
+    clock.advance(1)
+    set_slot(store, "b", 2)
+    clock.advance(1)
+    assert get_slot(store, "a") == 1  # a is now more recent than b
+    clock.advance(1)
+    set_slot(store, "c", 3)
+    clock.advance(1)
+    assert get_slot(store, "a") == 1
+    clock.advance(1)
+    assert get_slot(store, "b") is None
+
+
+def test_idle_session_expires(store, clock):
+    set_slot(store, "a", 2)
+    clock.advance(IDLE_TTL - 1)
+    assert get_slot(store, "a") == 2
+    clock.advance(IDLE_TTL + 1)
+    assert get_slot(store, "a") is None
+
+
+def test_sqlite_sessions_are_shared_between_stores(clock, tmp_path):
+    path = str(tmp_path / "shared.db")
+    worker_a = SQLiteSessionStore(new_state, path=path)
+    worker_b = SQLiteSessionStore(new_state, path=path)
+    set_slot(worker_a, "a", 6)
+    assert get_slot(worker_b, "a") == 6
+    assert worker_b.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_encode_state_round_trip():
+    state = {"slots": {"date": date(2025, 1, 31), "party": 2, "name": "Ana María"},
+             "suggested": [{"date": date(2025, 2, 1), "times": ["12:00:00"]}]}
+    blob = encode_state(state)
+    assert isinstance(blob, bytes)
+    assert decode_state(blob) == state
+
+
+def test_encode_state_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        encode_state({"when": object()})
@@ -0,0 +1,124 @@
+"""
+Tests for single-flight coalescing of concurrent identical work.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from app.coalescing import SingleFlight
+from app.routers import availability
+from tests.conftest import PREFIX
+
+
+def test_concurrent_callers_share_one_computation():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"slots": [1, 2, 3]}
+
+    async def run_all():
+        return await asyncio.gather(*(flights.do("key", compute) for _ in range(10)))
+
+    results = asyncio.run(run_all())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert (flights.leaders, flights.followers) == (1, 9)
+    assert flights.in_flight == {}
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight("test")
+
+    async def compute(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run_all():
+        return await asyncio.gather(
+            flights.do("a", lambda: compute("a")), flights.do("b", lambda: compute("b"))
+        )
+
+    assert asyncio.run(run_all()) == ["a", "b"]
+    assert flights.leaders == 2
+
+
+def test_exception_reaches_every_caller_and_clears_flight():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("database unavailable")
+
+    async def run_all():
+        return await asyncio.gather(
+            *(flights.do("key", failing) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(run_all())
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in results)
+    assert flights.in_flight == {}
+
+    async def succeed():
+        return "fresh"
+
+    # The failure is not remembered: the next call computes again
+    assert asyncio.run(flights.do("key", succeed)) == "fresh"
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_concurrent_availability_searches_run_one_query(client, auth, monkeypatch):
+    if not availability.AVAILABILITY_COALESCE or availability.STORAGE_ENGINE == "memory":
+        pytest.skip("availability searches are not coalesced in this configuration")
+    real = availability.find_available_slots_in_own_store
+    calls = []
+
+    def counted(*args):
+        calls.append(args)
+        time.sleep(0.05)  # keep the flight open while the others arrive
+        return real(*args)
+
+    monkeypatch.setattr(availability, "find_available_slots_in_own_store", counted)
+    form = {"VisitDate": (date.today() + timedelta(days=4)).isoformat(),
+            "PartySize": 2, "ChannelCode": "ONLINE"}
+
+    async def search_all():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post(f"{PREFIX}/AvailabilitySearch", headers=auth, data=form)
+                for _ in range(8)
+            ))
+
+    responses = asyncio.run(search_all())
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len(calls) == 1
+    assert all(r.json() == responses[0].json() for r in responses)
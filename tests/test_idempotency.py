@@ -0,0 +1,157 @@
+"""
+Tests for Idempotency-Key handling of booking creation.
+
+Author: AI Assistant
+"""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.idempotency import REPLAY_HEADER, IdempotencyStore, render_body
+from tests.conftest import PREFIX
+
+FINGERPRINT = b"a" * 32
+OTHER_FINGERPRINT = b"b" * 32
+
+
+def booking_form(visit_date, visit_time, email="idem@example.com") -> dict:
+    return {
+        "VisitDate": visit_date.isoformat(), "VisitTime": visit_time,
+        "PartySize": 2, "ChannelCode": "ONLINE", "Customer[Email]": email,
+    }
+
+
+def test_replay_returns_identical_response(client, auth, search, free_slot):
+    visit_date, visit_time = free_slot(days_ahead=3)
+    before = search(visit_date)[visit_time]["current_bookings"]
+    headers = dict(auth, **{"Idempotency-Key": uuid.uuid4().hex})
+    form = booking_form(visit_date, visit_time)
+
+    first = client.post(f"{PREFIX}/BookingWithStripeToken", headers=headers, data=form)
+    again = client.post(f"{PREFIX}/BookingWithStripeToken", headers=headers, data=form)
+
+    assert first.status_code == again.status_code == 200
+    assert again.content == first.content
+    assert again.headers["content-type"] == first.headers["content-type"]
+    assert REPLAY_HEADER.lower() not in first.headers
+    assert again.headers[REPLAY_HEADER] == "true"
+    assert search(visit_date)[visit_time]["current_bookings"] == before + 1
+
+
+def test_key_reused_for_different_request_is_rejected(client, auth, free_slot):
+    visit_date, visit_time = free_slot(days_ahead=3)
+    headers = dict(auth, **{"Idempotency-Key": uuid.uuid4().hex})
+
+    first = client.post(f"{PREFIX}/BookingWithStripeToken", headers=headers,
+                        data=booking_form(visit_date, visit_time))
+    other = client.post(f"{PREFIX}/BookingWithStripeToken", headers=headers,
+                        data=booking_form(visit_date, visit_time, email="other@example.com"))
+
+    assert first.status_code == 200
+    assert other.status_code == 422
+
+
+def test_concurrent_first_requests_create_one_booking(client, auth, search, free_slot):
+    visit_date, visit_time = free_slot(days_ahead=3)
+    before = search(visit_date)[visit_time]["current_bookings"]
+    headers = dict(auth, **{"Idempotency-Key": uuid.uuid4().hex})
+    form = booking_form(visit_date, visit_time)
+
+    async def send_both():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post(f"{PREFIX}/BookingWithStripeToken", headers=headers, data=form)
+                for _ in range(2)
+            ))
+
+    responses = asyncio.run(send_both())
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].content == responses[1].content
+    assert search(visit_date)[visit_time]["current_bookings"] == before + 1
+
+
+def test_concurrent_runs_share_one_handler_call():
+    store = IdempotencyStore(persist=False)
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"booking_reference": "ABC1234"}
+
+    async def run_both():
+        return await asyncio.gather(
+            store.run("key", FINGERPRINT, handler), store.run("key", FINGERPRINT, handler)
+        )
+
+    first, second = asyncio.run(run_both())
+    assert len(calls) == 1
+    assert first == {"booking_reference": "ABC1234"}
+    assert second.body == render_body(first)
+    assert second.headers[REPLAY_HEADER] == "true"
+    assert store.outcomes["stored"] == 1 and store.outcomes["waited"] == 1
+
+
+def test_waiter_with_different_payload_is_rejected():
+    store = IdempotencyStore(persist=False)
+
+    async def handler():
+        await asyncio.sleep(0.01)
+        return {}
+
+    async def run_both():
+        return await asyncio.gather(
+            store.run("key", FINGERPRINT, handler),
+            store.run("key", OTHER_FINGERPRINT, handler),
+            return_exceptions=True
+        )
+
+    first, second = asyncio.run(run_both())
+    assert first == {}
+    assert isinstance(second, HTTPException) and second.status_code == 422
+
+
+def test_failed_handler_releases_key():
+    store = IdempotencyStore(persist=False)
+
+    async def failing():
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(store.run("key", FINGERPRINT, failing))
+    assert "key" not in store.in_flight and "key" not in store.entries
+    assert asyncio.run(store.run("key", FINGERPRINT, lambda: {"ok": True})) == {"ok": True}
+
+
+def test_other_worker_waits_for_claimed_key(client):
+    # Two stores sharing the idempotency_keys table stand in for two workers
+    worker_a, worker_b = IdempotencyStore(persist=True), IdempotencyStore(persist=True)
+    key = uuid.uuid4().hex
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"booking_reference": "XYZ9876"}
+
+    async def run_on_both():
+        first = asyncio.ensure_future(worker_a.run(key, FINGERPRINT, handler))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, worker_b.run(key, FINGERPRINT, handler))
+
+    first, second = asyncio.run(run_on_both())
+    assert len(calls) == 1
+    assert second.body == render_body(first)
+    assert worker_b.outcomes["waited"] == 1
+
+
+def test_lru_index_is_bounded():
+    store = IdempotencyStore(persist=False, max_entries=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(store.run(key, FINGERPRINT, lambda: {}))
+    assert list(store.entries) == ["b", "c"]
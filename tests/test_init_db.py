@@ -0,0 +1,28 @@
+"""
+Tests for the in-memory seed image.
+
+Author: AI Assistant
+"""
+
+import os
+
+from app import init_db
+
+
+def test_saving_seed_image_removes_older_ones(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(init_db.tempfile, "gettempdir", lambda: str(tmp_path))
+    stale = [
+        tmp_path / f"{init_db.SEED_IMAGE_PREFIX}2_82b726d99ad6_20200101.db",
+        tmp_path / f"{init_db.SEED_IMAGE_PREFIX}1_000000000000_20200102.db",
+    ]
+    unrelated = tmp_path / "restaurant_booking.db"
+    for path in stale + [unrelated]:
+        path.write_bytes(b"")
+
+    init_db.save_seed_image()
+
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [os.path.basename(init_db.seed_image_path()), unrelated.name]
+    )
+    assert init_db.load_seed_image()
+    assert init_db.is_database_current()
@@ -0,0 +1,87 @@
+"""
+Tests for keyword intent matching.
+
+`IntentMatcher` must give the same intent as checking each intent's keywords
+in priority order with a substring scan, which is how the chat frontends
+detected intents before.
+
+Author: AI Assistant
+"""
+
+import os
+
+import pytest
+
+import chat_app
+import chat_terminal
+from intents import IntentMatcher
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "bench", "data")
+
+
+def keyword_scan(rules, text):
+    """Reference: the first intent with any keyword in the text."""
+    for intent, keywords in rules:
+        if any(keyword in text for keyword in keywords):
+            return intent
+    return None
+
+
+def corpus():
+    lines = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+            lines += [line.strip().lower() for line in f if not line.startswith("#")]
+    return lines
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Overlapping keywords: the higher-priority intent wins wherever it occurs
+    ("show my booking", "book"),                      # "book" inside "my booking"
+    ("what time is my booking", "check_availability"),  # "time" inside "what time"
+    ("cancel my reservation", "book"),
+    ("change the time please", "check_availability"),
+    ("i need to cancel", "cancel_booking"),
+    ("can you help me cancel", "cancel_booking"),
+    ("modify it", "modify_booking"),
+    ("please update", "modify_booking"),
+    ("help", "help"),
+    ("dinner for 4", "book"),
+    ("whenever", "check_availability"),               # substring, not whole word
+    # No keyword at all
+    ("hello there", None),
+    ("", None),
+    ("tomorrow at 7pm for 2", None),
+])
+def test_chat_app_intents(text, expected):
+    assert chat_app.intent_matcher.match(text) == expected
+    assert keyword_scan(chat_app.INTENT_RULES, text) == expected
+
+
+@pytest.mark.parametrize("rules", [chat_app.INTENT_RULES, chat_terminal.INTENT_RULES],
+                         ids=["chat_app", "chat_terminal"])
+def test_matches_keyword_scan_on_corpus(rules):
+    matcher = IntentMatcher(rules)
+    texts = corpus()
+    assert texts
+    for text in texts:
+        assert matcher.match(text) == keyword_scan(rules, text), text
+
+
+@pytest.mark.parametrize("rules, text, expected", [
+    # A lower-priority keyword matching earlier does not hide a later,
+    # higher-priority one
+    ([("high", ["bc"]), ("low", ["abc"])], "abc", "high"),
+    ([("high", ["later"]), ("low", ["early"])], "early then later", "high"),
+    # Longer keyword of the same intent tried first; either way same intent
+    ([("one", ["book", "book now"])], "book now", "one"),
+    # A keyword listed under two intents belongs to the first
+    ([("first", ["x"]), ("second", ["x", "y"])], "x", "first"),
+    ([("first", ["x"]), ("second", ["x", "y"])], "y", "second"),
+    # Regex metacharacters are matched literally
+    ([("q", ["a.b", "(c)"])], "axb", None),
+    ([("q", ["a.b", "(c)"])], "see (c)", "q"),
+    ([], "anything", None),
+])
+def test_priority_table(rules, text, expected):
+    assert IntentMatcher(rules).match(text) == expected == keyword_scan(rules, text)
@@ -0,0 +1,32 @@
+"""
+Tests for the nearest-rank percentile used by the load harness.
+
+Author: AI Assistant
+"""
+
+import pytest
+
+from bench.load import percentile
+
+ONE_TO_HUNDRED = [float(v) for v in range(1, 101)]
+
+
+@pytest.mark.parametrize("pct, expected", [
+    (50, 50), (95, 95), (99, 99), (100, 100), (7, 7), (0, 1),
+])
+def test_percentile_one_to_hundred(pct, expected):
+    assert percentile(ONE_TO_HUNDRED, pct) == expected
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([1, 2, 3, 4], 50, 2),
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 11)), 95, 10),
+    ([42], 99, 42),
+])
+def test_percentile_small_lists(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+def test_percentile_empty():
+    assert percentile([], 95) == 0.0
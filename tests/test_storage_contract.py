@@ -0,0 +1,230 @@
+"""
+Storage Engine Contract Tests.
+
+Every `BookingStore` engine must behave identically. Each test here runs
+against both `SQLAlchemyStore` (on a private in-memory SQLite database) and
+`MemoryStore`, seeded with the same restaurant, slots and cancellation
+reasons, so the engines cannot drift apart unnoticed.
+
+Run with:
+    python -m pytest -q
+
+Author: AI Assistant
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.init_db import CANCELLATION_REASONS, SAMPLE_RESTAURANT, SAMPLE_TIMES
+from app.models import AvailabilitySlot, CancellationReason, Restaurant
+from app.storage import MemoryStore, SQLAlchemyStore
+from app.storage.base import (
+    AvailabilitySlotRecord, CancellationReasonRecord, RestaurantRecord
+)
+
+VISIT_DATE = date.today() + timedelta(days=2)
+
+# (time, max_party_size, available) for every slot on VISIT_DATE; the small
+# tables check that get_slots filters on party size
+SLOTS = [
+    (slot_time, 2 if slot_time == time(12, 30) else 8, slot_time != time(13, 0))
+    for slot_time in SAMPLE_TIMES
+]
+
+
+def seed_sqlalchemy_store():
+    """SQLAlchemyStore on a fresh in-memory database with the contract data."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    restaurant = Restaurant(name=SAMPLE_RESTAURANT, microsite_name=SAMPLE_RESTAURANT)
+    db.add(restaurant)
+    db.commit()
+    for slot_time, max_party_size, available in SLOTS:
+        db.add(AvailabilitySlot(
+            restaurant_id=restaurant.id, date=VISIT_DATE, time=slot_time,
+            max_party_size=max_party_size, available=available
+        ))
+    for reason_data in CANCELLATION_REASONS:
+        db.add(CancellationReason(**reason_data))
+    db.commit()
+    return SQLAlchemyStore(db), lambda: (db.close(), engine.dispose())
+
+
+def seed_memory_store():
+    """MemoryStore holding the contract data."""
+    store = MemoryStore()
+    restaurant = RestaurantRecord(
+        id=store._next_id("restaurants"),
+        name=SAMPLE_RESTAURANT,
+        microsite_name=SAMPLE_RESTAURANT
+    )
+    store.restaurants[restaurant.name] = restaurant
+    # Added in reverse so the store, not the seed order, sorts them
+    for slot_time, max_party_size, available in reversed(SLOTS):
+        store.add_slot(AvailabilitySlotRecord(
+            id=store._next_id("availability_slots"), restaurant_id=restaurant.id,
+            date=VISIT_DATE, time=slot_time,
+            max_party_size=max_party_size, available=available
+        ))
+    for reason_data in CANCELLATION_REASONS:
+        reason = CancellationReasonRecord(**reason_data)
+        store.reasons[reason.id] = reason
+    return store, lambda: None
+
+
+@pytest.fixture(params=[seed_sqlalchemy_store, seed_memory_store],
+                ids=["sqlalchemy", "memory"])
+def store(request):
+    """Each storage engine in turn, seeded with the contract data."""
+    store, close = request.param()
+    yield store
+    close()
+
+
+@pytest.fixture
+def restaurant(store):
+    return store.get_restaurant(SAMPLE_RESTAURANT)
+
+
+def book(store, restaurant, reference="ABC1234", visit_time=time(19, 0),
+         email="contract@example.com", **fields):
+    """Create a customer and a confirmed booking for them, as the router does."""
+    customer = store.find_customer_by_email(email) or store.create_customer(
+        first_name="Ada", surname="Lovelace", email=email
+    )
+    return store.create_booking(
+        booking_reference=reference,
+        restaurant_id=restaurant.id,
+        customer_id=customer.id,
+        visit_date=VISIT_DATE,
+        visit_time=visit_time,
+        party_size=fields.pop("party_size", 2),
+        channel_code="ONLINE",
+        status="confirmed",
+        customer=customer,
+        **fields
+    )
+
+
+def test_get_restaurant(store, restaurant):
+    assert restaurant.name == SAMPLE_RESTAURANT
+    assert restaurant.microsite_name == SAMPLE_RESTAURANT
+    assert store.get_restaurant("Nope") is None
+
+
+def test_get_slots_ordered_by_time(store, restaurant):
+    slots = store.get_slots(restaurant.id, VISIT_DATE, 2)
+    assert [s.time for s in slots] == SAMPLE_TIMES
+    assert [(s.time, s.max_party_size, s.available) for s in slots] == SLOTS
+
+
+def test_get_slots_filters_party_size(store, restaurant):
+    times = [s.time for s in store.get_slots(restaurant.id, VISIT_DATE, 3)]
+    assert times == [t for t in SAMPLE_TIMES if t != time(12, 30)]
+    assert store.get_slots(restaurant.id, VISIT_DATE, 9) == []
+
+
+def test_get_slots_other_dates_and_restaurants(store, restaurant):
+    assert store.get_slots(restaurant.id, VISIT_DATE + timedelta(days=1), 2) == []
+    assert store.get_slots(restaurant.id + 1, VISIT_DATE, 2) == []
+
+
+def test_create_and_find_customer(store):
+    assert store.find_customer_by_email("new@example.com") is None
+    customer = store.create_customer(
+        first_name="Grace", surname="Hopper", email="new@example.com",
+        receive_email_marketing=True
+    )
+    assert customer.id is not None
+    found = store.find_customer_by_email("new@example.com")
+    assert found.id == customer.id
+    assert (found.first_name, found.surname) == ("Grace", "Hopper")
+    assert found.receive_email_marketing is True
+    assert found.receive_sms_marketing is False
+
+
+def test_first_customer_with_an_email_is_found(store):
+    first = store.create_customer(first_name="One", email="same@example.com")
+    store.create_customer(first_name="Two", email="same@example.com")
+    assert store.find_customer_by_email("same@example.com").id == first.id
+
+
+def test_create_and_get_booking(store, restaurant):
+    booking = book(store, restaurant, special_requests="Window seat")
+    assert booking.id is not None
+    assert store.booking_reference_exists("ABC1234")
+    assert not store.booking_reference_exists("XXXXXXX")
+
+    got = store.get_booking(restaurant.id, "ABC1234")
+    assert got.id == booking.id
+    assert got.status == "confirmed"
+    assert got.visit_date == VISIT_DATE
+    assert got.visit_time == time(19, 0)
+    assert got.party_size == 2
+    assert got.special_requests == "Window seat"
+    assert got.is_leave_time_confirmed is False
+    assert got.cancellation_reason_id is None
+    assert got.customer.email == "contract@example.com"
+
+
+def test_get_booking_unknown_or_other_restaurant(store, restaurant):
+    book(store, restaurant)
+    assert store.get_booking(restaurant.id, "XXXXXXX") is None
+    assert store.get_booking(restaurant.id + 1, "ABC1234") is None
+
+
+def test_count_confirmed_bookings(store, restaurant):
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(19, 0)) == 0
+    book(store, restaurant, "AAAAAAA")
+    book(store, restaurant, "BBBBBBB")
+    book(store, restaurant, "CCCCCCC", visit_time=time(20, 0))
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(19, 0)) == 2
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(20, 0)) == 1
+    assert store.count_confirmed_bookings(
+        restaurant.id, VISIT_DATE + timedelta(days=1), time(19, 0)
+    ) == 0
+
+
+def test_save_booking_moves_count_to_new_time(store, restaurant):
+    booking = book(store, restaurant)
+    saved = store.save_booking(
+        booking, visit_time=time(20, 0), party_size=3, updated_at=datetime.utcnow()
+    )
+    assert (saved.visit_time, saved.party_size) == (time(20, 0), 3)
+    assert store.get_booking(restaurant.id, "ABC1234").visit_time == time(20, 0)
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(19, 0)) == 0
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(20, 0)) == 1
+
+
+def test_cancelled_booking_is_not_counted(store, restaurant):
+    booking = book(store, restaurant)
+    reason = store.get_cancellation_reason(1)
+    saved = store.save_booking(
+        booking, status="cancelled", cancellation_reason_id=reason.id,
+        updated_at=datetime.utcnow()
+    )
+    assert saved.status == "cancelled"
+    got = store.get_booking(restaurant.id, "ABC1234")
+    assert (got.status, got.cancellation_reason_id) == ("cancelled", 1)
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(19, 0)) == 0
+
+    # Changes to a cancelled booking leave the counts alone
+    store.save_booking(got, visit_time=time(20, 0))
+    assert store.count_confirmed_bookings(restaurant.id, VISIT_DATE, time(20, 0)) == 0
+
+
+def test_get_cancellation_reason(store):
+    for reason_data in CANCELLATION_REASONS:
+        reason = store.get_cancellation_reason(reason_data["id"])
+        assert (reason.id, reason.reason, reason.description) == (
+            reason_data["id"], reason_data["reason"], reason_data["description"]
+        )
+    assert store.get_cancellation_reason(9) is None